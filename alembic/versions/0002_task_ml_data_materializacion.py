@@ -0,0 +1,49 @@
+"""task_ml_data: puntaje ampliado y una fila por tarea
+
+Los puntajes por reglas superan 9.9999, el máximo de DECIMAL(5,4), y la
+escritura masiva hace upsert por task_id.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'task_ml_data', 'ml_priority_score',
+        existing_type=sa.DECIMAL(precision=5, scale=4),
+        type_=sa.DECIMAL(precision=8, scale=4),
+        existing_nullable=True
+    )
+    # Conservar solo la fila más reciente de cada tarea antes de exigir unicidad
+    op.execute("""
+        DELETE FROM task_ml_data a
+        USING task_ml_data b
+        WHERE a.task_id = b.task_id
+          AND (COALESCE(a.updated_at, 'epoch'), a.id) < (COALESCE(b.updated_at, 'epoch'), b.id)
+    """)
+    op.create_unique_constraint('uq_task_ml_data_task_id', 'task_ml_data', ['task_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_task_ml_data_task_id', 'task_ml_data', type_='unique')
+    op.alter_column(
+        'task_ml_data', 'ml_priority_score',
+        existing_type=sa.DECIMAL(precision=8, scale=4),
+        type_=sa.DECIMAL(precision=5, scale=4),
+        existing_nullable=True
+    )
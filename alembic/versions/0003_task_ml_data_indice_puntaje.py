@@ -0,0 +1,37 @@
+"""task_ml_data: índice (user_id, ml_priority_score DESC, task_id)
+
+Sirve /ml_tasks/prioritized desde los puntajes materializados.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY no bloquea las escrituras en task_ml_data, pero no puede ir en una transacción
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_task_ml_data_user_score', 'task_ml_data',
+            ['user_id', sa.text('ml_priority_score DESC'), 'task_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_task_ml_data_user_score', table_name='task_ml_data', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,62 @@
+"""índices compuestos y parciales para las consultas frecuentes
+
+Casi todos los endpoints filtran por user_id más status, deadline,
+created_at, logged_at o recommendation_date; los índices por task_id
+cubren además los borrados en cascada de tareas. Se crean con CONCURRENTLY
+para no bloquear las escrituras en tablas grandes.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nombre, tabla, columnas, condición del índice parcial)
+INDICES = [
+    ('ix_categories_user_name', 'categories', ['user_id', 'name'], None),
+    ('ix_tasks_user_status', 'tasks', ['user_id', 'status'], None),
+    ('ix_tasks_user_deadline_pendientes', 'tasks', ['user_id', 'deadline'], "status IN ('pending', 'in_progress')"),
+    ('ix_task_history_task_created', 'task_history', ['task_id', sa.text('created_at DESC')], None),
+    ('ix_task_history_user_created', 'task_history', ['user_id', sa.text('created_at DESC')], None),
+    ('ix_daily_recommendations_user_date', 'daily_recommendations', ['user_id', 'recommendation_date'], None),
+    ('ix_daily_recommendations_task', 'daily_recommendations', ['task_id'], None),
+    ('ix_energy_logs_user_logged', 'energy_logs', ['user_id', sa.text('logged_at DESC')], None),
+    ('ix_energy_logs_task', 'energy_logs', ['task_id'], None),
+    ('ix_ai_models_user_active_trained', 'ai_models', ['user_id', 'is_active', sa.text('trained_at DESC')], None),
+    ('ix_ai_feedback_task', 'ai_feedback', ['task_id'], None),
+    ('ix_ml_feedback_task_created', 'ml_feedback', ['task_id', sa.text('created_at DESC')], None),
+    ('ix_ml_feedback_user_created', 'ml_feedback', ['user_id', sa.text('created_at DESC')], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY no bloquea las escrituras mientras se construye el índice, pero no
+    # puede ejecutarse dentro de una transacción. Si la migración se interrumpe, los
+    # índices ya creados se conservan y if_not_exists permite volver a lanzarla
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas, condicion in INDICES:
+            op.create_index(
+                nombre, tabla, columnas,
+                postgresql_where=sa.text(condicion) if condicion else None,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for nombre, tabla, _, _ in reversed(INDICES):
+            op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,69 @@
+"""índices (created_at, id) / (logged_at, id) para la paginación por cursor
+
+Los listados se ordenan por (marca de tiempo, id) descendente y la página
+siguiente filtra con una comparación de filas sobre esas dos columnas.
+Los índices se crean con CONCURRENTLY para no bloquear las escrituras.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (índice, tabla, columna de prefijo, columna de orden) que ahora terminan en id
+INDICES_AMPLIADOS = [
+    ('ix_task_history_task_created', 'task_history', 'task_id', 'created_at'),
+    ('ix_task_history_user_created', 'task_history', 'user_id', 'created_at'),
+    ('ix_energy_logs_user_logged', 'energy_logs', 'user_id', 'logged_at'),
+]
+
+
+# Índices nuevos de las tablas con paginación por cursor
+INDICES_NUEVOS = [
+    ('ix_tasks_user_created', 'tasks'),
+    ('ix_categories_user_created', 'categories'),
+    ('ix_daily_recommendations_user_created', 'daily_recommendations'),
+]
+
+
+def _reemplazar(nombre: str, tabla: str, columnas: list) -> None:
+    # Se construye el índice nuevo antes de borrar el anterior: las consultas nunca se
+    # quedan sin índice y ninguna operación bloquea las escrituras de la tabla
+    op.create_index(f'{nombre}_nuevo', tabla, columnas, postgresql_concurrently=True, if_not_exists=True)
+    op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True, if_exists=True)
+    op.execute(f'ALTER INDEX IF EXISTS {nombre}_nuevo RENAME TO {nombre}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for nombre, tabla, prefijo, orden in INDICES_AMPLIADOS:
+            _reemplazar(nombre, tabla, [prefijo, sa.text(f'{orden} DESC'), sa.text('id DESC')])
+
+        for nombre, tabla in INDICES_NUEVOS:
+            op.create_index(
+                nombre, tabla, ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for nombre, tabla in reversed(INDICES_NUEVOS):
+            op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True, if_exists=True)
+
+        for nombre, tabla, prefijo, orden in INDICES_AMPLIADOS:
+            _reemplazar(nombre, tabla, [prefijo, sa.text(f'{orden} DESC')])
@@ -0,0 +1,39 @@
+"""índice parcial (deadline, id) para el refresco de prioridades
+
+El refresco periódico busca tareas pendientes de todos los usuarios por
+rangos de deadline y las recorre por lotes ordenadas por (deadline, id);
+ix_tasks_user_deadline_pendientes empieza por user_id y no sirve para eso.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY no bloquea las escrituras en tasks, pero no puede ir en una transacción
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_deadline_pendientes', 'tasks', ['deadline', 'id'],
+            postgresql_where=sa.text("status IN ('pending', 'in_progress')"),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_deadline_pendientes', table_name='tasks', postgresql_concurrently=True, if_exists=True)
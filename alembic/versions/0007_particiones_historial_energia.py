@@ -0,0 +1,210 @@
+"""particiones mensuales de task_history y energy_logs
+
+Las dos tablas solo crecen y se consultan por usuario o tarea ordenadas por
+su marca de tiempo. Pasan a estar particionadas por rango de mes sobre
+created_at / logged_at, con una partición DEFAULT para cualquier fila fuera
+de los meses creados. La clave primaria incluye la columna de partición
+(requisito de PostgreSQL). Se crean las particiones de los meses con datos
+(como mucho los últimos 5 años; lo anterior queda en DEFAULT) y de los 3
+meses siguientes; app/services/partition_maintenance.py crea las siguientes
+y aplica la retención.
+
+El cambio de tabla se hace en una transacción corta, con las tablas nuevas
+aún vacías, y las escrituras pasan a ellas en cuanto se confirma. Las filas
+existentes se mueven después por lotes de LOTE_COPIA, cada uno en su propia
+transacción, así que ningún bloqueo dura toda la copia. Mientras dura, los
+listados muestran el historial antiguo solo en parte. Si la migración se
+interrumpe, volver a lanzarla continúa la copia donde quedó.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MESES_ADELANTE = 3
+MESES_ATRAS_MAXIMO = 60
+LOTE_COPIA = 10000
+
+COLUMNAS_TASK_HISTORY = [
+    'id', 'task_id', 'user_id', 'change_type', 'old_values', 'new_values', 'change_description', 'created_at'
+]
+COLUMNAS_ENERGY_LOGS = ['id', 'user_id', 'task_id', 'energy_level', 'notes', 'logged_at']
+
+
+def _sumar_meses(mes: date, n: int) -> date:
+    total = mes.year * 12 + mes.month - 1 + n
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _columnas_task_history(columna_nullable: bool):
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('change_type', sa.String(length=50), nullable=False),
+        sa.Column('old_values', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('new_values', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('change_description', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=columna_nullable),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    ]
+
+
+def _columnas_energy_logs(columna_nullable: bool):
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('energy_level', sa.String(length=20), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('logged_at', sa.DateTime(), nullable=columna_nullable),
+        sa.CheckConstraint("energy_level IN ('low', 'medium', 'high')", name='ck_energy_log_level'),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    ]
+
+
+def _crear_indices_task_history():
+    op.create_index('ix_task_history_task_created', 'task_history', ['task_id', sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_task_history_user_created', 'task_history', ['user_id', sa.text('created_at DESC'), sa.text('id DESC')])
+
+
+def _crear_indices_energy_logs():
+    op.create_index('ix_energy_logs_user_logged', 'energy_logs', ['user_id', sa.text('logged_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_energy_logs_task', 'energy_logs', ['task_id'])
+
+
+def _apartada(tabla: str) -> bool:
+    """La tabla ya se apartó en una ejecución anterior que se interrumpió durante la copia"""
+    return op.get_bind().execute(sa.text('SELECT to_regclass(:t)'), {'t': f'{tabla}_anterior'}).scalar() is not None
+
+
+def _apartar(tabla: str, indices: Sequence[str]):
+    """Renombra la tabla actual (y su clave primaria) para copiarla después"""
+    for indice in indices:
+        op.drop_index(indice, table_name=tabla)
+    op.rename_table(tabla, f'{tabla}_anterior')
+    op.execute(f'ALTER INDEX {tabla}_pkey RENAME TO {tabla}_anterior_pkey')
+
+
+def _mover(tabla: str, columnas: Sequence[str], columna_tiempo: str):
+    """
+    Mueve las filas de <tabla>_anterior a la tabla nueva por lotes de LOTE_COPIA, cada
+    uno en su propia transacción (llamar dentro de autocommit_block). Cada lote borra
+    y copia sus filas en la misma sentencia: si se interrumpe, nada se duplica ni se
+    pierde y la siguiente ejecución sigue con lo que quede.
+    """
+    lista = ', '.join(columnas)
+    origen = ', '.join(f'COALESCE({c}, localtimestamp)' if c == columna_tiempo else c for c in columnas)
+    mover_lote = sa.text(
+        f'WITH lote AS ('
+        f'DELETE FROM {tabla}_anterior WHERE id IN ('
+        f'SELECT id FROM {tabla}_anterior WHERE id > :ultimo ORDER BY id LIMIT :n'
+        f') RETURNING {lista}'
+        f'), copiadas AS (INSERT INTO {tabla} ({lista}) SELECT {origen} FROM lote) '
+        f'SELECT id FROM lote ORDER BY id DESC LIMIT 1'
+    )
+    conn = op.get_bind()
+    ultimo = '00000000-0000-0000-0000-000000000000'
+    while True:
+        ultimo_lote = conn.execute(mover_lote, {'ultimo': ultimo, 'n': LOTE_COPIA}).scalar()
+        if ultimo_lote is None:
+            return
+        ultimo = ultimo_lote
+
+
+def _crear_particiones(tabla: str, columna: str):
+    actual = date.today().replace(day=1)
+    primero = op.get_bind().execute(sa.text(f'SELECT min({columna}) FROM {tabla}_anterior')).scalar()
+    mes = max(
+        date(primero.year, primero.month, 1) if primero else actual,
+        _sumar_meses(actual, -MESES_ATRAS_MAXIMO)
+    )
+    while mes <= _sumar_meses(actual, MESES_ADELANTE):
+        siguiente = _sumar_meses(mes, 1)
+        op.execute(
+            f"CREATE TABLE {tabla}_p{mes:%Y_%m} PARTITION OF {tabla} "
+            f"FOR VALUES FROM ('{mes}') TO ('{siguiente}')"
+        )
+        mes = siguiente
+    op.execute(f'CREATE TABLE {tabla}_default PARTITION OF {tabla} DEFAULT')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Primero, en una transacción corta: apartar las tablas y crear las particionadas
+    # con sus índices. Las escrituras nuevas van ya a las tablas nuevas
+    if not _apartada('task_history'):
+        _apartar('task_history', ['ix_task_history_task_created', 'ix_task_history_user_created'])
+        op.create_table(
+            'task_history',
+            *_columnas_task_history(columna_nullable=False),
+            sa.PrimaryKeyConstraint('id', 'created_at'),
+            postgresql_partition_by='RANGE (created_at)'
+        )
+        _crear_particiones('task_history', 'created_at')
+        _crear_indices_task_history()
+
+    if not _apartada('energy_logs'):
+        _apartar('energy_logs', ['ix_energy_logs_user_logged', 'ix_energy_logs_task'])
+        op.create_table(
+            'energy_logs',
+            *_columnas_energy_logs(columna_nullable=False),
+            sa.PrimaryKeyConstraint('id', 'logged_at'),
+            postgresql_partition_by='RANGE (logged_at)'
+        )
+        _crear_particiones('energy_logs', 'logged_at')
+        _crear_indices_energy_logs()
+
+    # Después, las filas existentes por lotes fuera de esa transacción
+    with op.get_context().autocommit_block():
+        _mover('task_history', COLUMNAS_TASK_HISTORY, 'created_at')
+        _mover('energy_logs', COLUMNAS_ENERGY_LOGS, 'logged_at')
+
+    op.drop_table('task_history_anterior')
+    op.drop_table('energy_logs_anterior')
+    op.execute('ANALYZE task_history')
+    op.execute('ANALYZE energy_logs')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _apartada('energy_logs'):
+        _apartar('energy_logs', ['ix_energy_logs_user_logged', 'ix_energy_logs_task'])
+        op.create_table(
+            'energy_logs',
+            *_columnas_energy_logs(columna_nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        _crear_indices_energy_logs()
+
+    if not _apartada('task_history'):
+        _apartar('task_history', ['ix_task_history_task_created', 'ix_task_history_user_created'])
+        op.create_table(
+            'task_history',
+            *_columnas_task_history(columna_nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        _crear_indices_task_history()
+
+    with op.get_context().autocommit_block():
+        _mover('energy_logs', COLUMNAS_ENERGY_LOGS, 'logged_at')
+        _mover('task_history', COLUMNAS_TASK_HISTORY, 'created_at')
+
+    # Con la tabla padre se eliminan también sus particiones
+    op.drop_table('energy_logs_anterior')
+    op.drop_table('task_history_anterior')
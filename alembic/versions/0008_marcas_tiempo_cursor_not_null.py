@@ -0,0 +1,56 @@
+"""columnas de orden de la paginación por cursor NOT NULL
+
+tasks.created_at, categories.created_at, daily_recommendations.created_at y
+ai_models.trained_at eran nullable. En orden DESC las filas con NULL van
+primero y la comparación (columna, id) < (…) del cursor nunca las incluye:
+una página que terminaba en una de ellas no devolvía X-Next-Cursor y el
+resto del listado se perdía. Se rellenan los NULL con la mejor marca
+disponible y las columnas pasan a NOT NULL con valor por defecto en el
+servidor.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabla, columna, valor para las filas con NULL)
+COLUMNAS = [
+    ('tasks', 'created_at', 'COALESCE(updated_at, CURRENT_TIMESTAMP)'),
+    ('categories', 'created_at', 'CURRENT_TIMESTAMP'),
+    ('daily_recommendations', 'created_at', 'recommendation_date::timestamp'),
+    ('ai_models', 'trained_at', 'CURRENT_TIMESTAMP'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabla, columna, relleno in COLUMNAS:
+        op.execute(f"UPDATE {tabla} SET {columna} = {relleno} WHERE {columna} IS NULL")
+        op.alter_column(
+            tabla, columna,
+            existing_type=sa.DateTime(),
+            nullable=False,
+            server_default=sa.text('CURRENT_TIMESTAMP')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabla, columna, _ in COLUMNAS:
+        op.alter_column(
+            tabla, columna,
+            existing_type=sa.DateTime(),
+            nullable=True,
+            server_default=None
+        )
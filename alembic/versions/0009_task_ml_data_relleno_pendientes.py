@@ -0,0 +1,73 @@
+"""task_ml_data: puntaje de todas las tareas pendientes y ml_priority_score NOT NULL
+
+/ml_tasks/prioritized lee solo las tareas con fila en task_ml_data (join por
+ix_task_ml_data_user_score). Las tareas pendientes creadas antes de la
+materialización (0002) no la tenían. Se puntúan ahora igual que al
+materializarlas (modelo activo del usuario o reglas), por lotes de tareas.
+Las filas sin puntaje se recalculan y la columna pasa a NOT NULL.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOTE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    from sqlalchemy.orm import Session
+
+    from app.models.database_models import Task, TaskMLData
+    from app.services.batch_scoring import (
+        COLUMNAS_PUNTUACION, ESTADOS_PENDIENTES, guardar_puntajes, modelos_activos, puntuar_tareas
+    )
+    from app.services.ml_executor import ml_executor
+
+    op.execute("DELETE FROM task_ml_data WHERE ml_priority_score IS NULL")
+
+    # La migración predice en su propio proceso, sin abrir el pool de inferencia
+    ml_executor.usar_local()
+    db = Session(bind=op.get_bind())
+    ultimo = None
+    while True:
+        query = db.query(*COLUMNAS_PUNTUACION).filter(
+            Task.status.in_(ESTADOS_PENDIENTES),
+            ~sa.exists().where(TaskMLData.task_id == Task.id)
+        )
+        if ultimo is not None:
+            query = query.filter(Task.id > ultimo)
+        tareas = query.order_by(Task.id).limit(LOTE).all()
+        if not tareas:
+            break
+
+        user_ids = list({fila.user_id for fila in tareas})
+        guardar_puntajes(db, puntuar_tareas(db, tareas, modelos_activos(db, user_ids)))
+        db.flush()
+        ultimo = tareas[-1].id
+
+    op.alter_column(
+        'task_ml_data', 'ml_priority_score',
+        existing_type=sa.DECIMAL(8, 4),
+        nullable=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'task_ml_data', 'ml_priority_score',
+        existing_type=sa.DECIMAL(8, 4),
+        nullable=True
+    )
@@ -2,17 +2,17 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, update
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.database_models import User
 from app.models.pydantic_models import Token, UserRegister, UserResponse
 from app.security.config import (
-    get_password_hash, 
     create_access_token, 
-    ACCESS_TOKEN_EXPIRE_MINUTES,
-    verify_password
+    ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from app.security.password_pool import password_pool
 from app.security.auth import authenticate_user, get_current_user
 
 router = APIRouter()
@@ -29,7 +29,7 @@ def register_user(user: UserRegister, db: Session = Depends(get_db)):
         )
     
     # Hashear la contraseña
-    hashed_password = get_password_hash(user.password)
+    hashed_password = password_pool.hashear_sync(user.password)
     
     # Crear usuario
     db_user = User(
@@ -48,7 +48,7 @@ def register_user(user: UserRegister, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener token de acceso"""
     user = await authenticate_user(db, form_data.username, form_data.password)
@@ -60,8 +60,8 @@ async def login_for_access_token(
         )
     
     # Actualizar last_login
-    user.last_login = func.now()
-    db.commit()
+    await db.execute(update(User).where(User.id == user.id).values(last_login=func.now()))
+    await db.commit()
     
     # Crear token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -1,33 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from app.database import get_db
 from app.models.database_models import Category
 from app.models.pydantic_models import CategoryCreate, CategoryResponse
-from app.security.auth import get_current_active_user
+from app.security.auth import get_current_active_principal
+from app.security.principal_cache import UserPrincipal
+from app.services.response_cache import response_cache
+from app.utils.pagination import paginar
 
 router = APIRouter()
 
 @router.get("/", response_model=List[CategoryResponse])
 def get_categories(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener categorías del usuario actual"""
-    categories = db.query(Category).filter(
+    query = db.query(Category).filter(
         Category.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return categories
+    )
+    return response_cache.responder(
+        request, response, "categories", current_user.id, List[CategoryResponse],
+        lambda: paginar(query, Category.created_at, Category.id, response, skip=skip, limit=limit, cursor=cursor)
+    )
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 def get_category(
     category_id: UUID, 
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener una categoría específica por ID"""
     category = db.query(Category).filter(
@@ -45,7 +54,7 @@ def get_category(
 def create_category(
     category: CategoryCreate, 
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Crear una nueva categoría para el usuario actual"""
     existing_category = db.query(Category).filter(
@@ -61,6 +70,7 @@ def create_category(
     
     db_category = Category(**category.dict(), user_id=current_user.id)
     db.add(db_category)
+    response_cache.invalidar_tras_commit(db, [current_user.id], "categories")
     db.commit()
     db.refresh(db_category)
     return db_category
@@ -70,7 +80,7 @@ def update_category(
     category_id: UUID, 
     category_update: CategoryCreate, 
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Actualizar una categoría existente"""
     db_category = db.query(Category).filter(
@@ -86,6 +96,7 @@ def update_category(
     for field, value in category_update.dict(exclude_unset=True).items():
         setattr(db_category, field, value)
     
+    response_cache.invalidar_tras_commit(db, [current_user.id], "categories")
     db.commit()
     db.refresh(db_category)
     return db_category
@@ -94,7 +105,7 @@ def update_category(
 def delete_category(
     category_id: UUID, 
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Eliminar una categoría"""
     db_category = db.query(Category).filter(
@@ -108,5 +119,7 @@ def delete_category(
         )
     
     db.delete(db_category)
+    # Las tareas de la categoría quedan con category_id a NULL
+    response_cache.invalidar_tras_commit(db, [current_user.id], "categories", "tasks")
     db.commit()
     return {"message": "Category deleted successfully"}
\ No newline at end of file
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
@@ -7,19 +8,24 @@ from datetime import datetime, date
 from app.database import get_db
 from app.models.database_models import EnergyLog, Task
 from app.models.pydantic_models import EnergyLogCreate, EnergyLogResponse
-from app.security.auth import get_current_active_user
+from app.security.auth import get_current_active_principal
+from app.security.principal_cache import UserPrincipal
+from app.services.export_service import exportar_filas, validar_formato
+from app.utils.pagination import paginar
 
 router = APIRouter()
 
 @router.get("/", response_model=List[EnergyLogResponse])
 def get_energy_logs(
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     task_id: Optional[UUID] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener logs de energía del usuario actual"""
     query = db.query(EnergyLog).filter(EnergyLog.user_id == current_user.id)
@@ -32,14 +38,42 @@ def get_energy_logs(
     if task_id:
         query = query.filter(EnergyLog.task_id == task_id)
     
-    logs = query.order_by(EnergyLog.logged_at.desc()).offset(skip).limit(limit).all()
-    return logs
+    return paginar(query, EnergyLog.logged_at, EnergyLog.id, response, skip=skip, limit=limit, cursor=cursor)
+
+@router.get("/export")
+def export_energy_logs(
+    format: str = "ndjson",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    task_id: Optional[UUID] = None,
+    current_user: UserPrincipal = Depends(get_current_active_principal)
+):
+    """Exportar todos los logs de energía del usuario actual en streaming (NDJSON o CSV)"""
+    media_type = validar_formato(format)
+    
+    filtros = [EnergyLog.user_id == current_user.id]
+    if start_date:
+        filtros.append(EnergyLog.logged_at >= start_date)
+    if end_date:
+        filtros.append(EnergyLog.logged_at <= datetime.combine(end_date, datetime.max.time()))
+    if task_id:
+        filtros.append(EnergyLog.task_id == task_id)
+    
+    columnas = [
+        EnergyLog.id, EnergyLog.user_id, EnergyLog.task_id, EnergyLog.energy_level,
+        EnergyLog.notes, EnergyLog.logged_at
+    ]
+    return StreamingResponse(
+        exportar_filas(columnas, filtros, [EnergyLog.logged_at, EnergyLog.id], format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=energy_logs.{format}"}
+    )
 
 @router.get("/{log_id}", response_model=EnergyLogResponse)
 def get_energy_log(
     log_id: UUID, 
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener un log de energía específico por ID"""
     energy_log = db.query(EnergyLog).filter(
@@ -57,11 +91,11 @@ def get_energy_log(
 def create_energy_log(
     energy_log: EnergyLogCreate,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Crear un nuevo log de energía"""
     if energy_log.task_id:
-        task = db.query(Task).filter(
+        task = db.query(Task.id).filter(
             Task.id == energy_log.task_id,
             Task.user_id == current_user.id
         ).first()
@@ -83,7 +117,7 @@ def update_energy_log(
     log_id: UUID,
     energy_log_update: EnergyLogCreate,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Actualizar un log de energía existente"""
     db_energy_log = db.query(EnergyLog).filter(
@@ -107,7 +141,7 @@ def update_energy_log(
 def delete_energy_log(
     log_id: UUID, 
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Eliminar un log de energía"""
     db_energy_log = db.query(EnergyLog).filter(
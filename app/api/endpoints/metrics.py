@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends
+
+from app.database import estado_pools
+from app.security.dependencies import get_current_admin
+from app.security.password_pool import password_pool
+from app.security.principal_cache import UserPrincipal, principal_cache
+from app.services.audit_log import audit_writer
+from app.services.ml_executor import ml_executor
+from app.services.model_cache import model_cache
+from app.services.response_cache import response_cache
+from app.services.training_queue import training_queue
+
+router = APIRouter()
+
+@router.get("/password-pool")
+def get_password_pool_metrics(current_user: UserPrincipal = Depends(get_current_admin)):
+    """Estado del pool de bcrypt: operaciones en cola, en curso, completadas y rechazadas (solo admin)"""
+    return password_pool.stats()
+
+@router.get("/auth-cache")
+def get_auth_cache_metrics(current_user: UserPrincipal = Depends(get_current_admin)):
+    """Aciertos y fallos de la caché de usuarios autenticados de este proceso (solo admin)"""
+    return principal_cache.stats()
+
+@router.get("/db-pool")
+def get_db_pool_metrics(current_user: UserPrincipal = Depends(get_current_admin)):
+    """Conexiones en uso, overflow y tiempo de espera de los pools de base de datos de este proceso (solo admin)"""
+    return estado_pools()
+
+@router.get("/audit")
+def get_audit_metrics(current_user: UserPrincipal = Depends(get_current_admin)):
+    """Eventos de historial en buffer, escritos y descartados por el escritor de auditoría de este proceso (solo admin)"""
+    return audit_writer.stats()
+
+@router.get("/response-cache")
+def get_response_cache_metrics(current_user: UserPrincipal = Depends(get_current_admin)):
+    """Aciertos, fallos, respuestas 304 e invalidaciones de la caché de respuestas de este proceso (solo admin)"""
+    return response_cache.stats()
+
+@router.get("/ml")
+def get_ml_metrics(current_user: UserPrincipal = Depends(get_current_admin)):
+    """Cola del ejecutor de inferencia, cola de entrenamiento y caché de modelos de este proceso (solo admin)"""
+    return {
+        "executor": ml_executor.stats(),
+        "training": training_queue.stats(),
+        "model_cache": model_cache.stats(),
+    }
@@ -1,14 +1,27 @@
 # app/api/endpoints/ml_tasks.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from app.database import get_db
-from app.models.database_models import Task, User, TaskMLData, MLFeedback
-from app.models.pydantic_models import TaskResponse
-from app.security.auth import get_current_active_user
-from app.services.ai_service import TaskAgent
+from app.database import get_db, get_async_db
+from app.models.database_models import Task, MLFeedback, AIModel
+from app.models.pydantic_models import (
+    TaskResponse, TrainingJobResponse, BatchScoringRequest, BatchScoringJobResponse,
+    AIModelResponse, AIModelDetailResponse
+)
+from app.security.auth import get_current_active_principal
+from app.security.principal_cache import UserPrincipal
+from app.security.dependencies import get_current_admin
+from app.services.ai_service import recomendar_horario
+from app.services.training_queue import training_queue
+from app.services.batch_scoring_queue import batch_scoring_queue
+from app.services.task_service import TaskService
+from app.services.ml_materialization import leer_tareas_priorizadas
+from app.services.response_cache import response_cache
+from app.utils.pagination import paginar
 
 router = APIRouter()
 
@@ -17,55 +30,152 @@ class MLTaskResponse(TaskResponse):
     recommended_schedule: str = None
 
 @router.get("/prioritized", response_model=List[MLTaskResponse])
-def get_prioritized_tasks(
+async def get_prioritized_tasks(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
-    """Obtener tareas ordenadas por el modelo ML"""
-    # Obtener tareas pendientes
-    tasks = db.query(Task).filter(
-        Task.user_id == current_user.id,
-        Task.status.in_(['pending', 'in_progress'])
-    ).offset(skip).limit(limit).all()
-
-    # Usar el agente ML para priorizar
-    agent = TaskAgent(db, current_user.id)
-    prioritized_tasks = agent.predecir_prioridad_tareas(tasks)
+    """Obtener tareas ordenadas por el modelo ML (puntajes materializados en TaskMLData)"""
+    prioritized_tasks = await leer_tareas_priorizadas(db, current_user.id, skip=skip, limit=limit)
     
     # Convertir a respuesta
     response = []
     for task_data in prioritized_tasks:
         task_dict = TaskResponse.from_orm(task_data['task_obj']).dict()
         task_dict['ml_priority_score'] = task_data['puntaje_ml']
+        task_dict['recommended_schedule'] = task_data['recommended_schedule']
         response.append(MLTaskResponse(**task_dict))
     
     return response
 
-@router.post("/{task_id}/train")
+@router.post("/batch/prioritize", response_model=BatchScoringJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def batch_prioritize(
+    request: BatchScoringRequest,
+    current_user: UserPrincipal = Depends(get_current_admin)
+):
+    """Encolar el precálculo de prioridades de las tareas pendientes de varios usuarios (solo admin)"""
+    return batch_scoring_queue.solicitar(request.user_ids)
+
+@router.get("/batch/jobs/{job_id}", response_model=BatchScoringJobResponse)
+def get_batch_prioritize_job(
+    job_id: UUID,
+    current_user: UserPrincipal = Depends(get_current_admin)
+):
+    """Consultar el estado de una priorización masiva (solo admin)"""
+    job = batch_scoring_queue.obtener(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch job not found"
+        )
+    return job
+
+@router.post("/{task_id}/train", status_code=status.HTTP_202_ACCEPTED)
 def train_model_for_task(
     task_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
-    """Entrenar modelo cuando se completa una tarea"""
-    agent = TaskAgent(db, current_user.id)
-    success = agent.entrenar_modelo_prioridad()
+    """
+    Encolar el reentrenamiento del modelo cuando se completa una tarea.
+
+    El trabajo se registra en memoria del proceso que atiende la petición:
+    con varios workers, GET /training-jobs/{job_id} solo lo encuentra si lo
+    atiende ese mismo proceso.
+    """
+    TaskService.get_user_task(db, task_id, current_user.id)
+    job = training_queue.solicitar(current_user.id)
     
     return {
-        "message": "Modelo actualizado exitosamente" if success else "No hay suficientes datos para entrenar",
-        "trained": success
+        "message": "Entrenamiento encolado",
+        "job_id": job.id,
+        "status": job.status
     }
 
+@router.get("/training-jobs/{job_id}", response_model=TrainingJobResponse)
+def get_training_job(
+    job_id: UUID,
+    current_user: UserPrincipal = Depends(get_current_active_principal)
+):
+    """Consultar el estado de un trabajo de entrenamiento"""
+    job = training_queue.obtener(job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training job not found"
+        )
+    return job
+
+# Metadatos de un modelo sin leer el blob: octet_length solo consulta la cabecera TOAST
+COLUMNAS_METADATOS_MODELO = [
+    AIModel.id, AIModel.user_id, AIModel.model_type, AIModel.model_version,
+    AIModel.is_active, AIModel.trained_at,
+    func.octet_length(AIModel.model_data).label("size_bytes")
+]
+
+@router.get("/models", response_model=List[AIModelResponse])
+def get_models(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_principal)
+):
+    """Listar los modelos entrenados del usuario actual (solo metadatos)"""
+    query = db.query(*COLUMNAS_METADATOS_MODELO).filter(AIModel.user_id == current_user.id)
+    return paginar(query, AIModel.trained_at, AIModel.id, response, skip=skip, limit=limit, cursor=cursor)
+
+@router.get("/models/all", response_model=List[AIModelResponse])
+def get_all_models(
+    response: Response,
+    user_id: Optional[UUID] = None,
+    active_only: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_admin)
+):
+    """Listar los modelos de todos los usuarios o de uno (solo admin, solo metadatos)"""
+    query = db.query(*COLUMNAS_METADATOS_MODELO)
+    if user_id:
+        query = query.filter(AIModel.user_id == user_id)
+    if active_only:
+        query = query.filter(AIModel.is_active == True)
+    return paginar(query, AIModel.trained_at, AIModel.id, response, skip=skip, limit=limit, cursor=cursor)
+
+@router.get("/models/{model_id}", response_model=AIModelDetailResponse)
+def get_model(
+    model_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_principal)
+):
+    """Obtener los metadatos y métricas de un modelo (sin el modelo serializado)"""
+    query = db.query(
+        *COLUMNAS_METADATOS_MODELO, AIModel.feature_weights, AIModel.accuracy_metrics
+    ).filter(AIModel.id == model_id)
+    if not current_user.is_admin:
+        query = query.filter(AIModel.user_id == current_user.id)
+
+    model = query.first()
+    if not model:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Model not found"
+        )
+    return model
+
 @router.get("/{task_id}/recommended-time")
 def get_recommended_time(
     task_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener horario recomendado para una tarea"""
-    task = db.query(Task).filter(
+    # Solo usa energía y título: ni la fila completa ni el modelo del usuario
+    task = db.query(Task.title, Task.energy_required).filter(
         Task.id == task_id,
         Task.user_id == current_user.id
     ).first()
@@ -76,8 +186,7 @@ def get_recommended_time(
             detail="Task not found"
         )
     
-    agent = TaskAgent(db, current_user.id)
-    recommended_time = agent.recomendar_horario(task)
+    recommended_time = recomendar_horario(task)
     
     return {
         "task_id": task_id,
@@ -93,10 +202,10 @@ def submit_ml_feedback(
     actual_priority: str = None,
     actual_completion_time: int = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Enviar feedback sobre las predicciones del ML"""
-    task = db.query(Task).filter(
+    task = db.query(Task.id).filter(
         Task.id == task_id,
         Task.user_id == current_user.id
     ).first()
@@ -117,20 +226,25 @@ def submit_ml_feedback(
     )
     
     db.add(feedback)
+    response_cache.invalidar_tras_commit(db, [current_user.id], "ml_feedback")
     db.commit()
     
-    # Si el feedback es negativo, reentrenar el modelo
+    # Si el feedback es negativo, encolar el reentrenamiento del modelo
     if not was_useful:
-        agent = TaskAgent(db, current_user.id)
-        agent.entrenar_modelo_prioridad()
+        job = training_queue.solicitar(current_user.id)
+        return {"message": "Feedback registrado exitosamente", "training_job_id": job.id}
     
     return {"message": "Feedback registrado exitosamente"}
 
 @router.get("/feedback/useful", response_model=List[bool])
 def get_useful_feedback(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener todos los valores 'was_useful' del feedback de ML del usuario"""
-    feedbacks = db.query(MLFeedback).filter(MLFeedback.user_id == current_user.id).all()
-    return [f.was_useful for f in feedbacks if f.was_useful is not None]
\ No newline at end of file
+    def producir():
+        feedbacks = db.query(MLFeedback).filter(MLFeedback.user_id == current_user.id).all()
+        return [f.was_useful for f in feedbacks if f.was_useful is not None]
+    return response_cache.responder(request, response, "ml_feedback", current_user.id, List[bool], producir)
\ No newline at end of file
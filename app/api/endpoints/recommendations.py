@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
@@ -7,19 +7,25 @@ from datetime import date
 from app.database import get_db
 from app.models.database_models import DailyRecommendation, Task
 from app.models.pydantic_models import DailyRecommendationCreate, DailyRecommendationResponse
-from app.security.auth import get_current_active_user
+from app.security.auth import get_current_active_principal
+from app.security.principal_cache import UserPrincipal
+from app.services.response_cache import response_cache
+from app.utils.pagination import paginar
 
 router = APIRouter()
 
 @router.get("/", response_model=List[DailyRecommendationResponse])
 def get_recommendations(
+    request: Request,
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     status: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener recomendaciones diarias del usuario actual"""
     query = db.query(DailyRecommendation).filter(
@@ -33,14 +39,19 @@ def get_recommendations(
     if status:
         query = query.filter(DailyRecommendation.status == status)
     
-    recommendations = query.offset(skip).limit(limit).all()
-    return recommendations
+    return response_cache.responder(
+        request, response, "recommendations", current_user.id, List[DailyRecommendationResponse],
+        lambda: paginar(
+            query, DailyRecommendation.created_at, DailyRecommendation.id, response,
+            skip=skip, limit=limit, cursor=cursor
+        )
+    )
 
 @router.get("/{recommendation_id}", response_model=DailyRecommendationResponse)
 def get_recommendation(
     recommendation_id: UUID, 
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener una recomendación específica por ID"""
     recommendation = db.query(DailyRecommendation).filter(
@@ -59,7 +70,7 @@ def get_recommendation(
 def create_recommendation(
     recommendation: DailyRecommendationCreate,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Crear una nueva recomendación diaria"""
     existing_recommendation = db.query(DailyRecommendation).filter(
@@ -73,7 +84,7 @@ def create_recommendation(
             detail="Recommendation already exists for this date"
         )
     
-    task = db.query(Task).filter(
+    task = db.query(Task.id).filter(
         Task.id == recommendation.task_id,
         Task.user_id == current_user.id
     ).first()
@@ -90,6 +101,7 @@ def create_recommendation(
     )
     
     db.add(db_recommendation)
+    response_cache.invalidar_tras_commit(db, [current_user.id], "recommendations")
     db.commit()
     db.refresh(db_recommendation)
     return db_recommendation
@@ -99,7 +111,7 @@ def update_recommendation(
     recommendation_id: UUID,
     recommendation_update: DailyRecommendationCreate,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Actualizar una recomendación existente"""
     db_recommendation = db.query(DailyRecommendation).filter(
@@ -116,6 +128,7 @@ def update_recommendation(
     for field, value in recommendation_update.dict(exclude_unset=True).items():
         setattr(db_recommendation, field, value)
     
+    response_cache.invalidar_tras_commit(db, [current_user.id], "recommendations")
     db.commit()
     db.refresh(db_recommendation)
     return db_recommendation
@@ -125,7 +138,7 @@ def update_recommendation_status(
     recommendation_id: UUID,
     status: str,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Actualizar el estado de una recomendación"""
     valid_statuses = ['pending', 'accepted', 'rejected', 'postponed']
@@ -147,6 +160,7 @@ def update_recommendation_status(
         )
     
     db_recommendation.status = status
+    response_cache.invalidar_tras_commit(db, [current_user.id], "recommendations")
     db.commit()
     
     return {"message": "Recommendation status updated successfully"}
@@ -155,7 +169,7 @@ def update_recommendation_status(
 def delete_recommendation(
     recommendation_id: UUID, 
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Eliminar una recomendación"""
     db_recommendation = db.query(DailyRecommendation).filter(
@@ -170,5 +184,6 @@ def delete_recommendation(
         )
     
     db.delete(db_recommendation)
+    response_cache.invalidar_tras_commit(db, [current_user.id], "recommendations")
     db.commit()
     return {"message": "Recommendation deleted successfully"}
\ No newline at end of file
@@ -1,59 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
+from datetime import datetime, date
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.database_models import TaskHistory, Task
 from app.models.pydantic_models import TaskHistoryResponse
-from app.security.auth import get_current_active_user
+from app.security.auth import get_current_active_principal
+from app.security.principal_cache import UserPrincipal
+from app.services.export_service import exportar_filas, validar_formato
+from app.utils.pagination import paginar_async
 
 router = APIRouter()
 
+def _filtros_fecha(start_date: Optional[date], end_date: Optional[date]) -> list:
+    """Rango de created_at; además de filtrar, limita las particiones mensuales consultadas"""
+    filtros = []
+    if start_date:
+        filtros.append(TaskHistory.created_at >= start_date)
+    if end_date:
+        filtros.append(TaskHistory.created_at <= datetime.combine(end_date, datetime.max.time()))
+    return filtros
+
 @router.get("/task/{task_id}", response_model=List[TaskHistoryResponse])
-def get_task_history(
+async def get_task_history(
     task_id: UUID,
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener historial de cambios de una tarea específica"""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
-    if not task:
+    task_id_propio = (await db.execute(
+        select(Task.id).where(Task.id == task_id, Task.user_id == current_user.id)
+    )).scalar_one_or_none()
+    if not task_id_propio:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    history = db.query(TaskHistory).filter(
-        TaskHistory.task_id == task_id
-    ).order_by(TaskHistory.created_at.desc()).offset(skip).limit(limit).all()
-    
-    return history
+    stmt = select(TaskHistory).where(TaskHistory.task_id == task_id, *_filtros_fecha(start_date, end_date))
+    return await paginar_async(
+        db, stmt, TaskHistory.created_at, TaskHistory.id, response, skip=skip, limit=limit, cursor=cursor
+    )
 
 @router.get("/user/", response_model=List[TaskHistoryResponse])
-def get_user_task_history(
+async def get_user_task_history(
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener historial de cambios de todas las tareas del usuario actual"""
-    history = db.query(TaskHistory).filter(
-        TaskHistory.user_id == current_user.id
-    ).order_by(TaskHistory.created_at.desc()).offset(skip).limit(limit).all()
+    stmt = select(TaskHistory).where(TaskHistory.user_id == current_user.id, *_filtros_fecha(start_date, end_date))
+    return await paginar_async(
+        db, stmt, TaskHistory.created_at, TaskHistory.id, response, skip=skip, limit=limit, cursor=cursor
+    )
+
+@router.get("/export")
+def export_task_history(
+    format: str = "ndjson",
+    task_id: Optional[UUID] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: UserPrincipal = Depends(get_current_active_principal)
+):
+    """Exportar todo el historial del usuario actual en streaming (NDJSON o CSV)"""
+    media_type = validar_formato(format)
+    
+    filtros = [TaskHistory.user_id == current_user.id, *_filtros_fecha(start_date, end_date)]
+    if task_id:
+        filtros.append(TaskHistory.task_id == task_id)
     
-    return history
+    columnas = [
+        TaskHistory.id, TaskHistory.task_id, TaskHistory.user_id, TaskHistory.change_type,
+        TaskHistory.old_values, TaskHistory.new_values, TaskHistory.change_description,
+        TaskHistory.created_at
+    ]
+    return StreamingResponse(
+        exportar_filas(columnas, filtros, [TaskHistory.created_at, TaskHistory.id], format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=task_history.{format}"}
+    )
 
 @router.get("/{history_id}", response_model=TaskHistoryResponse)
 def get_history_entry(
     history_id: UUID, 
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener una entrada específica del historial"""
     history_entry = db.query(TaskHistory).filter(
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from fastapi.encoders import jsonable_encoder
 from uuid import UUID
 
-from app.database import get_db
-from app.models.database_models import Task, User, Category, TaskHistory
-from app.models.pydantic_models import TaskCreate, TaskResponse
-from app.security.auth import get_current_active_user
+from app.database import get_db, get_async_db
+from app.models.database_models import Task, Category
+from app.config import settings
+from app.models.pydantic_models import TaskCreate, TaskResponse, TaskBulkCreate, TaskBulkResponse
+from app.security.auth import get_current_active_principal
+from app.security.principal_cache import UserPrincipal
+from app.services.response_cache import response_cache
 from app.services.task_service import TaskService
+from app.utils.pagination import paginar_async
 
 router = APIRouter()
 
@@ -17,15 +21,18 @@ router = APIRouter()
 VALID_STATUSES = ['pending', 'in_progress', 'completed', 'archived', 'postponed']
 
 @router.get("/", response_model=List[TaskResponse])
-def get_tasks(
+async def get_tasks(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user) 
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_active_principal) 
 ):
     """Obtener lista de tareas del usuario actual"""
-    query = db.query(Task).filter(Task.user_id == current_user.id)
+    stmt = select(Task).where(Task.user_id == current_user.id)
     
     if status:
         if status not in VALID_STATUSES:
@@ -33,16 +40,18 @@ def get_tasks(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Status must be one of: {', '.join(VALID_STATUSES)}"
             )
-        query = query.filter(Task.status == status)
+        stmt = stmt.where(Task.status == status)
     
-    tasks = query.offset(skip).limit(limit).all()
-    return tasks
+    return await response_cache.responder_async(
+        request, response, "tasks", current_user.id, List[TaskResponse],
+        lambda: paginar_async(db, stmt, Task.created_at, Task.id, response, skip=skip, limit=limit, cursor=cursor)
+    )
 
 @router.get("/{task_id}", response_model=TaskResponse)
 def get_task(
     task_id: UUID, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)  
+    current_user: UserPrincipal = Depends(get_current_active_principal)  
 ):
     """Obtener una tarea específica por ID"""
     task = db.query(Task).filter(
@@ -60,7 +69,7 @@ def get_task(
 def create_task(
     task: TaskCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user) 
+    current_user: UserPrincipal = Depends(get_current_active_principal) 
 ):
     """Crear una nueva tarea para el usuario actual con cálculo automático de prioridad"""
     
@@ -73,56 +82,38 @@ def create_task(
     
     return db_task
 
+@router.post("/bulk", response_model=TaskBulkResponse)
+def create_tasks_bulk(
+    payload: TaskBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_principal)
+):
+    """Crear muchas tareas en una sola transacción; los elementos inválidos se devuelven en `errors`"""
+    if len(payload.tasks) > settings.TASK_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.TASK_BULK_MAX_ITEMS} tasks per request"
+        )
+
+    db_tasks, errors = TaskService.create_tasks_bulk(db, payload.tasks, current_user.id)
+    return {"created": db_tasks, "errors": errors}
+
 @router.put("/{task_id}", response_model=TaskResponse)
 def update_task(
     task_id: UUID, 
     task_update: TaskCreate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Actualizar una tarea existente"""
-    db_task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id 
-    ).first()
-    if not db_task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
-    # Guardar el estado anterior para el historial
-    old_status = db_task.status
-    
-    for field, value in task_update.dict(exclude_unset=True).items():
-        setattr(db_task, field, value)
-    
-    db.commit()
-    db.refresh(db_task)
-    
-    # Registrar cambios en el historial si hubo modificaciones
-    if task_update.dict(exclude_unset=True):
-        serialized_values = jsonable_encoder(task_update.dict(exclude_unset=True))
-        history_entry = TaskHistory(
-            task_id=task_id,
-            user_id=current_user.id,
-            change_type='updated',
-            new_values=serialized_values,
-            change_description='Task updated'
-        )
-        db.add(history_entry)
-        db.commit()
-    
-    TaskService.recalculate_task_priority(db, task_id, current_user.id)
-    
-    return db_task
+    return TaskService.update_task(db, task_id, current_user.id, task_update.dict(exclude_unset=True))
 
 @router.patch("/{task_id}/status")
 def update_task_status(
     task_id: UUID,
     status: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Actualizar solo el estado de una tarea"""
     if status not in VALID_STATUSES:
@@ -131,41 +122,7 @@ def update_task_status(
             detail=f"Status must be one of: {', '.join(VALID_STATUSES)}"
         )
     
-    db_task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
-    
-    if not db_task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
-    # Guardar estado anterior para el historial
-    old_status = db_task.status
-    
-    # Actualizar estado
-    db_task.status = status
-    
-    # Si se marca como completada, registrar fecha de completado
-    if status == 'completed' and not db_task.completed_at:
-        db_task.completed_at = func.now()
-    
-    db.commit()
-    db.refresh(db_task)
-    
-    # Registrar cambio de estado en el historial
-    history_entry = TaskHistory(
-        task_id=task_id,
-        user_id=current_user.id,
-        change_type='status_changed',
-        old_values={'status': old_status},
-        new_values={'status': status},
-        change_description=f'Status changed from {old_status} to {status}'
-    )
-    db.add(history_entry)
-    db.commit()
+    TaskService.update_task_status(db, task_id, current_user.id, status)
     
     return {
         "message": f"Task status updated to {status}",
@@ -178,33 +135,9 @@ def update_task_status(
 def delete_task(
     task_id: UUID, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user) 
+    current_user: UserPrincipal = Depends(get_current_active_principal) 
 ):
     """Eliminar una tarea"""
-    db_task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
-    if not db_task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
-    # Registrar eliminación en el historial antes de borrar
-    history_entry = TaskHistory(
-        task_id=task_id,
-        user_id=current_user.id,
-        change_type='deleted',
-        old_values={
-            'title': db_task.title,
-            'status': db_task.status
-        },
-        change_description='Task deleted'
-    )
-    db.add(history_entry)
-    
-    db.delete(db_task)
-    db.commit()
+    TaskService.delete_task(db, task_id, current_user.id)
     
     return {"message": "Task deleted successfully"}
\ No newline at end of file
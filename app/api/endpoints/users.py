@@ -2,12 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
-import bcrypt
 
 from app.database import get_db
 from app.models.database_models import User
 from app.models.pydantic_models import UserCreate, UserResponse
-from app.security.auth import get_current_active_user, get_current_user
+from app.security.auth import get_current_active_user, get_current_active_principal
+from app.security.principal_cache import UserPrincipal, principal_cache
+from app.security.password_pool import password_pool
 
 router = APIRouter()
 
@@ -26,19 +27,16 @@ def validate_password(password: str) -> None:
         )
 
 def get_password_hash(password: str) -> str:
-    """Genera hash de contraseña usando bcrypt"""
+    """Genera hash de contraseña con bcrypt en el pool de contraseñas"""
     validate_password(password)
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+    return password_pool.hashear_sync(password)
 
 @router.get("/", response_model=List[UserResponse])
 def get_users(
     skip: int = 0, 
     limit: int = 100, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener lista de usuarios (solo admin)"""
     if not current_user.is_admin:
@@ -59,7 +57,7 @@ def get_current_user_info(current_user: User = Depends(get_current_active_user))
 def get_user(
     user_id: UUID, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Obtener un usuario específico por ID"""
     # Usuarios solo pueden ver su propia información, admins pueden ver cualquier usuario
@@ -107,7 +105,7 @@ def update_user(
     user_id: UUID, 
     user_update: UserCreate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal)
 ):
     """Actualizar un usuario existente"""
     # Usuarios solo pueden actualizar su propia información, admins pueden actualizar cualquier usuario
@@ -134,4 +132,5 @@ def update_user(
     
     db.commit()
     db.refresh(db_user)
+    principal_cache.invalidate(db_user.id)
     return db_user
\ No newline at end of file
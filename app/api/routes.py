@@ -9,6 +9,7 @@ from app.api.endpoints.energy_logs import router as energy_logs_router
 from app.api.endpoints.task_history import router as task_history_router
 from app.api.endpoints.auth import router as auth_router 
 from app.api.endpoints.ml_tasks import router as ml_tasks_router
+from app.api.endpoints.metrics import router as metrics_router
 
 api_router = APIRouter()
 
@@ -21,4 +22,5 @@ api_router.include_router(energy_logs_router, prefix="/energy_logs", tags=["ener
 api_router.include_router(task_history_router, prefix="/task_history", tags=["task_history"])
 
 
-api_router.include_router(ml_tasks_router, prefix="/ml_tasks", tags=["machine_learning"])
\ No newline at end of file
+api_router.include_router(ml_tasks_router, prefix="/ml_tasks", tags=["machine_learning"])
+api_router.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
@@ -1,11 +1,45 @@
+import os
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.utils.pool_metrics import AsyncQueuePoolInstrumentado, QueuePoolInstrumentado, instrumentar_pool
+
+# Parámetros comunes de los dos pools (cada proceso tiene los suyos)
+OPCIONES_POOL = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
+# statement_timeout se fija al abrir cada conexión; 0 lo deja sin límite
+_timeout_sentencias = str(settings.DB_STATEMENT_TIMEOUT_MS)
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=QueuePoolInstrumentado,
+    connect_args={"options": f"-c statement_timeout={_timeout_sentencias}"},
+    **OPCIONES_POOL
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Motor asíncrono (asyncpg) sobre la misma base para los endpoints async
+async_engine = create_async_engine(
+    make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    poolclass=AsyncQueuePoolInstrumentado,
+    connect_args={"server_settings": {"statement_timeout": _timeout_sentencias}},
+    **OPCIONES_POOL
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+metricas_pool = instrumentar_pool(engine.pool, "sync")
+metricas_pool_async = instrumentar_pool(async_engine.pool, "async")
+
 Base = declarative_base()
 
 def get_db():
@@ -13,4 +47,25 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def estado_pools() -> dict:
+    """Conexiones en uso, overflow y tiempos de espera de los pools de este proceso"""
+    return {
+        "sync": metricas_pool.stats(engine.pool),
+        "async": metricas_pool_async.stats(async_engine.sync_engine.pool),
+    }
+
+def aplicar_migraciones(revision: str = "head"):
+    """Lleva el esquema a la revisión indicada con Alembic (equivale a `alembic upgrade head`)"""
+    from alembic import command
+    from alembic.config import Config
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(raiz, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(raiz, "alembic"))
+    command.upgrade(config, revision)
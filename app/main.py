@@ -1,11 +1,21 @@
+import logging
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.api.routes import api_router
-from app.database import engine, Base
+from app.database import async_engine
+from app.services.training_queue import training_queue
+from app.services.batch_scoring_queue import batch_scoring_queue
+from app.services.ml_executor import ml_executor
+from app.security.password_pool import password_pool
+from app.services.audit_log import audit_writer
+from app.services.partition_maintenance import mantener_particiones
+from app.utils.pagination import CABECERA_CURSOR
 
-# Crear tablas en la base de datos
-Base.metadata.create_all(bind=engine)
+# El esquema lo gestiona Alembic (alembic upgrade head): importar la app no toca la base
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Smart Task API",
@@ -22,11 +32,55 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[CABECERA_CURSOR],
 )
 
 # Incluir rutas
 app.include_router(api_router, prefix="/api/v1")
 
+def _crear_particiones():
+    # Solo crea las particiones de los próximos meses; la retención la aplica
+    # scripts/mantener_particiones.py. Si falla, las filas caen en la partición DEFAULT
+    try:
+        mantener_particiones(retencion=False)
+    except Exception as e:
+        logger.error(f"❌ No se pudieron crear las particiones: {e}")
+
+@app.on_event("startup")
+def startup_partitions():
+    # En segundo plano: el worker empieza a atender sin esperar a la base
+    if settings.PARTITION_MAINTENANCE_ON_STARTUP:
+        threading.Thread(target=_crear_particiones, name="partition-maintenance", daemon=True).start()
+
+@app.on_event("startup")
+def startup_ml_executor():
+    # Arranca los procesos de inferencia en segundo plano para que la primera petición no pague el spawn
+    threading.Thread(target=ml_executor.calentar, name="ml-executor-warmup", daemon=True).start()
+
+@app.on_event("shutdown")
+def shutdown_training_queue():
+    training_queue.cerrar()
+
+@app.on_event("shutdown")
+def shutdown_batch_scoring_queue():
+    batch_scoring_queue.cerrar()
+
+@app.on_event("shutdown")
+def shutdown_ml_executor():
+    ml_executor.cerrar()
+
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    password_pool.cerrar()
+
+@app.on_event("shutdown")
+def shutdown_audit_writer():
+    audit_writer.cerrar()
+
+@app.on_event("shutdown")
+async def shutdown_async_engine():
+    await async_engine.dispose()
+
 @app.get("/")
 async def root():
     return {"message": "Task Priority AI API", "version": "1.0.0"}
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, DECIMAL, Date, LargeBinary, CheckConstraint
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, DECIMAL, Date, LargeBinary, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.sql import func
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func, text
 from app.database import Base
 import uuid
 
@@ -35,7 +36,12 @@ class Category(Base):
     name = Column(String(100), nullable=False)
     color = Column(String(7), default='#007bff')
     description = Column(Text)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, nullable=False, default=func.current_timestamp(), server_default=func.current_timestamp())
+    
+    __table_args__ = (
+        Index("ix_categories_user_name", "user_id", "name"),
+        Index("ix_categories_user_created", "user_id", created_at.desc(), id.desc()),
+    )
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -59,7 +65,7 @@ class Task(Base):
     status = Column(String(20), default='pending')
     energy_required = Column(String(20))
     
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, nullable=False, default=func.current_timestamp(), server_default=func.current_timestamp())
     updated_at = Column(DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp())
     completed_at = Column(DateTime)
     actual_duration = Column(Integer)
@@ -72,6 +78,19 @@ class Task(Base):
         CheckConstraint("completion_probability >= 0 AND completion_probability <= 1", name="ck_task_completion_prob"),
         CheckConstraint("status IN ('pending', 'in_progress', 'completed', 'archived', 'postponed')", name="ck_task_status"),
         CheckConstraint("energy_required IN ('low', 'medium', 'high')", name="ck_task_energy_required"),
+        Index("ix_tasks_user_status", "user_id", "status"),
+        # Paginación por cursor (created_at, id)
+        Index("ix_tasks_user_created", "user_id", created_at.desc(), id.desc()),
+        # Tareas pendientes por deadline (priorización y refresco de prioridades)
+        Index(
+            "ix_tasks_user_deadline_pendientes", "user_id", "deadline",
+            postgresql_where=text("status IN ('pending', 'in_progress')")
+        ),
+        # Refresco de prioridades: rangos de deadline de todos los usuarios, paginados por (deadline, id)
+        Index(
+            "ix_tasks_deadline_pendientes", "deadline", "id",
+            postgresql_where=text("status IN ('pending', 'in_progress')")
+        ),
     )
 
 class TaskHistory(Base):
@@ -86,7 +105,14 @@ class TaskHistory(Base):
     new_values = Column(JSONB)
     change_description = Column(Text)
     
-    created_at = Column(DateTime, default=func.current_timestamp())
+    # Clave de partición (particiones mensuales, ver app/services/partition_maintenance.py)
+    created_at = Column(DateTime, primary_key=True, default=func.current_timestamp())
+    
+    __table_args__ = (
+        Index("ix_task_history_task_created", "task_id", created_at.desc(), id.desc()),
+        Index("ix_task_history_user_created", "user_id", created_at.desc(), id.desc()),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
 class DailyRecommendation(Base):
     __tablename__ = "daily_recommendations"
@@ -103,11 +129,15 @@ class DailyRecommendation(Base):
     completed_on_time = Column(Boolean)
     
     recommendation_date = Column(Date, nullable=False)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, nullable=False, default=func.current_timestamp(), server_default=func.current_timestamp())
     
     __table_args__ = (
         CheckConstraint("confidence_score >= 0 AND confidence_score <= 1", name="ck_recommendation_confidence"),
         CheckConstraint("status IN ('pending', 'accepted', 'rejected', 'postponed')", name="ck_recommendation_status"),
+        Index("ix_daily_recommendations_user_date", "user_id", "recommendation_date"),
+        Index("ix_daily_recommendations_user_created", "user_id", created_at.desc(), id.desc()),
+        # Borrado en cascada de tareas
+        Index("ix_daily_recommendations_task", "task_id"),
     )
 
 class EnergyLog(Base):
@@ -120,10 +150,15 @@ class EnergyLog(Base):
     energy_level = Column(String(20), nullable=False)
     notes = Column(Text)
     
-    logged_at = Column(DateTime, default=func.current_timestamp())
+    # Clave de partición (particiones mensuales, ver app/services/partition_maintenance.py)
+    logged_at = Column(DateTime, primary_key=True, default=func.current_timestamp())
     
     __table_args__ = (
         CheckConstraint("energy_level IN ('low', 'medium', 'high')", name="ck_energy_log_level"),
+        Index("ix_energy_logs_user_logged", "user_id", logged_at.desc(), id.desc()),
+        # Filtro por tarea y SET NULL al borrar tareas
+        Index("ix_energy_logs_task", "task_id"),
+        {"postgresql_partition_by": "RANGE (logged_at)"},
     )
 
 class AIModel(Base):
@@ -135,12 +170,18 @@ class AIModel(Base):
     model_type = Column(String(50), nullable=False)
     model_version = Column(String(20), nullable=False)
     
-    model_data = Column(LargeBinary)
-    feature_weights = Column(JSONB)
-    accuracy_metrics = Column(JSONB)
+    # Diferidas: cargar un AIModel no lee el blob (cientos de KB en TOAST) ni las
+    # métricas; se cargan al acceder al atributo o con undefer_group("binario"/"metricas")
+    model_data = deferred(Column(LargeBinary), group="binario")
+    feature_weights = deferred(Column(JSONB), group="metricas")
+    accuracy_metrics = deferred(Column(JSONB), group="metricas")
     
     is_active = Column(Boolean, default=False)
-    trained_at = Column(DateTime, default=func.current_timestamp())
+    trained_at = Column(DateTime, nullable=False, default=func.current_timestamp(), server_default=func.current_timestamp())
+    
+    __table_args__ = (
+        Index("ix_ai_models_user_active_trained", "user_id", "is_active", trained_at.desc()),
+    )
 
 class AIFeedback(Base):
     __tablename__ = "ai_feedback"
@@ -157,6 +198,11 @@ class AIFeedback(Base):
     
     feedback_date = Column(DateTime, default=func.current_timestamp())
     used_for_training = Column(Boolean, default=False)
+    
+    __table_args__ = (
+        # Borrado en cascada de tareas
+        Index("ix_ai_feedback_task", "task_id"),
+    )
 
 
 # Nuevo para IA
@@ -168,13 +214,19 @@ class TaskMLData(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     
     # Campos específicos para el modelo ML
-    ml_priority_score = Column(DECIMAL(5,4))  # Puntaje del modelo
+    ml_priority_score = Column(DECIMAL(8,4), nullable=False)  # Puntaje base (ML o reglas) sin ajustes contextuales
     predicted_completion_time = Column(Integer)  # Tiempo estimado en minutos
     recommended_schedule = Column(String(50))  # Horario recomendado
     features = Column(JSONB)  # Características extraídas para el ML
     
     created_at = Column(DateTime, default=func.current_timestamp())
     updated_at = Column(DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp())
+    
+    __table_args__ = (
+        UniqueConstraint("task_id", name="uq_task_ml_data_task_id"),
+        # Lectura de /prioritized: tareas del usuario ordenadas por puntaje
+        Index("ix_task_ml_data_user_score", "user_id", ml_priority_score.desc(), "task_id"),
+    )
 
 class MLFeedback(Base):
     __tablename__ = "ml_feedback"
@@ -188,4 +240,9 @@ class MLFeedback(Base):
     actual_priority = Column(String(20))  # Prioridad real que tuvo el usuario
     actual_completion_time = Column(Integer)  # Tiempo real que tomó
     
-    created_at = Column(DateTime, default=func.current_timestamp())
\ No newline at end of file
+    created_at = Column(DateTime, default=func.current_timestamp())
+    
+    __table_args__ = (
+        Index("ix_ml_feedback_task_created", "task_id", created_at.desc()),
+        Index("ix_ml_feedback_user_created", "user_id", created_at.desc()),
+    )
\ No newline at end of file
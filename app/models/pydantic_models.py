@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, date
 from uuid import UUID
 
@@ -77,6 +77,19 @@ class TaskResponse(TaskBase):
         from_attributes = True
 
 
+class TaskBulkCreate(BaseModel):
+    # Elementos sin validar: cada uno se valida por separado para informar errores por índice
+    tasks: List[Dict[str, Any]]
+
+class TaskBulkError(BaseModel):
+    index: int
+    detail: str
+
+class TaskBulkResponse(BaseModel):
+    created: List[TaskResponse]
+    errors: List[TaskBulkError]
+
+
 class CategoryBase(BaseModel):
     name: str
     color: Optional[str] = '#007bff'
@@ -157,4 +170,53 @@ class MLFeedbackBase(BaseModel):
     actual_completion_time: Optional[int] = None
 
 class MLFeedbackCreate(MLFeedbackBase):
-    task_id: UUID
\ No newline at end of file
+    task_id: UUID
+
+class TrainingJobResponse(BaseModel):
+    id: UUID
+    status: str
+    triggers: int
+    trained: Optional[bool] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class AIModelResponse(BaseModel):
+    id: UUID
+    user_id: UUID
+    model_type: str
+    model_version: str
+    is_active: bool
+    trained_at: Optional[datetime] = None
+    size_bytes: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+        # model_type/model_version son columnas de AIModel, no atributos de Pydantic
+        protected_namespaces = ()
+
+class AIModelDetailResponse(AIModelResponse):
+    feature_weights: Optional[Dict[str, Any]] = None
+    accuracy_metrics: Optional[Dict[str, Any]] = None
+
+class BatchScoringRequest(BaseModel):
+    user_ids: Optional[List[UUID]] = None
+
+class BatchScoringJobResponse(BaseModel):
+    id: UUID
+    status: str
+    users: Optional[int] = None
+    tasks: Optional[int] = None
+    seconds: Optional[float] = None
+    users_per_second: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
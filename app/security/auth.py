@@ -1,48 +1,87 @@
 from datetime import timedelta
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.database_models import User
-from app.security.config import SECRET_KEY, ALGORITHM, verify_password
+from app.security.config import SECRET_KEY, ALGORITHM
+from app.security.password_pool import password_pool
+from app.security.principal_cache import UserPrincipal, principal_cache
 
 # Configuración OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    # Cerrar la transacción devuelve la conexión al pool mientras bcrypt trabaja;
+    # si no, cada login en espera retendría una conexión
+    await db.commit()
+    if not await password_pool.verificar(password, user.password_hash):
         return False
     return user
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+def _user_id_from_token(token: str) -> uuid.UUID:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == user_id).first()
+            raise _credentials_exception()
+        return uuid.UUID(user_id)
+    except (JWTError, ValueError):
+        raise _credentials_exception()
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Usuario completo (fila ORM) para los endpoints que necesitan más que el id"""
+    user_id = _user_id_from_token(token)
+
+    user = await db.get(User, user_id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    principal_cache.put(UserPrincipal(user.id, user.is_active, user.is_admin))
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
+    """Principal (id, is_active, is_admin) del token; solo consulta la base si no está en caché"""
+    user_id = _user_id_from_token(token)
+
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        fila = (await db.execute(
+            select(User.id, User.is_active, User.is_admin).where(User.id == user_id)
+        )).first()
+        if fila is None:
+            raise _credentials_exception()
+        principal = UserPrincipal(fila.id, bool(fila.is_active), bool(fila.is_admin))
+        principal_cache.put(principal)
+    return principal
+
+async def get_current_active_principal(
+    current_user: UserPrincipal = Depends(get_current_principal)
+) -> UserPrincipal:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
@@ -1,9 +1,11 @@
-from fastapi import Depends
-from sqlalchemy.orm import Session
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.database_models import User
-from app.security.auth import get_current_active_user
+from app.security.auth import get_current_active_user, get_current_active_principal
+from app.security.principal_cache import UserPrincipal, principal_cache
 
 # Dependencia para obtener el usuario actual
 def get_current_user_dependency():
@@ -11,12 +13,25 @@ def get_current_user_dependency():
 
 # Dependencia para verificar si el usuario es admin (opcional)
 async def get_current_admin(
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not hasattr(current_user, 'is_admin') or not current_user.is_admin:
-        from fastapi import HTTPException, status
+    """
+    Principal del admin. is_admin e is_active se leen siempre de la base: el caché de
+    principales es de cada proceso y quitar el rol desde otro worker tardaría hasta
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS en verse. Los endpoints de admin son pocos.
+    """
+    fila = (await db.execute(
+        select(User.is_active, User.is_admin).where(User.id == current_user.id)
+    )).first()
+    if fila is not None and not fila.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    if fila is None or not fila.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user
\ No newline at end of file
+
+    principal = UserPrincipal(current_user.id, True, True)
+    principal_cache.put(principal)
+    return principal
\ No newline at end of file
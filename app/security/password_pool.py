@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.security.config import verify_password, get_password_hash
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordPool:
+    """
+    Pool de hilos acotado para bcrypt (hash y verificación).
+
+    bcrypt libera el GIL mientras calcula, así que los hilos trabajan en
+    paralelo sin bloquear el event loop. Como mucho max_workers operaciones
+    se ejecutan a la vez; el resto espera en cola hasta max_pendientes, y a
+    partir de ahí se rechaza con 503 en lugar de acumular latencia.
+    """
+
+    def __init__(self, max_workers: int, max_pendientes: int):
+        self.max_workers = max_workers
+        self.max_pendientes = max_pendientes
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password")
+        self._lock = threading.Lock()
+        self.en_cola = 0
+        self.en_curso = 0
+        self.max_cola_observada = 0
+        self.completadas = 0
+        self.rechazadas = 0
+        self._espera_total = 0.0
+
+    async def verificar(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._enviar(verify_password, plain_password, hashed_password))
+
+    async def hashear(self, password: str) -> str:
+        return await asyncio.wrap_future(self._enviar(get_password_hash, password))
+
+    def hashear_sync(self, password: str) -> str:
+        """Para endpoints síncronos: espera en su hilo, pero respeta el límite del pool"""
+        return self._enviar(get_password_hash, password).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pendientes,
+                "queued": self.en_cola,
+                "running": self.en_curso,
+                "max_queued_observed": self.max_cola_observada,
+                "completed": self.completadas,
+                "rejected": self.rechazadas,
+                "avg_wait_ms": round(self._espera_total / self.completadas * 1000, 2) if self.completadas else 0.0,
+            }
+
+    def cerrar(self):
+        self._executor.shutdown(wait=True)
+
+    def _enviar(self, funcion, *args) -> Future:
+        with self._lock:
+            if self.en_cola + self.en_curso >= self.max_pendientes:
+                self.rechazadas += 1
+                logger.warning(f"⚠️ Pool de contraseñas saturado ({self.en_cola} en cola)")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent password operations, try again later"
+                )
+            self.en_cola += 1
+            self.max_cola_observada = max(self.max_cola_observada, self.en_cola)
+
+        return self._executor.submit(self._ejecutar, funcion, args, time.perf_counter())
+
+    def _ejecutar(self, funcion, args, encolada: float):
+        with self._lock:
+            self.en_cola -= 1
+            self.en_curso += 1
+            self._espera_total += time.perf_counter() - encolada
+        try:
+            return funcion(*args)
+        finally:
+            with self._lock:
+                self.en_curso -= 1
+                self.completadas += 1
+
+
+password_pool = PasswordPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pendientes=settings.PASSWORD_HASH_MAX_PENDING
+)
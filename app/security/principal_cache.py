@@ -0,0 +1,79 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UserPrincipal(NamedTuple):
+    """Datos mínimos del usuario autenticado que necesitan la mayoría de endpoints"""
+    id: uuid.UUID
+    is_active: bool
+    is_admin: bool
+
+
+class PrincipalCache:
+    """
+    Caché LRU en memoria de principales por `sub` del token, con TTL corto.
+    Cada proceso tiene la suya: update_user invalida la entrada local y el
+    TTL acota cuánto tarda en verse un cambio hecho desde otro proceso.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entradas: "OrderedDict[uuid.UUID, Tuple[UserPrincipal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: uuid.UUID) -> Optional[UserPrincipal]:
+        with self._lock:
+            entrada = self._entradas.get(user_id)
+            if entrada is None or entrada[1] <= time.monotonic():
+                if entrada is not None:
+                    del self._entradas[user_id]
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(user_id)
+            self.hits += 1
+            return entrada[0]
+
+    def put(self, principal: UserPrincipal):
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entradas[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entradas.move_to_end(principal.id)
+            while len(self._entradas) > self.max_entries:
+                self._entradas.popitem(last=False)
+
+    def invalidate(self, user_id: uuid.UUID):
+        with self._lock:
+            self._entradas.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entradas),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES
+)
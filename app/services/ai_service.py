@@ -1,10 +1,8 @@
-import pandas as pd
-from sklearn.tree import DecisionTreeClassifier
-from datetime import datetime
+from datetime import datetime, timedelta
 import numpy as np
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
-import joblib
-from io import BytesIO
+from itertools import islice
 import traceback
 from typing import List, Dict, Any
 import uuid
@@ -13,25 +11,159 @@ import logging
 logger = logging.getLogger(__name__)
 
 from app.models.database_models import Task, MLFeedback, AIModel
+from app.config import settings
+from app.services.model_cache import model_cache
+from app.services.model_format import MODEL_VERSION, cargar_modelo, desde_sklearn, serializar
+from app.services.ml_features import (
+    FEATURE_NAMES, COLUMNAS_FEATURES, extraer_features, features_de_tareas,
+    normalizar_nivel as _normalizar_nivel
+)
+from app.services.priority_rules import (
+    REGLAS_PRIORIDAD_MAP, REGLAS_URGENCIA_MAP, REGLAS_IMPACTO_MAP,
+    PALABRAS_CRITICAS_TITULO, PALABRAS_URGENTES_DESCRIPCION, puntajes_por_reglas
+)
 
 
 # Mapeos fijos (no requieren persistencia)
-URGENCIA_MAP = {"low": 0, "medium": 1, "high": 2}
-IMPACTO_MAP = {"low": 0, "medium": 1, "high": 2}
-ENERGIA_MAP = {"low": 0, "medium": 1, "high": 2}
 PRIORIDAD_MAP = {"low": 1, "medium": 2, "high": 3}
 
+# Antigüedad máxima del feedback negativo que sube la prioridad de una tarea
+VENTANA_FEEDBACK_NEGATIVO = timedelta(hours=24)
 
-def _normalizar_nivel(valor: str) -> str:
-    if not valor:
-        return "medium"
-    v = str(valor).lower().strip()
-    if v in ("high", "critical", "crític", "urgent", "crucial"):
-        return "high"
-    elif v in ("low", "baja", "minimum"):
-        return "low"
+# Tareas completadas necesarias para usar el modelo en lugar de las reglas
+MIN_TAREAS_COMPLETADAS_ML = 3
+
+# Filas por lote al leer el dataset de entrenamiento con cursor del servidor
+TRAINING_FETCH_SIZE = 1000
+
+
+def obtener_modelo(db: Session, user_id: uuid.UUID, model_id: uuid.UUID):
+    """Devuelve el modelo deserializado desde la caché de proceso o, si no está, desde su blob"""
+    modelo = model_cache.get(user_id, model_id)
+    if modelo is not None:
+        logger.info(f"⚡ Modelo {model_id} obtenido de la caché")
+        return modelo
+
+    model_data = db.query(AIModel.model_data).filter(AIModel.id == model_id).scalar()
+    if not model_data:
+        logger.info("ℹ️ El modelo activo no tiene datos. Se usará sistema de reglas.")
+        return None
+
+    logger.info(f"✅ Modelo encontrado ({len(model_data)} bytes)")
+    try:
+        modelo = cargar_modelo(model_data)
+    except Exception as e:
+        logger.error(f"❌ Error al cargar el modelo: {e}")
+        logger.error(traceback.format_exc())
+        return None
+
+    model_cache.put(user_id, model_id, modelo, len(model_data))
+    logger.info(f"✅ Modelo cargado exitosamente: {type(modelo)}")
+    return modelo
+
+
+def puntaje_por_reglas(task) -> float:
+    """
+    Puntaje heurístico de una tarea, antes del post-procesamiento contextual.
+    Versión de referencia de priority_rules.puntajes_por_reglas, que es la que
+    usan la priorización y la puntuación masiva.
+    """
+    puntaje = REGLAS_PRIORIDAD_MAP.get(task.priority_level or "medium", 2.0)
+    titulo = (task.title or "").lower()
+    desc = (task.description or "").lower()
+
+    # Ajuste por palabras clave en título
+    if any(w in titulo for w in PALABRAS_CRITICAS_TITULO):
+        puntaje *= 1.8
+        logger.debug(f"🔧 Palabra clave crítica en título: {task.title}")
+    # Ajuste por palabras clave en descripción
+    elif any(w in desc for w in PALABRAS_URGENTES_DESCRIPCION):
+        puntaje *= 1.5
+        logger.debug(f"❗ Palabra clave urgente en descripción: {task.title}")
+
+    # Ajuste por metadatos
+    puntaje *= REGLAS_URGENCIA_MAP.get(task.urgency or "medium", 1.0)
+    puntaje *= REGLAS_IMPACTO_MAP.get(task.impact or "medium", 1.0)
+
+    # Ajuste por deadline
+    if task.deadline:
+        dias = (task.deadline - datetime.now()).days
+        if dias < 0:
+            puntaje *= 2.5
+            logger.debug(f"🚨 Deadline vencido: {task.title}")
+        elif dias == 0:
+            puntaje *= 2.0
+            logger.debug(f"⏳ Deadline hoy: {task.title}")
+        elif dias <= 1:
+            puntaje *= 1.7
+            logger.debug(f"📅 Deadline mañana: {task.title}")
+        elif dias <= 3:
+            puntaje *= 1.3
+            logger.debug(f"📅 Deadline en 3 días: {task.title}")
+
+    return float(puntaje)
+
+
+def recomendar_horario(task) -> str:
+    """Recomienda hora basado en energía y tipo de tarea"""
+    energia = task.energy_required or "medium"
+    titulo = (task.title or "").lower()
+
+    if energia == "high" or any(w in titulo for w in ['bug', 'fix', 'critical', 'error', 'caído', 'seguridad']):
+        return "08:00"
+    elif 10 <= datetime.now().hour < 15 and energia == "medium":
+        return "12:00"
+    elif energia == "medium":
+        return "14:00"
     else:
-        return "medium"
+        return "16:00"
+
+
+# Mayor factor que puede devolver ajuste_contextual: tarde con energía baja (1.3),
+# feedback negativo (1.3) y deadline vencido (1.5). Actualizar si cambian los ajustes
+AJUSTE_CONTEXTUAL_MAXIMO = 1.3 * 1.3 * 1.5
+
+
+def ajuste_contextual(task, hora_actual: int, feedback_negativo: bool, ahora: datetime) -> float:
+    """Factor multiplicativo dependiente del momento de la consulta (hora, deadline y feedback reciente)"""
+    energia = task.energy_required or "medium"
+    duracion = task.estimated_duration or 60
+    ajuste = 1.0
+
+    # Ajuste por hora del día y energía
+    if hora_actual >= 18:  # Tarde/noche
+        if energia == "high":
+            ajuste *= 0.7
+        elif energia == "low":
+            ajuste *= 1.3
+    elif 7 <= hora_actual <= 10:  # Mañana
+        if energia == "high":
+            ajuste *= 1.2
+
+    # Penalizar tareas largas al final del día
+    if hora_actual >= 17 and duracion > 120:
+        ajuste *= 0.8
+
+    # Ajuste por feedback negativo reciente (el sistema subestimó esta tarea)
+    if feedback_negativo:
+        ajuste *= 1.3
+        logger.info(f"📈 Aumentando prioridad por feedback negativo en tarea: {task.title}")
+
+    # Ajuste por deadline próximo
+    if task.deadline:
+        dias = (task.deadline - ahora).days
+        if dias < 0:
+            ajuste *= 1.5
+        elif dias == 0:
+            ajuste *= 1.4
+        elif dias <= 1:
+            ajuste *= 1.2
+
+    return ajuste
+
+
+def aplicar_ajuste(puntaje: float, ajuste: float) -> float:
+    return max(puntaje * ajuste, 0.5)
 
 
 class TaskAgent:
@@ -44,89 +176,95 @@ class TaskAgent:
         self.db = db
         self.user_id = user_id
         self.modelo = None
-        self.feature_names = [
-            'urgencia_encoded', 'impacto_encoded', 'energia_encoded',
-            'duracion_estimada', 'longitud_descripcion',
-            'tiene_urgente', 'tiene_bug', 'deadline_proximo'
-        ]
+        self.model_id = None
+        self.feature_names = FEATURE_NAMES
         logger.info(f"🔄 Inicializando TaskAgent para usuario: {user_id}")
         self._cargar_modelo()
 
     def _cargar_modelo(self):
-        """Carga el modelo ML más reciente y activo del usuario"""
+        """Carga el modelo ML más reciente y activo del usuario (usando la caché de proceso)"""
         try:
             logger.info("🔍 Buscando modelo ML en base de datos...")
-            modelo_db = self.db.query(AIModel).filter(
+            # Consulta ligera: solo el id del modelo activo, sin traer el blob
+            self.model_id = self.db.query(AIModel.id).filter(
                 AIModel.user_id == self.user_id,
                 AIModel.is_active == True
-            ).order_by(AIModel.trained_at.desc()).first()
-
-            if modelo_db and modelo_db.model_data and len(modelo_db.model_data) > 0:
-                logger.info(f"✅ Modelo encontrado ({len(modelo_db.model_data)} bytes)")
-                try:
-                    buffer = BytesIO(modelo_db.model_data)
-                    self.modelo = joblib.load(buffer)
-                    logger.info(f"✅ Modelo cargado exitosamente: {type(self.modelo)}")
-                except Exception as e:
-                    logger.error(f"❌ Error al cargar el modelo: {e}")
-                    logger.error(traceback.format_exc())
-                    self.modelo = None
-            else:
+            ).order_by(AIModel.trained_at.desc()).limit(1).scalar()
+
+            if self.model_id is None:
                 logger.info("ℹ️ No se encontró modelo activo. Se usará sistema de reglas.")
                 self.modelo = None
+                return
+
+            self.modelo = obtener_modelo(self.db, self.user_id, self.model_id)
 
         except Exception as e:
             logger.error(f"❌ Error en _cargar_modelo: {e}")
             logger.error(traceback.format_exc())
             self.modelo = None
 
+    def _consulta_datos_entrenamiento(self):
+        """
+        Consulta única para el dataset de entrenamiento: tareas completadas
+        unidas al último feedback con actual_priority de cada tarea
+        (DISTINCT ON task_id) y el total de filas como función de ventana.
+        """
+        ultimo_feedback = self.db.query(
+            MLFeedback.task_id.label("task_id"),
+            MLFeedback.actual_priority.label("actual_priority")
+        ).filter(
+            MLFeedback.user_id == self.user_id,
+            MLFeedback.actual_priority.isnot(None)
+        ).distinct(MLFeedback.task_id).order_by(
+            MLFeedback.task_id,
+            MLFeedback.created_at.desc()
+        ).subquery()
+
+        return self.db.query(
+            *[getattr(Task, columna) for columna in COLUMNAS_FEATURES],
+            func.coalesce(ultimo_feedback.c.actual_priority, Task.priority_level),
+            func.count().over()
+        ).outerjoin(
+            ultimo_feedback, ultimo_feedback.c.task_id == Task.id
+        ).filter(
+            Task.user_id == self.user_id,
+            Task.status == 'completed'
+        ).yield_per(TRAINING_FETCH_SIZE)
+
     def _preparar_datos_entrenamiento(self):
         """Prepara datos de tareas completadas para entrenamiento"""
         try:
-            tareas = self.db.query(Task).filter(
-                Task.user_id == self.user_id,
-                Task.status == 'completed'
-            ).all()
-            logger.info(f"📊 Tareas completadas encontradas para entrenamiento: {len(tareas)}")
-
-            if len(tareas) < 3:
-                logger.warning(f"⚠️ Insuficientes tareas completadas ({len(tareas)}/3). No se entrenará ML.")
+            X = None
+            y = None
+            ahora = datetime.now()
+            filas = iter(self._consulta_datos_entrenamiento())
+            inicio = 0
+
+            while True:
+                lote = list(islice(filas, TRAINING_FETCH_SIZE))
+                if not lote:
+                    break
+
+                if X is None:
+                    total = lote[0][-1]
+                    logger.info(f"📊 Tareas completadas encontradas para entrenamiento: {total}")
+                    if total < 3:
+                        break
+                    # Matriz preasignada: cada lote del cursor se escribe en su tramo
+                    X = np.empty((total, len(FEATURE_NAMES)), dtype=np.float64)
+                    y = np.empty(total, dtype=np.int64)
+
+                columnas = list(zip(*lote))
+                fin = inicio + len(lote)
+                X[inicio:fin] = extraer_features(*columnas[:len(COLUMNAS_FEATURES)], ahora=ahora)
+                y[inicio:fin] = [PRIORIDAD_MAP[_normalizar_nivel(p)] for p in columnas[-2]]
+                inicio = fin
+
+            if X is None:
+                logger.warning("⚠️ Insuficientes tareas completadas (mínimo 3). No se entrenará ML.")
                 return None, None
 
-            datos = []
-            objetivos = []
-            
-            for task in tareas:
-                # Obtener feedback para esta tarea
-                feedback = self.db.query(MLFeedback).filter(
-                    MLFeedback.task_id == task.id,
-                    MLFeedback.actual_priority.isnot(None)
-                ).order_by(MLFeedback.created_at.desc()).first()
-                
-                # Determinar prioridad objetivo
-                prioridad_objetivo = feedback.actual_priority if feedback else task.priority_level
-                prioridad_objetivo = _normalizar_nivel(prioridad_objetivo)
-                
-                # Calcular si tiene deadline próximo
-                deadline_proximo = 0
-                if task.deadline:
-                    dias = (task.deadline - datetime.now()).days
-                    deadline_proximo = 1 if dias <= 1 else 0
-                
-                dato = {
-                    "urgencia_encoded": URGENCIA_MAP.get(_normalizar_nivel(task.urgency), 1),
-                    "impacto_encoded": IMPACTO_MAP.get(_normalizar_nivel(task.impact), 1),
-                    "energia_encoded": ENERGIA_MAP.get(_normalizar_nivel(task.energy_required), 1),
-                    "duracion_estimada": float(task.estimated_duration or 60),
-                    "longitud_descripcion": len(task.description or ""),
-                    "tiene_urgente": 1 if "urgent" in (task.description or "").lower() or "crític" in (task.title or "").lower() else 0,
-                    "tiene_bug": 1 if "bug" in (task.title or "").lower() or "fix" in (task.title or "").lower() else 0,
-                    "deadline_proximo": deadline_proximo
-                }
-                datos.append(dato)
-                objetivos.append(PRIORIDAD_MAP[prioridad_objetivo])
-
-            return pd.DataFrame(datos), np.array(objetivos)
+            return X, y
 
         except Exception as e:
             logger.error(f"❌ Error en _preparar_datos_entrenamiento: {e}")
@@ -135,24 +273,27 @@ class TaskAgent:
 
     def entrenar_modelo_prioridad(self) -> bool:
         """Entrena un modelo con DecisionTreeClassifier"""
-        X_df, y = self._preparar_datos_entrenamiento()
-        if X_df is None or y is None or len(X_df) < 3:
+        X, y = self._preparar_datos_entrenamiento()
+        if X is None or y is None or len(X) < 3:
             logger.warning("🧠 No hay suficientes datos para entrenar modelo ML. Usando reglas.")
             self.modelo = None
             return False
 
         try:
-            logger.info(f"🎯 Entrenando modelo con {len(X_df)} tareas...")
-            logger.info(f"Dataset de entrenamiento:\n{X_df.head()}")
+            logger.info(f"🎯 Entrenando modelo con {len(X)} tareas...")
+            logger.info(f"Dataset de entrenamiento (primeras filas):\n{X[:5]}")
             logger.info(f"Objetivos (prioridades): {y}")
 
+            # scikit-learn solo se importa para entrenar; la predicción usa ArbolCompacto
+            from sklearn.tree import DecisionTreeClassifier
+
             # Entrenar modelo
             self.modelo = DecisionTreeClassifier(
                 max_depth=3,  # Evitar overfitting
                 random_state=42,
                 class_weight="balanced"
             )
-            self.modelo.fit(X_df.values, y)
+            self.modelo.fit(X, y)
 
             # Guardar modelo
             self._guardar_modelo()
@@ -172,22 +313,28 @@ class TaskAgent:
             return
 
         try:
-            # Desactivar versiones anteriores
-            self.db.query(AIModel).filter(
-                AIModel.user_id == self.user_id,
-                AIModel.model_type == "priority_predictor_v3"
-            ).update({"is_active": False})
+            # Desactivar versiones anteriores (UPDATE directo, sin cargar filas ni blobs)
+            self.db.execute(
+                update(AIModel).where(
+                    AIModel.user_id == self.user_id,
+                    AIModel.model_type == "priority_predictor_v3",
+                    AIModel.is_active == True
+                ).values(is_active=False).execution_options(synchronize_session=False)
+            )
             self.db.commit()
+            model_cache.invalidate_user(self.user_id)
 
-            # Guardar nuevo modelo
-            buffer = BytesIO()
-            joblib.dump(self.modelo, buffer)
-            modelo_bin = buffer.getvalue()
+            # Guardar nuevo modelo: solo los arreglos del árbol, en formato compacto
+            self.modelo = desde_sklearn(self.modelo)
+            modelo_bin = serializar(self.modelo, settings.ML_MODEL_COMPRESSION)
 
+            # Id generado aquí: no hace falta releer la fila tras el commit
+            model_id = uuid.uuid4()
             nuevo_modelo = AIModel(
+                id=model_id,
                 user_id=self.user_id,
                 model_type="priority_predictor_v3",
-                model_version="3.1",
+                model_version=MODEL_VERSION,
                 model_data=modelo_bin,
                 is_active=True
             )
@@ -196,6 +343,14 @@ class TaskAgent:
             self.db.commit()
             logger.info(f"💾 Modelo guardado ({len(modelo_bin)} bytes)")
 
+            # La versión nueva reemplaza en caché a las anteriores del usuario
+            self.model_id = model_id
+            model_cache.put(self.user_id, self.model_id, self.modelo, len(modelo_bin))
+
+            # Los puntajes materializados del usuario pasan a usar el modelo nuevo
+            from app.services.ml_materialization import materializar_tareas
+            materializar_tareas(self.db, self.user_id)
+
         except Exception as e:
             logger.error(f"❌ Error al guardar el modelo: {e}")
             logger.error(traceback.format_exc())
@@ -208,7 +363,7 @@ class TaskAgent:
             logger.info(f"⏰ Hora actual: {hora_actual}:00")
 
             # Identificar tareas con feedback negativo reciente
-            veinticuatro_horas = datetime.now() - pd.Timedelta(hours=24)
+            veinticuatro_horas = datetime.now() - VENTANA_FEEDBACK_NEGATIVO
             feedbacks_negativos = self.db.query(MLFeedback).filter(
                 MLFeedback.user_id == self.user_id,
                 MLFeedback.created_at >= veinticuatro_horas,
@@ -216,43 +371,13 @@ class TaskAgent:
             ).all()
             task_ids_con_feedback = {f.task_id for f in feedbacks_negativos}
 
+            ahora = datetime.now()
             for item in resultados:
                 task = item['task_obj']
-                energia = task.energy_required or "medium"
-                duracion = task.estimated_duration or 60
-                ajuste = 1.0
-
-                # Ajuste por hora del día y energía
-                if hora_actual >= 18:  # Tarde/noche
-                    if energia == "high":
-                        ajuste *= 0.7
-                    elif energia == "low":
-                        ajuste *= 1.3
-                elif 7 <= hora_actual <= 10:  # Mañana
-                    if energia == "high":
-                        ajuste *= 1.2
-
-                # Penalizar tareas largas al final del día
-                if hora_actual >= 17 and duracion > 120:
-                    ajuste *= 0.8
-
-                # Ajuste por feedback negativo reciente (el sistema subestimó esta tarea)
-                if task.id in task_ids_con_feedback:
-                    ajuste *= 1.3
-                    logger.info(f"📈 Aumentando prioridad por feedback negativo en tarea: {task.title}")
-
-                # Ajuste por deadline próximo
-                if task.deadline:
-                    dias = (task.deadline - datetime.now()).days
-                    if dias < 0:
-                        ajuste *= 1.5
-                    elif dias == 0:
-                        ajuste *= 1.4
-                    elif dias <= 1:
-                        ajuste *= 1.2
+                ajuste = ajuste_contextual(task, hora_actual, task.id in task_ids_con_feedback, ahora)
 
                 puntaje_original = item['puntaje_ml']
-                item['puntaje_ml'] = max(puntaje_original * ajuste, 0.5)
+                item['puntaje_ml'] = aplicar_ajuste(puntaje_original, ajuste)
                 logger.debug(f"📊 {task.title[:30]}: {puntaje_original:.2f} → {item['puntaje_ml']:.2f} (ajuste: {ajuste:.2f})")
 
             logger.info("✅ Post-procesamiento aplicado correctamente")
@@ -265,48 +390,19 @@ class TaskAgent:
     def _prioridad_por_reglas(self, tasks: List[Task]) -> List[Dict[str, Any]]:
         """Sistema de respaldo basado en reglas heurísticas"""
         logger.info("📋 Usando sistema de reglas para priorización (no hay suficientes datos para ML)")
-        prioridad_map = {"high": 3.0, "medium": 2.0, "low": 1.0}
-        urgencia_map = {"high": 1.4, "medium": 1.1, "low": 1.0}
-        impacto_map = {"high": 1.3, "medium": 1.1, "low": 1.0}
-
+        puntajes = puntajes_por_reglas(
+            priority_level=[t.priority_level for t in tasks],
+            urgency=[t.urgency for t in tasks],
+            impact=[t.impact for t in tasks],
+            title=[t.title for t in tasks],
+            description=[t.description for t in tasks],
+            deadline=[t.deadline for t in tasks]
+        )
         resultados = []
-        for task in tasks:
-            puntaje = prioridad_map.get(task.priority_level or "medium", 2.0)
-            titulo = (task.title or "").lower()
-            desc = (task.description or "").lower()
-
-            # Ajuste por palabras clave en título
-            if any(w in titulo for w in ['bug', 'fix', 'crític', 'urgent', 'hotfix', 'error', 'caído', 'seguridad']):
-                puntaje *= 1.8
-                logger.debug(f"🔧 Palabra clave crítica en título: {task.title}")
-            # Ajuste por palabras clave en descripción
-            elif any(w in desc for w in ['urgent', 'important', 'critical', 'importante', 'crític']):
-                puntaje *= 1.5
-                logger.debug(f"❗ Palabra clave urgente en descripción: {task.title}")
-
-            # Ajuste por metadatos
-            puntaje *= urgencia_map.get(task.urgency or "medium", 1.0)
-            puntaje *= impacto_map.get(task.impact or "medium", 1.0)
-
-            # Ajuste por deadline
-            if task.deadline:
-                dias = (task.deadline - datetime.now()).days
-                if dias < 0:
-                    puntaje *= 2.5
-                    logger.debug(f"🚨 Deadline vencido: {task.title}")
-                elif dias == 0:
-                    puntaje *= 2.0
-                    logger.debug(f"⏳ Deadline hoy: {task.title}")
-                elif dias <= 1:
-                    puntaje *= 1.7
-                    logger.debug(f"📅 Deadline mañana: {task.title}")
-                elif dias <= 3:
-                    puntaje *= 1.3
-                    logger.debug(f"📅 Deadline en 3 días: {task.title}")
-
+        for task, puntaje in zip(tasks, puntajes.tolist()):
             resultados.append({
                 'task_obj': task,
-                'puntaje_ml': float(puntaje),
+                'puntaje_ml': puntaje,
                 'titulo': task.title
             })
             logger.debug(f"🔖 Tarea '{task.title[:20]}' asignado puntaje por reglas: {puntaje:.2f}")
@@ -319,57 +415,20 @@ class TaskAgent:
             return []
 
         # Verificar si hay suficientes datos para ML
-        completed_count = self.db.query(Task).filter(
+        completed_count = self.db.query(func.count(Task.id)).filter(
             Task.user_id == self.user_id,
             Task.status == 'completed'
-        ).count()
+        ).scalar()
         logger.info(f"✅ Tareas completadas disponibles: {completed_count}")
 
         # Si no hay suficientes datos o modelo no cargado, usar reglas
-        if self.modelo is None or completed_count < 3:
+        if self.modelo is None or completed_count < MIN_TAREAS_COMPLETADAS_ML:
             logger.warning(f"🧠 Usando sistema de reglas (modelo no disponible o solo {completed_count}/3 tareas completadas)")
             return self._prioridad_por_reglas(tasks)
 
         try:
             logger.info("🤖 Usando modelo ML para predicción")
-            datos_pred = []
-            
-            for task in tasks:
-                # Calcular si tiene deadline próximo
-                deadline_proximo = 0
-                if task.deadline:
-                    dias = (task.deadline - datetime.now()).days
-                    deadline_proximo = 1 if dias <= 1 else 0
-                
-                d = {
-                    'task_obj': task,
-                    'urgencia_encoded': URGENCIA_MAP.get(_normalizar_nivel(task.urgency), 1),
-                    'impacto_encoded': IMPACTO_MAP.get(_normalizar_nivel(task.impact), 1),
-                    'energia_encoded': ENERGIA_MAP.get(_normalizar_nivel(task.energy_required), 1),
-                    'duracion_estimada': float(task.estimated_duration or 60),
-                    'longitud_descripcion': len(task.description or ""),
-                    'tiene_urgente': 1 if "urgent" in (task.description or "").lower() or "crític" in (task.title or "").lower() else 0,
-                    'tiene_bug': 1 if "bug" in (task.title or "").lower() or "fix" in (task.title or "").lower() else 0,
-                    'deadline_proximo': deadline_proximo
-                }
-                datos_pred.append(d)
-
-            # Preparar datos para predicción
-            X_pred = []
-            for d in datos_pred:
-                x = [
-                    d['urgencia_encoded'],
-                    d['impacto_encoded'],
-                    d['energia_encoded'],
-                    d['duracion_estimada'],
-                    d['longitud_descripcion'],
-                    d['tiene_urgente'],
-                    d['tiene_bug'],
-                    d['deadline_proximo']
-                ]
-                X_pred.append(x)
-
-            X_pred = np.array(X_pred)
+            X_pred = features_de_tareas(tasks)
             logger.info(f"📊 Datos para predicción (shape: {X_pred.shape}):\n{X_pred}")
 
             # Realizar predicciones
@@ -378,14 +437,14 @@ class TaskAgent:
 
             # Convertir a puntajes (1, 2, 3)
             resultados = []
-            for i, d in enumerate(datos_pred):
-                puntaje = float(predicciones[i])  # Ya es 1, 2 o 3
+            for task, prediccion in zip(tasks, predicciones):
+                puntaje = float(prediccion)  # Ya es 1, 2 o 3
                 resultados.append({
-                    'task_obj': d['task_obj'],
+                    'task_obj': task,
                     'puntaje_ml': puntaje,
-                    'titulo': d['task_obj'].title
+                    'titulo': task.title
                 })
-                logger.info(f"📈 Tarea '{d['task_obj'].title[:20]}': prioridad ML = {puntaje:.0f}")
+                logger.info(f"📈 Tarea '{task.title[:20]}': prioridad ML = {puntaje:.0f}")
 
             # Aplicar post-procesamiento
             resultados = self._post_procesamiento(resultados)
@@ -404,18 +463,8 @@ class TaskAgent:
     def recomendar_horario(self, task: Task) -> str:
         """Recomienda hora basado en energía y tipo de tarea"""
         try:
-            energia = task.energy_required or "medium"
-            titulo = (task.title or "").lower()
-            
-            if energia == "high" or any(w in titulo for w in ['bug', 'fix', 'critical', 'error', 'caído', 'seguridad']):
-                return "08:00"
-            elif 10 <= datetime.now().hour < 15 and energia == "medium":
-                return "12:00"
-            elif energia == "medium":
-                return "14:00"
-            else:
-                return "16:00"
+            return recomendar_horario(task)
         except Exception as e:
             logger.error(f"❌ Error en recomendar_horario: {e}")
             logger.error(traceback.format_exc())
-            return "10:00"
\ No newline at end of file
+            return "10:00"
@@ -0,0 +1,228 @@
+"""
+Escritura del historial de tareas (TaskHistory).
+
+En modo "sync" (por defecto, durable) cada evento se añade a la sesión de la
+petición y se confirma con el resto de la mutación. En modo "buffered" los
+eventos se guardan en la sesión hasta que su transacción se confirma, pasan
+entonces a un buffer en memoria y un hilo los inserta en bloque (INSERT
+multi-fila) cuando se acumulan AUDIT_BATCH_SIZE o cada
+AUDIT_FLUSH_INTERVAL_SECONDS. Si la transacción se revierte, sus eventos se
+descartan. Al apagar la aplicación (o al salir del proceso) el buffer se
+vacía; una caída abrupta del proceso puede perder los eventos aún en memoria.
+"""
+import atexit
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import logging
+
+from sqlalchemy import event, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.database_models import TaskHistory
+
+logger = logging.getLogger(__name__)
+
+MODOS_AUDITORIA = ("sync", "buffered")
+
+# Clave en Session.info de los eventos pendientes de que la transacción se confirme
+_PENDIENTES = "auditoria_pendiente"
+
+
+class AuditWriter:
+    def __init__(self, modo: str, batch_size: int, intervalo: float, max_buffer: int):
+        if modo not in MODOS_AUDITORIA:
+            raise ValueError(f"AUDIT_MODE must be one of: {', '.join(MODOS_AUDITORIA)}")
+        self.modo = modo
+        self.batch_size = batch_size
+        self.intervalo = intervalo
+        self.max_buffer = max_buffer
+        self._buffer: deque = deque()
+        self._condicion = threading.Condition()
+        self._hilo: Optional[threading.Thread] = None
+        self._cerrando = False
+        self.escritos = 0
+        self.descartados = 0
+        self.lotes = 0
+        self.fallos_lote = 0
+
+    def registrar(self, db: Session, task_id: uuid.UUID, user_id: uuid.UUID, change_type: str,
+                  change_description: str, old_values: Optional[Dict[str, Any]] = None,
+                  new_values: Optional[Dict[str, Any]] = None, sincrono: bool = False):
+        """
+        Registra un evento de historial. sincrono=True lo escribe siempre en la
+        transacción de la petición (p. ej. 'deleted', que debe ir antes del borrado).
+        """
+        fila = {
+            'task_id': task_id,
+            'user_id': user_id,
+            'change_type': change_type,
+            'old_values': old_values,
+            'new_values': new_values,
+            'change_description': change_description,
+        }
+        if self.modo == "sync" or sincrono:
+            db.add(TaskHistory(**fila))
+        else:
+            self.registrar_muchos(db, [fila])
+
+    def registrar_muchos(self, db: Session, filas: List[Dict[str, Any]]):
+        """Eventos en bloque (creación masiva, refresco de prioridades)"""
+        if not filas:
+            return
+        if self.modo == "sync":
+            db.execute(insert(TaskHistory), filas)
+            return
+
+        # id y created_at se fijan ahora: el INSERT llegará más tarde. Con zona horaria,
+        # PostgreSQL lo guarda en la hora de la sesión, igual que current_timestamp
+        registrado = datetime.now(timezone.utc)
+        db.info.setdefault(_PENDIENTES, []).extend(
+            {'id': uuid.uuid4(), 'created_at': registrado, **fila} for fila in filas
+        )
+
+    def encolar(self, filas: List[Dict[str, Any]]):
+        with self._condicion:
+            self._buffer.extend(filas)
+            sobrantes = len(self._buffer) - self.max_buffer
+            if sobrantes > 0:
+                for _ in range(sobrantes):
+                    self._buffer.popleft()
+                self.descartados += sobrantes
+                logger.error(f"❌ Buffer de auditoría lleno: {sobrantes} eventos descartados")
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="audit-writer", daemon=True)
+                self._hilo.start()
+            if len(self._buffer) >= self.batch_size:
+                self._condicion.notify()
+
+    def vaciar(self):
+        """Escribe ya todo lo que haya en el buffer"""
+        while True:
+            lote = self._extraer_lote()
+            if not lote:
+                return
+            self._escribir(lote)
+
+    def cerrar(self):
+        """Detiene el hilo y vacía el buffer (apagado de la aplicación o fin del proceso)"""
+        with self._condicion:
+            self._cerrando = True
+            self._condicion.notify()
+        if self._hilo is not None:
+            self._hilo.join()
+        try:
+            self.vaciar()
+        except Exception as e:
+            # Sin base no hay reintento posible: no se propaga para no saltarse el resto del apagado
+            with self._condicion:
+                perdidos = len(self._buffer)
+                self._buffer.clear()
+                self.descartados += perdidos
+            logger.error(f"❌ No se pudo vaciar el buffer de auditoría al cerrar: {perdidos} eventos perdidos ({e})")
+
+    def stats(self) -> dict:
+        with self._condicion:
+            return {
+                "mode": self.modo,
+                "batch_size": self.batch_size,
+                "flush_interval_seconds": self.intervalo,
+                "buffered": len(self._buffer),
+                "max_buffer": self.max_buffer,
+                "written": self.escritos,
+                "batches": self.lotes,
+                "failed_batches": self.fallos_lote,
+                "dropped": self.descartados,
+            }
+
+    def _extraer_lote(self) -> List[Dict[str, Any]]:
+        with self._condicion:
+            n = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(n)]
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                limite = time.monotonic() + self.intervalo
+                while not self._cerrando and len(self._buffer) < self.batch_size:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicion.wait(restante)
+                if self._cerrando:
+                    return
+            try:
+                self.vaciar()
+            except Exception as e:
+                logger.error(f"❌ Error en el escritor de auditoría: {e}")
+
+    def _escribir(self, lote: List[Dict[str, Any]]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(TaskHistory), lote)
+            db.commit()
+            with self._condicion:
+                self.escritos += len(lote)
+                self.lotes += 1
+        except IntegrityError:
+            # Normalmente una tarea borrada antes del volcado: se inserta fila a fila
+            # para conservar el resto del lote
+            db.rollback()
+            with self._condicion:
+                self.fallos_lote += 1
+            self._escribir_fila_a_fila(db, lote)
+        except Exception:
+            db.rollback()
+            # Base no disponible: el lote vuelve al buffer y se reintenta en el siguiente ciclo
+            with self._condicion:
+                self._buffer.extendleft(reversed(lote))
+            raise
+        finally:
+            db.close()
+
+    def _escribir_fila_a_fila(self, db: Session, lote: List[Dict[str, Any]]):
+        perdidos = 0
+        for fila in lote:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(TaskHistory), [fila])
+            except IntegrityError:
+                perdidos += 1
+        db.commit()
+        with self._condicion:
+            self.escritos += len(lote) - perdidos
+            self.descartados += perdidos
+        if perdidos:
+            logger.warning(f"⚠️ {perdidos} eventos de auditoría descartados (la tarea ya no existe)")
+
+
+audit_writer = AuditWriter(
+    modo=settings.AUDIT_MODE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    intervalo=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    max_buffer=settings.AUDIT_MAX_BUFFER
+)
+atexit.register(audit_writer.cerrar)
+
+
+@event.listens_for(Session, "after_commit")
+def _encolar_tras_commit(session: Session):
+    # También se dispara al liberar un SAVEPOINT; solo cuenta la transacción externa
+    if session.in_nested_transaction():
+        return
+    pendientes = session.info.pop(_PENDIENTES, None)
+    if pendientes:
+        audit_writer.encolar(pendientes)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar_no_confirmados(session: Session, transaction):
+    # Tras un commit ya no queda nada; tras un rollback o un close sin commit se descartan
+    if transaction.parent is None:
+        session.info.pop(_PENDIENTES, None)
@@ -0,0 +1,179 @@
+"""
+Priorización masiva de tareas pendientes para muchos usuarios a la vez.
+
+Carga las tareas de los usuarios por lotes, agrupa cada lote por modelo
+activo, envía todos los grupos al ejecutor de inferencia (ml_executor) en
+una sola llamada y escribe los resultados en TaskMLData con upserts masivos.
+"""
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.database_models import Task, AIModel, User, TaskMLData
+from app.services.ai_service import recomendar_horario, MIN_TAREAS_COMPLETADAS_ML
+from app.services.ml_executor import ml_executor
+from app.services.ml_features import COLUMNAS_FEATURES, extraer_features, features_a_dicts
+from app.services.priority_rules import puntajes_por_reglas
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_PENDIENTES = ('pending', 'in_progress')
+
+# Columnas que necesitan las características, las reglas y el horario recomendado
+COLUMNAS_PUNTUACION = [Task.id, Task.user_id, Task.priority_level] + [
+    getattr(Task, columna) for columna in COLUMNAS_FEATURES
+]
+
+
+def modelos_activos(db: Session, user_ids: Sequence[uuid.UUID]) -> Dict[uuid.UUID, uuid.UUID]:
+    """Id del modelo activo más reciente de cada usuario, solo para quienes tienen datos suficientes"""
+    completadas = dict(db.query(Task.user_id, func.count()).filter(
+        Task.user_id.in_(user_ids),
+        Task.status == 'completed'
+    ).group_by(Task.user_id).all())
+
+    modelos = db.query(AIModel.user_id, AIModel.id).filter(
+        AIModel.user_id.in_(user_ids),
+        AIModel.is_active == True
+    ).distinct(AIModel.user_id).order_by(AIModel.user_id, AIModel.trained_at.desc()).all()
+
+    return {
+        user_id: model_id for user_id, model_id in modelos
+        if completadas.get(user_id, 0) >= MIN_TAREAS_COMPLETADAS_ML
+    }
+
+
+def puntuar_tareas(
+    db: Session,
+    tareas: Sequence[Any],
+    modelos: Dict[uuid.UUID, uuid.UUID],
+    ahora: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """
+    Calcula el puntaje base (sin post-procesamiento contextual) de filas de tareas
+    con las columnas de COLUMNAS_PUNTUACION y devuelve las filas para TaskMLData.
+    """
+    if not tareas:
+        return []
+
+    ahora = ahora or datetime.now()
+    # Tras id, user_id y priority_level vienen las columnas de COLUMNAS_FEATURES
+    X = extraer_features(*zip(*(fila[3:] for fila in tareas)), ahora=ahora)
+    puntajes = np.empty(len(tareas), dtype=np.float64)
+
+    grupos: Dict[Optional[uuid.UUID], List[int]] = defaultdict(list)
+    for i, fila in enumerate(tareas):
+        grupos[fila.user_id if fila.user_id in modelos else None].append(i)
+
+    # Los grupos con modelo se predicen fuera del worker de la API; los que no
+    # tienen predicción (sin modelo, rechazados o con error) se puntúan con reglas
+    con_modelo = [(user_id, indices) for user_id, indices in grupos.items() if user_id is not None]
+    predicciones = ml_executor.predecir_lote(
+        db, [(user_id, modelos[user_id], X[indices]) for user_id, indices in con_modelo]
+    )
+    sin_prediccion = list(grupos.get(None, []))
+    for (user_id, indices), prediccion in zip(con_modelo, predicciones):
+        if prediccion is None:
+            sin_prediccion.extend(indices)
+        else:
+            puntajes[indices] = prediccion
+
+    if sin_prediccion:
+        filas = [tareas[i] for i in sin_prediccion]
+        puntajes[sin_prediccion] = puntajes_por_reglas(
+            priority_level=[f.priority_level for f in filas],
+            urgency=[f.urgency for f in filas],
+            impact=[f.impact for f in filas],
+            title=[f.title for f in filas],
+            description=[f.description for f in filas],
+            deadline=[f.deadline for f in filas],
+            ahora=ahora
+        )
+
+    return [{
+        'task_id': fila.id,
+        'user_id': fila.user_id,
+        'ml_priority_score': round(float(puntaje), 4),
+        'recommended_schedule': recomendar_horario(fila),
+        'features': features,
+    } for fila, puntaje, features in zip(tareas, puntajes, features_a_dicts(X))]
+
+
+def guardar_puntajes(db: Session, filas: List[Dict[str, Any]]):
+    """Upsert masivo en TaskMLData (una fila por tarea)"""
+    if not filas:
+        return
+
+    stmt = insert(TaskMLData)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_task_ml_data_task_id",
+        set_={
+            'ml_priority_score': stmt.excluded.ml_priority_score,
+            'recommended_schedule': stmt.excluded.recommended_schedule,
+            'features': stmt.excluded.features,
+            'updated_at': func.current_timestamp(),
+        }
+    )
+    db.execute(stmt, filas)
+
+
+def _procesar_lote(user_ids: List[uuid.UUID]) -> int:
+    db = SessionLocal()
+    try:
+        tareas = db.query(*COLUMNAS_PUNTUACION).filter(
+            Task.user_id.in_(user_ids),
+            Task.status.in_(ESTADOS_PENDIENTES)
+        ).all()
+        filas = puntuar_tareas(db, tareas, modelos_activos(db, user_ids))
+        guardar_puntajes(db, filas)
+        db.commit()
+        return len(filas)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def puntuar_usuarios(
+    user_ids: Optional[Sequence[uuid.UUID]] = None,
+    chunk_size: int = settings.BATCH_SCORING_CHUNK_SIZE,
+    workers: int = settings.BATCH_SCORING_WORKERS
+) -> Dict[str, Any]:
+    """Puntúa las tareas pendientes de los usuarios indicados (o de todos los activos)"""
+    inicio = time.perf_counter()
+
+    if user_ids is None:
+        db = SessionLocal()
+        try:
+            user_ids = [u for (u,) in db.query(User.id).filter(User.is_active == True).all()]
+        finally:
+            db.close()
+
+    user_ids = list(user_ids)
+    lotes = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    logger.info(f"📦 Priorización masiva: {len(user_ids)} usuarios en {len(lotes)} lotes con {workers} workers")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        total_tareas = sum(executor.map(_procesar_lote, lotes))
+
+    segundos = time.perf_counter() - inicio
+    resultado = {
+        "users": len(user_ids),
+        "tasks": total_tareas,
+        "seconds": round(segundos, 3),
+        "users_per_second": round(len(user_ids) / segundos, 2) if segundos > 0 else None,
+    }
+    logger.info(f"✅ Priorización masiva completada: {resultado}")
+    return resultado
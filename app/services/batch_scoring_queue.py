@@ -0,0 +1,99 @@
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+import logging
+
+from app.services.batch_scoring import puntuar_usuarios
+
+logger = logging.getLogger(__name__)
+
+
+class BatchScoringJob:
+    def __init__(self, user_ids: Optional[List[uuid.UUID]]):
+        self.id = uuid.uuid4()
+        self.user_ids = user_ids
+        self.status = "pending"
+        self.users: Optional[int] = None
+        self.tasks: Optional[int] = None
+        self.seconds: Optional[float] = None
+        self.users_per_second: Optional[float] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+
+class BatchScoringQueue:
+    """
+    Cola de priorizaciones masivas lanzadas desde la API.
+
+    Cada trabajo puede tardar minutos, así que se ejecuta en un hilo propio
+    fuera de la petición HTTP (que solo devuelve el id del trabajo). Los
+    trabajos se ejecutan de uno en uno; cada uno ya reparte sus lotes entre
+    BATCH_SCORING_WORKERS hilos. El script scripts/priorizar_lote.py sigue
+    ejecutándolo de forma síncrona.
+
+    El registro de trabajos vive en memoria del proceso del API que lo creó.
+    """
+
+    def __init__(self, max_historial: int):
+        self.max_historial = max_historial
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._trabajos: "OrderedDict[uuid.UUID, BatchScoringJob]" = OrderedDict()
+
+    def solicitar(self, user_ids: Optional[List[uuid.UUID]] = None) -> BatchScoringJob:
+        """Encola una priorización masiva y devuelve el trabajo asociado"""
+        job = BatchScoringJob(user_ids)
+        with self._lock:
+            self._registrar(job)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch-scoring")
+            self._executor.submit(self._ejecutar, job)
+        logger.info(f"🗓️ Priorización masiva {job.id} encolada")
+        return job
+
+    def obtener(self, job_id: uuid.UUID) -> Optional[BatchScoringJob]:
+        with self._lock:
+            return self._trabajos.get(job_id)
+
+    def cerrar(self):
+        """Cancela los trabajos en espera y espera al que está en curso"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _ejecutar(self, job: BatchScoringJob):
+        job.status = "running"
+        job.started_at = datetime.now()
+        try:
+            resultado = puntuar_usuarios(job.user_ids)
+            job.users = resultado["users"]
+            job.tasks = resultado["tasks"]
+            job.seconds = resultado["seconds"]
+            job.users_per_second = resultado["users_per_second"]
+            job.status = "completed"
+        except Exception as e:
+            logger.error(f"❌ Error en la priorización masiva {job.id}: {e}")
+            logger.error(traceback.format_exc())
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.now()
+            logger.info(f"✅ Priorización masiva {job.id} terminada: {job.status}")
+
+    def _registrar(self, job: BatchScoringJob):
+        self._trabajos[job.id] = job
+        while len(self._trabajos) > self.max_historial:
+            job_id, antiguo = next(iter(self._trabajos.items()))
+            if antiguo.status in ("pending", "running"):
+                break
+            del self._trabajos[job_id]
+
+
+batch_scoring_queue = BatchScoringQueue(max_historial=100)
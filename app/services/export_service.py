@@ -0,0 +1,101 @@
+"""
+Exportación en streaming (NDJSON o CSV) de tablas con historial largo.
+
+Las filas se leen con un cursor del servidor (yield_per) como tuplas de
+columnas, sin construir objetos ORM ni modelos Pydantic, y se serializan
+en bloques de EXPORT_FETCH_SIZE filas. La memoria usada no depende del
+tamaño del historial.
+"""
+import csv
+import io
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterator, Sequence
+import logging
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+FORMATOS_EXPORTACION = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def validar_formato(formato: str) -> str:
+    if formato not in FORMATOS_EXPORTACION:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Format must be one of: {', '.join(FORMATOS_EXPORTACION)}"
+        )
+    return FORMATOS_EXPORTACION[formato]
+
+
+def _valor_json(valor: Any) -> Any:
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (uuid.UUID, Decimal)):
+        return str(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def _valor_csv(valor: Any) -> Any:
+    if valor is None:
+        return ""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False)
+    return valor
+
+
+def _serializar_ndjson(nombres: Sequence[str], filas: Sequence[Any]) -> str:
+    return "".join(
+        json.dumps(dict(zip(nombres, fila)), default=_valor_json, ensure_ascii=False) + "\n"
+        for fila in filas
+    )
+
+
+def _serializar_csv(filas: Sequence[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_valor_csv(v) for v in fila] for fila in filas)
+    return buffer.getvalue()
+
+
+def exportar_filas(
+    columnas: Sequence[Any],
+    filtros: Sequence[Any],
+    orden: Sequence[Any],
+    formato: str,
+    fetch_size: int = settings.EXPORT_FETCH_SIZE
+) -> Iterator[str]:
+    """
+    Generador para StreamingResponse. Abre su propia sesión porque se consume
+    después de que el endpoint haya devuelto la respuesta.
+    """
+    nombres = [columna.key for columna in columnas]
+    stmt = select(*columnas).where(*filtros).order_by(*orden).execution_options(yield_per=fetch_size)
+
+    db = SessionLocal()
+    try:
+        if formato == "csv":
+            yield _serializar_csv([nombres])
+
+        total = 0
+        for particion in db.execute(stmt).partitions():
+            total += len(particion)
+            if formato == "csv":
+                yield _serializar_csv(particion)
+            else:
+                yield _serializar_ndjson(nombres, particion)
+
+        logger.info(f"📤 Exportación {formato} completada: {total} filas")
+    finally:
+        db.close()
@@ -0,0 +1,336 @@
+"""
+Subsistema de ejecución de inferencia ML.
+
+La API no evalúa los modelos directamente: puntuar_tareas envía cada lote
+(un grupo de filas por usuario con modelo activo) a ml_executor, que lo
+ejecuta según ML_EXECUTOR_MODE:
+
+- process: un pool de procesos dedicado (spawn). Cada proceso carga los
+  modelos desde la base y los guarda en su propia caché, así que la
+  deserialización y la predicción no compiten por el GIL con las
+  peticiones CRUD del worker de uvicorn. Un lote completo viaja en una sola
+  llamada.
+- local: se ejecuta en el hilo del llamador con su sesión y la caché del
+  proceso. Misma interfaz y mismas métricas; pensado para tests, scripts y
+  despliegues pequeños.
+
+Incluso en modo process, los lotes de menos de ML_EXECUTOR_MIN_ROWS_PROCESS
+filas se predicen en línea: evaluar el árbol sobre unas pocas filas cuesta
+bastante menos que el viaje al pool, y las escrituras de una tarea (que
+puntúan dentro de su transacción) no esperan a otro proceso.
+
+Como mucho ML_EXECUTOR_MAX_PER_USER lotes de un mismo usuario pueden estar
+en vuelo a la vez y ML_EXECUTOR_MAX_PENDING en total. Lo que no se admite,
+falla o tarda más de ML_EXECUTOR_TIMEOUT_SECONDS no rompe la petición: el
+grupo se devuelve sin predicción y el llamador usa el sistema de reglas.
+
+El entrenamiento sigue en su propio pool (training_queue), con debounce y
+un único entrenamiento por usuario.
+"""
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+MODOS = ("local", "process")
+
+# (user_id, model_id, matriz de características del grupo)
+GrupoPrediccion = Tuple[uuid.UUID, uuid.UUID, np.ndarray]
+
+
+def _predecir_lote(grupos: Sequence[GrupoPrediccion], db: Optional[Session] = None):
+    """
+    Predice cada grupo con el modelo de su usuario (de la caché del proceso o
+    de la base). Un grupo que falla devuelve None sin afectar al resto.
+    Devuelve las predicciones, los segundos de cálculo, el pid y el estado de
+    la caché de modelos de este proceso.
+    """
+    from app.database import SessionLocal
+    from app.services.ai_service import obtener_modelo
+    from app.services.model_cache import model_cache
+
+    inicio = time.perf_counter()
+    sesion = db or SessionLocal()
+    try:
+        resultados: List[Optional[np.ndarray]] = []
+        for user_id, model_id, X in grupos:
+            try:
+                modelo = obtener_modelo(sesion, user_id, model_id)
+                resultados.append(None if modelo is None else np.asarray(modelo.predict(X), dtype=np.float64))
+            except Exception as e:
+                logger.error(f"❌ Error en predicción para usuario {user_id}: {e}")
+                logger.error(traceback.format_exc())
+                resultados.append(None)
+    finally:
+        if db is None:
+            sesion.close()
+    return resultados, time.perf_counter() - inicio, os.getpid(), model_cache.stats()
+
+
+def _calentar() -> int:
+    """Importa en el proceso del pool lo necesario para predecir"""
+    import app.services.ai_service  # noqa: F401
+    return os.getpid()
+
+
+class MLExecutor:
+    """
+    Punto de entrada de la inferencia: admite o rechaza cada lote según los
+    límites, lo ejecuta en el modo configurado y lleva las métricas de cola.
+    """
+
+    def __init__(self, modo: str, max_workers: int, max_pendientes: int, max_por_usuario: int,
+                 timeout_segundos: float, min_filas_proceso: int = 0):
+        if modo not in MODOS:
+            raise ValueError(f"ML_EXECUTOR_MODE must be one of: {', '.join(MODOS)}")
+        self.modo = modo
+        self.max_workers = max_workers
+        self.max_pendientes = max_pendientes
+        self.max_por_usuario = max_por_usuario
+        self.timeout_segundos = timeout_segundos
+        self.min_filas_proceso = min_filas_proceso
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._en_vuelo_usuario: Dict[uuid.UUID, int] = defaultdict(int)
+        self._caches_workers: Dict[int, Dict[str, Any]] = {}
+        self.en_vuelo = 0
+        self.max_en_vuelo_observado = 0
+        self.lotes = 0
+        self.grupos = 0
+        self.filas = 0
+        self.completados = 0
+        self.fallidos = 0
+        self.timeouts = 0
+        self.rechazados = 0
+        self.rechazados_usuario = 0
+        self.reinicios_pool = 0
+        self.lotes_en_linea = 0
+        self._espera_total = 0.0
+        self._ejecucion_total = 0.0
+
+    def usar_local(self):
+        """Para procesos que ya son workers de ML (p. ej. los de entrenamiento): predecir en línea"""
+        self.modo = "local"
+
+    def predecir_lote(self, db: Session, grupos: Sequence[GrupoPrediccion]) -> List[Optional[np.ndarray]]:
+        """
+        Predicciones por grupo, en el mismo orden; None para los grupos que deben
+        puntuarse con reglas (sin modelo, rechazados por los límites, error o timeout).
+        """
+        resultados: List[Optional[np.ndarray]] = [None] * len(grupos)
+        admitidos = self._admitir(grupos)
+        if not admitidos:
+            return resultados
+
+        lote = [grupos[i] for i in admitidos]
+        usuarios = [grupo[0] for grupo in lote]
+        enviado = time.perf_counter()
+
+        if self.modo == "local" or sum(len(grupo[2]) for grupo in lote) < self.min_filas_proceso:
+            if self.modo == "process":
+                with self._lock:
+                    self.lotes_en_linea += 1
+            try:
+                salida = _predecir_lote(lote, db)
+            except Exception as e:
+                logger.error(f"❌ Error en el lote de inferencia local: {e}")
+                self._terminar(usuarios, enviado, error=True)
+                return resultados
+            self._terminar(usuarios, enviado, salida=salida)
+        else:
+            try:
+                executor, future = self._enviar(_predecir_lote, lote)
+            except Exception as e:
+                logger.error(f"❌ No se pudo enviar el lote de inferencia al pool: {e}")
+                self._terminar(usuarios, enviado, error=True)
+                return resultados
+            # Los huecos se liberan cuando el lote termina de verdad, aunque aquí venza el timeout
+            future.add_done_callback(lambda f: self._al_terminar(executor, usuarios, enviado, f))
+            try:
+                salida = future.result(timeout=self.timeout_segundos)
+            except Exception as e:
+                if isinstance(e, TimeoutError):
+                    with self._lock:
+                        self.timeouts += 1
+                    logger.warning(f"⏳ Lote de inferencia sin respuesta en {self.timeout_segundos}s; se usan reglas")
+                return resultados
+
+        for i, prediccion in zip(admitidos, salida[0]):
+            resultados[i] = prediccion
+        return resultados
+
+    def calentar(self):
+        """Arranca los procesos del pool y carga en ellos el código de inferencia"""
+        if self.modo != "process":
+            return
+        try:
+            futures = [self._enviar(_calentar)[1] for _ in range(self.max_workers)]
+            pids = {f.result() for f in futures}
+            logger.info(f"🔥 Pool de inferencia listo ({len(pids)} procesos)")
+        except Exception as e:
+            logger.error(f"❌ No se pudo calentar el pool de inferencia: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            if self.modo == "process":
+                caches = list(self._caches_workers.values())
+                cache = {
+                    clave: sum(c[clave] for c in caches)
+                    for clave in ("entries", "bytes", "hits", "misses", "evictions")
+                }
+                cache["workers_reporting"] = len(caches)
+            else:
+                from app.services.model_cache import model_cache
+                cache = model_cache.stats()
+            terminados = self.completados + self.fallidos
+            return {
+                "mode": self.modo,
+                "workers": self.max_workers if self.modo == "process" else 0,
+                "max_pending": self.max_pendientes,
+                "max_per_user": self.max_por_usuario,
+                "min_rows_process": self.min_filas_proceso,
+                "inline_batches": self.lotes_en_linea,
+                "in_flight": self.en_vuelo,
+                "max_in_flight_observed": self.max_en_vuelo_observado,
+                "users_in_flight": len(self._en_vuelo_usuario),
+                "batches": self.lotes,
+                "groups": self.grupos,
+                "rows": self.filas,
+                "completed": self.completados,
+                "failed": self.fallidos,
+                "timeouts": self.timeouts,
+                "rejected": self.rechazados,
+                "rejected_per_user_limit": self.rechazados_usuario,
+                "pool_restarts": self.reinicios_pool,
+                "avg_wait_ms": round(self._espera_total / self.completados * 1000, 2) if self.completados else 0.0,
+                "avg_run_ms": round(self._ejecucion_total / terminados * 1000, 2) if terminados else 0.0,
+                "model_cache": cache,
+            }
+
+    def cerrar(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _admitir(self, grupos: Sequence[GrupoPrediccion]) -> List[int]:
+        """Índices de los grupos admitidos; reserva sus huecos por usuario"""
+        if not grupos:
+            return []
+        with self._lock:
+            if self.en_vuelo >= self.max_pendientes:
+                self.rechazados += 1
+                logger.warning(f"⚠️ Cola de inferencia llena ({self.en_vuelo} lotes); se usan reglas")
+                return []
+            admitidos = []
+            for i, (user_id, _, _) in enumerate(grupos):
+                if self._en_vuelo_usuario[user_id] >= self.max_por_usuario:
+                    self.rechazados_usuario += 1
+                    continue
+                self._en_vuelo_usuario[user_id] += 1
+                admitidos.append(i)
+            # Un usuario sin huecos no debe quedarse como clave vacía
+            for user_id, _, _ in grupos:
+                if self._en_vuelo_usuario.get(user_id) == 0:
+                    del self._en_vuelo_usuario[user_id]
+            if admitidos:
+                self.en_vuelo += 1
+                self.max_en_vuelo_observado = max(self.max_en_vuelo_observado, self.en_vuelo)
+                self.lotes += 1
+                self.grupos += len(admitidos)
+                self.filas += sum(len(grupos[i][2]) for i in admitidos)
+            return admitidos
+
+    def _al_terminar(self, executor: ProcessPoolExecutor, usuarios: List[uuid.UUID], enviado: float, future: Future):
+        try:
+            salida = future.result()
+        except Exception as e:
+            logger.error(f"❌ Error en el lote de inferencia: {e}")
+            if isinstance(e, BrokenProcessPool):
+                # Un proceso murió: el pool se recrea en el siguiente envío
+                self._descartar_executor(executor)
+            self._terminar(usuarios, enviado, error=True)
+            return
+        self._terminar(usuarios, enviado, salida=salida)
+
+    def _terminar(self, usuarios: List[uuid.UUID], enviado: float, salida=None, error: bool = False):
+        total = time.perf_counter() - enviado
+        with self._lock:
+            self.en_vuelo -= 1
+            for user_id in usuarios:
+                self._en_vuelo_usuario[user_id] -= 1
+                if self._en_vuelo_usuario[user_id] <= 0:
+                    del self._en_vuelo_usuario[user_id]
+            if error:
+                self.fallidos += 1
+                self._ejecucion_total += total
+                return
+            _, segundos, pid, cache = salida
+            self.completados += 1
+            self._ejecucion_total += segundos
+            self._espera_total += max(total - segundos, 0.0)
+            # Los lotes pequeños en línea usan la caché de este proceso, no la de un worker
+            if self.modo == "process" and pid != os.getpid():
+                self._caches_workers[pid] = cache
+
+    def _enviar(self, funcion, *args) -> Tuple[ProcessPoolExecutor, Future]:
+        """Envía al pool; devuelve también el pool usado, que es el que se descarta si se rompe"""
+        executor = self._obtener_executor()
+        try:
+            return executor, executor.submit(funcion, *args)
+        except BrokenProcessPool:
+            # Un proceso murió estando ocioso (OOM, señal): se recrea el pool y se reintenta una vez
+            logger.warning("⚠️ Pool de inferencia roto; se recrea")
+            self._descartar_executor(executor)
+            executor = self._obtener_executor()
+            return executor, executor.submit(funcion, *args)
+
+    def _descartar_executor(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            # Otro hilo ya pudo sustituirlo por uno nuevo: ese no se toca
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.reinicios_pool += 1
+            self._caches_workers.clear()
+        executor.shutdown(wait=False)
+
+    def _obtener_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: los hijos no heredan hilos ni conexiones abiertas del proceso del API
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_inicializar_worker
+                )
+            return self._executor
+
+
+def _inicializar_worker():
+    # Dentro del pool se predice en línea: un worker no debe abrir otro pool
+    ml_executor.usar_local()
+
+
+ml_executor = MLExecutor(
+    modo=settings.ML_EXECUTOR_MODE,
+    max_workers=settings.ML_EXECUTOR_WORKERS,
+    max_pendientes=settings.ML_EXECUTOR_MAX_PENDING,
+    max_por_usuario=settings.ML_EXECUTOR_MAX_PER_USER,
+    timeout_segundos=settings.ML_EXECUTOR_TIMEOUT_SECONDS,
+    min_filas_proceso=settings.ML_EXECUTOR_MIN_ROWS_PROCESS
+)
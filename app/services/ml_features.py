@@ -0,0 +1,167 @@
+"""
+Extracción columnar de características para el modelo de prioridad.
+
+Entrenamiento, predicción y TaskMLData.features comparten esta única
+implementación: recibe las columnas de las tareas y devuelve la matriz
+de características en una sola pasada vectorizada (ufuncs de np.strings
+sobre arrays StringDType y búsquedas de enumerados codificadas en arrays).
+Con pocas tareas (menos de MIN_FILAS_VECTORIZADO) se calcula fila a fila,
+que es más rápido. codificar_niveles es también la codificación de niveles
+de priority_rules.
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FEATURE_NAMES = [
+    'urgencia_encoded', 'impacto_encoded', 'energia_encoded',
+    'duracion_estimada', 'longitud_descripcion',
+    'tiene_urgente', 'tiene_bug', 'deadline_proximo'
+]
+
+# Columnas de Task necesarias para calcular las características, en orden
+COLUMNAS_FEATURES = [
+    'urgency', 'impact', 'energy_required', 'estimated_duration',
+    'title', 'description', 'deadline'
+]
+
+# Códigos de nivel tras normalizar: low=0, medium=1, high=2
+NIVEL_CODIGOS = {"low": 0, "medium": 1, "high": 2}
+
+# deadline_proximo: (deadline - ahora).days <= 1  <=>  faltan menos de 2 días
+_SEGUNDOS_DEADLINE_PROXIMO = 2 * 24 * 3600
+
+# Por debajo de estas filas la versión por fila es más rápida que la vectorizada
+# (preparar los arrays StringDType cuesta más que recorrer unas pocas tareas);
+# scripts/benchmarks/bench_features.py mide el punto de cruce
+MIN_FILAS_VECTORIZADO = 64
+
+
+def normalizar_nivel(valor: str) -> str:
+    if not valor:
+        return "medium"
+    v = str(valor).lower().strip()
+    if v in ("high", "critical", "crític", "urgent", "crucial"):
+        return "high"
+    elif v in ("low", "baja", "minimum"):
+        return "low"
+    else:
+        return "medium"
+
+
+def codigo_nivel(valor: Optional[str]) -> int:
+    """Código de un nivel tras normalizarlo (sin valor o desconocido = medium)"""
+    return NIVEL_CODIGOS[normalizar_nivel(valor)]
+
+
+def factorizar(valores: Sequence[Any]) -> Tuple[Dict[Any, int], np.ndarray]:
+    """Valores distintos (en orden de aparición) y el índice de cada elemento entre ellos"""
+    indices: Dict[Any, int] = {}
+    inversos = np.fromiter(
+        (indices.setdefault(v, len(indices)) for v in valores),
+        dtype=np.intp, count=len(valores)
+    )
+    return indices, inversos
+
+
+def codificar_niveles(
+    valores: Sequence[Optional[str]],
+    codigo: Callable[[Optional[str]], int] = codigo_nivel,
+    dtype=np.float64
+) -> np.ndarray:
+    """Factoriza la columna y resuelve cada valor distinto una sola vez con una tabla de códigos"""
+    indices, inversos = factorizar(valores)
+    tabla = np.array([codigo(v) for v in indices], dtype=dtype)
+    return tabla[inversos]
+
+
+def _texto(valores: Sequence[Optional[str]], minusculas: bool = False) -> np.ndarray:
+    if minusculas:
+        valores = [v.lower() if v else "" for v in valores]
+    else:
+        valores = [v or "" for v in valores]
+    return np.array(valores, dtype=np.dtypes.StringDType())
+
+
+def _contiene(textos: np.ndarray, *palabras: str) -> np.ndarray:
+    resultado = np.zeros(len(textos), dtype=bool)
+    for palabra in palabras:
+        resultado |= np.strings.find(textos, palabra) >= 0
+    return resultado
+
+
+def extraer_features(
+    urgency: Sequence[Optional[str]],
+    impact: Sequence[Optional[str]],
+    energy_required: Sequence[Optional[str]],
+    estimated_duration: Sequence[Optional[int]],
+    title: Sequence[Optional[str]],
+    description: Sequence[Optional[str]],
+    deadline: Sequence[Optional[datetime]],
+    ahora: Optional[datetime] = None
+) -> np.ndarray:
+    """Devuelve la matriz (n_tareas, 8) de características en el orden de FEATURE_NAMES"""
+    n = len(urgency)
+    X = np.empty((n, len(FEATURE_NAMES)), dtype=np.float64)
+    if n == 0:
+        return X
+
+    ahora = ahora or datetime.now()
+    if n < MIN_FILAS_VECTORIZADO:
+        return np.array([
+            _features_fila(*fila, ahora)
+            for fila in zip(urgency, impact, energy_required, estimated_duration, title, description, deadline)
+        ], dtype=np.float64)
+
+    titulos = _texto(title, minusculas=True)
+    descripciones = _texto(description)
+
+    X[:, 0] = codificar_niveles(urgency)
+    X[:, 1] = codificar_niveles(impact)
+    X[:, 2] = codificar_niveles(energy_required)
+
+    duraciones = np.array(estimated_duration, dtype=np.float64)
+    X[:, 3] = np.where(np.isnan(duraciones) | (duraciones == 0), 60.0, duraciones)
+
+    X[:, 4] = np.strings.str_len(descripciones)
+    X[:, 5] = _contiene(_texto(description, minusculas=True), "urgent") | _contiene(titulos, "crític")
+    X[:, 6] = _contiene(titulos, "bug", "fix")
+
+    segundos = np.fromiter(
+        ((d - ahora).total_seconds() if d else np.inf for d in deadline),
+        dtype=np.float64, count=n
+    )
+    X[:, 7] = segundos < _SEGUNDOS_DEADLINE_PROXIMO
+    return X
+
+
+def _features_fila(urgency, impact, energy_required, estimated_duration, title, description, deadline,
+                   ahora: datetime) -> List[float]:
+    """Las mismas características que extraer_features para una sola tarea"""
+    titulo = (title or "").lower()
+    descripcion = description or ""
+    return [
+        codigo_nivel(urgency),
+        codigo_nivel(impact),
+        codigo_nivel(energy_required),
+        float(estimated_duration or 60),
+        len(descripcion),
+        "urgent" in descripcion.lower() or "crític" in titulo,
+        "bug" in titulo or "fix" in titulo,
+        bool(deadline) and (deadline - ahora).total_seconds() < _SEGUNDOS_DEADLINE_PROXIMO,
+    ]
+
+
+def columnas_desde_tareas(tasks: Sequence[Any]) -> Dict[str, List[Any]]:
+    """Transpone una lista de objetos Task a las columnas que usa extraer_features"""
+    return {columna: [getattr(t, columna) for t in tasks] for columna in COLUMNAS_FEATURES}
+
+
+def features_de_tareas(tasks: Sequence[Any], ahora: Optional[datetime] = None) -> np.ndarray:
+    return extraer_features(**columnas_desde_tareas(tasks), ahora=ahora)
+
+
+def features_a_dicts(X: np.ndarray) -> List[Dict[str, float]]:
+    """Convierte la matriz en diccionarios serializables para TaskMLData.features"""
+    return [dict(zip(FEATURE_NAMES, fila)) for fila in X.tolist()]
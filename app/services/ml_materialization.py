@@ -0,0 +1,161 @@
+"""
+Materialización de puntajes ML en TaskMLData y lectura de /prioritized.
+
+Cada cambio de una tarea o reentrenamiento del modelo recalcula el puntaje
+base de las tareas afectadas; la lectura recorre el índice por el puntaje
+guardado y solo aplica lo que depende del momento de la consulta. Toda tarea
+pendiente tiene su fila: la migración 0009 rellenó las anteriores a la
+materialización y, si falla el puntaje con el modelo, se guarda el de reglas.
+"""
+import traceback
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.database_models import Task, TaskMLData, MLFeedback
+from app.services.ai_service import (
+    AJUSTE_CONTEXTUAL_MAXIMO, VENTANA_FEEDBACK_NEGATIVO, ajuste_contextual, aplicar_ajuste, recomendar_horario
+)
+from app.services.batch_scoring import (
+    COLUMNAS_PUNTUACION, ESTADOS_PENDIENTES, modelos_activos, puntuar_tareas, guardar_puntajes
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _materializar(db: Session, user_id: uuid.UUID, task_ids: Optional[Sequence[uuid.UUID]], solo_reglas: bool) -> int:
+    query = db.query(*COLUMNAS_PUNTUACION).filter(
+        Task.user_id == user_id,
+        Task.status.in_(ESTADOS_PENDIENTES)
+    )
+    if task_ids is not None:
+        query = query.filter(Task.id.in_(task_ids))
+    tareas = query.all()
+
+    filas = puntuar_tareas(db, tareas, {} if solo_reglas else modelos_activos(db, [user_id]))
+    guardar_puntajes(db, filas)
+
+    if task_ids is not None:
+        pendientes = {fila.id for fila in tareas}
+        descartadas = [task_id for task_id in task_ids if task_id not in pendientes]
+        if descartadas:
+            db.query(TaskMLData).filter(
+                TaskMLData.task_id.in_(descartadas)
+            ).delete(synchronize_session=False)
+    return len(filas)
+
+
+def materializar_tareas(
+    db: Session,
+    user_id: uuid.UUID,
+    task_ids: Optional[Sequence[uuid.UUID]] = None,
+    confirmar: bool = True,
+    solo_reglas: bool = False
+):
+    """
+    Recalcula y guarda el puntaje de las tareas pendientes del usuario (todas o solo
+    task_ids). Las tareas indicadas que ya no están pendientes pierden su fila.
+    Nunca propaga errores al llamador. Con confirmar=True confirma su propia
+    transacción; con confirmar=False trabaja en un SAVEPOINT dentro de la transacción
+    del llamador, que es quien confirma (si falla, solo se deshace el savepoint).
+    Si falla, se reintenta una vez puntuando solo con reglas: una tarea pendiente
+    sin fila no aparece en /prioritized hasta la siguiente priorización masiva.
+    """
+    try:
+        if confirmar:
+            total = _materializar(db, user_id, task_ids, solo_reglas)
+            db.commit()
+        else:
+            with db.begin_nested():
+                total = _materializar(db, user_id, task_ids, solo_reglas)
+        logger.info(f"💾 Puntajes materializados: {total} tareas del usuario {user_id}")
+    except Exception as e:
+        logger.error(f"❌ Error al materializar puntajes: {e}")
+        logger.error(traceback.format_exc())
+        if confirmar:
+            db.rollback()
+        if not solo_reglas:
+            materializar_tareas(db, user_id, task_ids, confirmar=confirmar, solo_reglas=True)
+
+
+def consulta_priorizadas(user_id: uuid.UUID, ahora: datetime, despues: Optional[Tuple[Any, uuid.UUID]] = None):
+    """
+    Tareas pendientes con su puntaje base y feedback negativo reciente, en el orden
+    de ix_task_ml_data_user_score (puntaje descendente, task_id). Con despues, solo
+    las que siguen a ese (puntaje, task_id) en ese orden.
+    """
+    feedback_negativo = exists().where(and_(
+        MLFeedback.task_id == Task.id,
+        MLFeedback.user_id == user_id,
+        MLFeedback.created_at >= ahora - VENTANA_FEEDBACK_NEGATIVO,
+        MLFeedback.was_useful == False
+    ))
+
+    query = select(
+        Task,
+        TaskMLData.ml_priority_score,
+        feedback_negativo.label("feedback_negativo")
+    ).join(
+        Task, Task.id == TaskMLData.task_id
+    ).where(
+        TaskMLData.user_id == user_id,
+        Task.status.in_(ESTADOS_PENDIENTES)
+    )
+    if despues is not None:
+        puntaje, task_id = despues
+        query = query.where(or_(
+            TaskMLData.ml_priority_score < puntaje,
+            and_(TaskMLData.ml_priority_score == puntaje, TaskMLData.task_id > task_id)
+        ))
+    return query.order_by(TaskMLData.ml_priority_score.desc(), TaskMLData.task_id)
+
+
+async def leer_tareas_priorizadas(db: AsyncSession, user_id: uuid.UUID, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Página skip/limit de las tareas pendientes ordenadas por el puntaje ajustado (el
+    materializado con los ajustes contextuales y el horario, que dependen de la hora).
+
+    La paginación y el orden usan el mismo valor, así que ninguna tarea se repite ni
+    se salta entre páginas. Como el ajuste nunca supera AJUSTE_CONTEXTUAL_MAXIMO, las
+    filas se leen en lotes crecientes en el orden del índice y la lectura se detiene cuando
+    ninguna tarea sin leer puede superar a la última de la página. Solo con puntajes
+    muy próximos entre sí se llega a leer todas las pendientes del usuario.
+    """
+    ahora = datetime.now()
+    hora_actual = ahora.hour
+    necesarias = skip + limit
+    lote = max(necesarias, 100)
+
+    candidatas = []
+    despues = None
+    while True:
+        filas = (await db.execute(consulta_priorizadas(user_id, ahora, despues).limit(lote))).all()
+        for task, puntaje_base, tiene_feedback_negativo in filas:
+            ajuste = ajuste_contextual(task, hora_actual, tiene_feedback_negativo, ahora)
+            candidatas.append((aplicar_ajuste(float(puntaje_base), ajuste), task))
+        if len(filas) < lote:
+            break
+
+        # Ninguna tarea sin leer puede pasar de su puntaje base con el ajuste máximo
+        task, puntaje_base, _ = filas[-1]
+        despues = (puntaje_base, task.id)
+        cota = aplicar_ajuste(float(puntaje_base), AJUSTE_CONTEXTUAL_MAXIMO)
+        if len(candidatas) >= necesarias:
+            candidatas.sort(key=lambda c: (-c[0], c[1].id))
+            del candidatas[necesarias:]
+            if candidatas[-1][0] > cota:
+                break
+        lote *= 2
+
+    candidatas.sort(key=lambda c: (-c[0], c[1].id))
+    return [{
+        'task_obj': task,
+        'puntaje_ml': puntaje,
+        'recommended_schedule': recomendar_horario(task),
+        'titulo': task.title
+    } for puntaje, task in candidatas[skip:necesarias]]
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+import uuid
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ClaveModelo = Tuple[uuid.UUID, uuid.UUID]
+
+
+class ModelCache:
+    """
+    Caché LRU en memoria de modelos ya deserializados.
+    La clave es (user_id, AIModel.id) y el tamaño de cada entrada se estima
+    con los bytes del blob almacenado, respetando un presupuesto total.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entradas: "OrderedDict[ClaveModelo, Tuple[Any, int]]" = OrderedDict()
+        self._bytes_actuales = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: uuid.UUID, model_id: uuid.UUID) -> Optional[Any]:
+        clave = (user_id, model_id)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.hits += 1
+            return entrada[0]
+
+    def put(self, user_id: uuid.UUID, model_id: uuid.UUID, modelo: Any, tamano: int):
+        if self.max_bytes <= 0 or tamano > self.max_bytes:
+            return
+
+        clave = (user_id, model_id)
+        with self._lock:
+            # Un usuario solo tiene un modelo activo: las versiones previas sobran
+            self._descartar_usuario(user_id)
+            self._entradas[clave] = (modelo, tamano)
+            self._bytes_actuales += tamano
+
+            while self._bytes_actuales > self.max_bytes and self._entradas:
+                _, (_, tamano_expulsado) = self._entradas.popitem(last=False)
+                self._bytes_actuales -= tamano_expulsado
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: uuid.UUID):
+        with self._lock:
+            self._descartar_usuario(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes_actuales = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entradas),
+                "bytes": self._bytes_actuales,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _descartar_usuario(self, user_id: uuid.UUID):
+        for clave in [c for c in self._entradas if c[0] == user_id]:
+            _, tamano = self._entradas.pop(clave)
+            self._bytes_actuales -= tamano
+
+
+model_cache = ModelCache(max_bytes=settings.ML_MODEL_CACHE_MAX_BYTES)
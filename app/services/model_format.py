@@ -0,0 +1,248 @@
+"""
+Formato compacto y versionado para los modelos de prioridad guardados en
+AIModel.model_data.
+
+En lugar del pickle de joblib del DecisionTreeClassifier completo se guardan
+solo los arreglos del árbol que hacen falta para predecir:
+
+    cabecera (64 bytes, little-endian)
+        magic        4s   b"STMT"
+        version      H    versión del formato (FORMATO_VERSION)
+        codec        B    0 none, 1 zlib, 2 zstd, 3 lz4
+        reservado    B
+        n_nodos      I
+        n_features   I
+        n_clases     I
+        profundidad  I    profundidad máxima del árbol
+        longitud     Q    bytes del payload sin comprimir
+        sha256       32s  hash del payload sin comprimir
+    payload (opcionalmente comprimido)
+        threshold       float64[n_nodos]
+        value           float64[n_nodos * n_clases]
+        classes         float64[n_clases]
+        children_left   int32[n_nodos]
+        children_right  int32[n_nodos]
+        feature         int32[n_nodos]
+
+Los arreglos float64 van primero y la cabecera mide 64 bytes, así que todos
+quedan alineados y se leen con np.frombuffer directamente sobre el blob (sin
+copia y sin pickle) cuando el payload no está comprimido. El hash se
+comprueba siempre antes de usar el modelo.
+
+Los blobs antiguos (pickle de joblib, model_version "3.1") se siguen
+pudiendo leer con cargar_modelo, que distingue ambos formatos por el magic.
+
+ArbolCompacto.predict evalúa el árbol solo con NumPy y da exactamente el
+mismo resultado que DecisionTreeClassifier.predict, de modo que los workers
+de la API no importan scikit-learn para servir predicciones; solo lo
+necesita el entrenamiento.
+"""
+import hashlib
+import struct
+import zlib
+from dataclasses import dataclass
+from functools import cached_property
+from io import BytesIO
+from typing import Any, Tuple, Union
+
+import numpy as np
+
+MAGIC = b"STMT"
+FORMATO_VERSION = 1
+# model_version de AIModel para los modelos guardados en este formato
+MODEL_VERSION = "3.2"
+
+_CABECERA = struct.Struct("<4sHBBIIIIQ32s")
+TAMANO_CABECERA = _CABECERA.size
+
+CODECS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+_NOMBRES_CODEC = {v: k for k, v in CODECS.items()}
+
+Blob = Union[bytes, bytearray, memoryview]
+
+
+class FormatoModeloError(ValueError):
+    """Blob de modelo corrupto, truncado o de una versión desconocida"""
+
+
+@dataclass(frozen=True)
+class ArbolCompacto:
+    """Árbol de decisión reducido a sus arreglos; suficiente para predecir"""
+    children_left: np.ndarray
+    children_right: np.ndarray
+    feature: np.ndarray
+    threshold: np.ndarray
+    value: np.ndarray      # (n_nodos, n_clases)
+    classes: np.ndarray
+    n_features: int
+    profundidad: int
+
+    @property
+    def n_nodos(self) -> int:
+        return len(self.threshold)
+
+    @cached_property
+    def _compilado(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Arreglos planos para el recorrido vectorizado:
+
+        - hijos[2 * nodo + ir_a_la_derecha]; las hojas apuntan a sí mismas, así
+          que los pasos que sobran no las mueven;
+        - característica de cada nodo (0 en las hojas, que no se evalúan);
+        - umbral en float32: el mayor float32 <= threshold, de modo que para un
+          x float32, x <= umbral equivale exactamente a x <= threshold;
+        - clase que predice cada nodo.
+        """
+        nodos = np.arange(self.n_nodos, dtype=np.int32)
+        es_hoja = self.children_left == -1
+        hijos = np.column_stack([
+            np.where(es_hoja, nodos, self.children_left),
+            np.where(es_hoja, nodos, self.children_right),
+        ]).astype(np.int32).ravel()
+        feature = np.where(es_hoja, 0, self.feature).astype(np.intp)
+        umbral = self.threshold.astype(np.float32)
+        umbral = np.where(umbral > self.threshold, np.nextafter(umbral, np.float32(-np.inf)), umbral)
+        clase_nodo = self.classes[np.argmax(self.value, axis=1)]
+        return hijos, feature, umbral, clase_nodo
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Igual que DecisionTreeClassifier.predict: X se convierte a float32 como
+        hace scikit-learn y cada fila baja por el árbol con x <= threshold. El
+        lote avanza un nivel por iteración (`profundidad` iteraciones), todas
+        las filas a la vez, leyendo X por columnas.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X debe tener forma (n, {self.n_features}), tiene {X.shape}")
+        hijos, feature, umbral, clase_nodo = self._compilado
+        n = len(X)
+        columnas = np.ascontiguousarray(X.T).ravel()
+        filas = np.arange(n, dtype=np.intp)
+        nodos = np.zeros(n, dtype=np.int32)
+        for _ in range(self.profundidad):
+            a_la_derecha = columnas.take(feature.take(nodos) * n + filas) > umbral.take(nodos)
+            nodos = hijos.take(nodos * 2 + a_la_derecha)
+        return clase_nodo.take(nodos)
+
+
+def desde_sklearn(modelo: Any) -> ArbolCompacto:
+    """Extrae los arreglos de un DecisionTreeClassifier entrenado (de una sola salida)"""
+    arbol = modelo.tree_
+    if arbol.n_outputs != 1:
+        raise ValueError("Solo se admiten árboles de una salida")
+    return ArbolCompacto(
+        children_left=arbol.children_left.astype(np.int32),
+        children_right=arbol.children_right.astype(np.int32),
+        feature=arbol.feature.astype(np.int32),
+        threshold=arbol.threshold.astype(np.float64),
+        value=arbol.value[:, 0, :].astype(np.float64),
+        classes=np.asarray(modelo.classes_, dtype=np.float64),
+        n_features=int(modelo.n_features_in_),
+        profundidad=int(arbol.max_depth),
+    )
+
+
+def _comprimir(codec: str, datos: bytes) -> bytes:
+    if codec == "none":
+        return datos
+    if codec == "zlib":
+        return zlib.compress(datos, 6)
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(datos)
+    import lz4.frame
+    return lz4.frame.compress(datos)
+
+
+def _descomprimir(codec: str, datos: memoryview) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(datos)
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(datos)
+    import lz4.frame
+    return lz4.frame.decompress(datos)
+
+
+def serializar(arbol: ArbolCompacto, codec: str = "none") -> bytes:
+    if codec not in CODECS:
+        raise ValueError(f"ML_MODEL_COMPRESSION must be one of: {', '.join(CODECS)}")
+    payload = b"".join(
+        np.ascontiguousarray(arreglo).tobytes()
+        for arreglo in (
+            arbol.threshold, arbol.value, arbol.classes,
+            arbol.children_left, arbol.children_right, arbol.feature,
+        )
+    )
+    cabecera = _CABECERA.pack(
+        MAGIC, FORMATO_VERSION, CODECS[codec], 0,
+        arbol.n_nodos, arbol.n_features, len(arbol.classes), arbol.profundidad,
+        len(payload), hashlib.sha256(payload).digest()
+    )
+    return cabecera + _comprimir(codec, payload)
+
+
+def es_formato_compacto(blob: Blob) -> bool:
+    return bytes(memoryview(blob)[:len(MAGIC)]) == MAGIC
+
+
+def deserializar(blob: Blob) -> ArbolCompacto:
+    """
+    Reconstruye el árbol desde el blob. Sin compresión, los arreglos son
+    vistas de solo lectura sobre el propio blob.
+    """
+    vista = memoryview(blob)
+    if len(vista) < TAMANO_CABECERA:
+        raise FormatoModeloError("Blob de modelo truncado")
+    (magic, version, codec_id, _, n_nodos, n_features, n_clases, profundidad,
+     longitud, sha256) = _CABECERA.unpack_from(vista)
+    if magic != MAGIC:
+        raise FormatoModeloError("El blob no está en el formato compacto")
+    if version != FORMATO_VERSION:
+        raise FormatoModeloError(f"Versión de formato no soportada: {version}")
+    if codec_id not in _NOMBRES_CODEC:
+        raise FormatoModeloError(f"Codec desconocido: {codec_id}")
+
+    payload = vista[TAMANO_CABECERA:]
+    if codec_id != CODECS["none"]:
+        payload = memoryview(_descomprimir(_NOMBRES_CODEC[codec_id], payload))
+    if len(payload) != longitud or longitud != n_nodos * (20 + 8 * n_clases) + 8 * n_clases:
+        raise FormatoModeloError("Longitud del payload inconsistente")
+    if hashlib.sha256(payload).digest() != sha256:
+        raise FormatoModeloError("El hash del modelo no coincide")
+
+    desplazamiento = 0
+
+    def leer(dtype, cantidad):
+        nonlocal desplazamiento
+        arreglo = np.frombuffer(payload, dtype=dtype, count=cantidad, offset=desplazamiento)
+        desplazamiento += arreglo.nbytes
+        return arreglo
+
+    threshold = leer("<f8", n_nodos)
+    value = leer("<f8", n_nodos * n_clases).reshape(n_nodos, n_clases)
+    classes = leer("<f8", n_clases)
+    return ArbolCompacto(
+        children_left=leer("<i4", n_nodos),
+        children_right=leer("<i4", n_nodos),
+        feature=leer("<i4", n_nodos),
+        threshold=threshold,
+        value=value,
+        classes=classes,
+        n_features=n_features,
+        profundidad=profundidad,
+    )
+
+
+def cargar_modelo(blob: Blob) -> ArbolCompacto:
+    """
+    Carga un modelo guardado. Los blobs antiguos (pickle de joblib) se
+    convierten al cargarlos, así que la predicción nunca pasa por
+    scikit-learn; solo deserializarlos lo importa
+    (scripts/convertir_modelos.py los reescribe en el formato compacto).
+    """
+    if es_formato_compacto(blob):
+        return deserializar(blob)
+    import joblib
+    return desde_sklearn(joblib.load(BytesIO(bytes(blob))))
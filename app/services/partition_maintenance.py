@@ -0,0 +1,242 @@
+"""
+Mantenimiento de las particiones mensuales de task_history y energy_logs.
+
+Ambas tablas están particionadas por rango de mes sobre su marca de tiempo
+(created_at / logged_at), con una partición DEFAULT que recoge cualquier fila
+fuera de los meses creados para que un INSERT nunca falle. Este módulo:
+
+- crea por adelantado las particiones del mes actual y de los
+  PARTITION_PREMAKE_MONTHS siguientes (al arrancar la aplicación y desde
+  scripts/mantener_particiones.py); si la partición DEFAULT ya tiene filas de
+  ese mes, se mueven a la nueva partición antes de adjuntarla;
+- aplica la retención, solo desde scripts/mantener_particiones.py (nunca en
+  los workers del API): los meses anteriores a la ventana configurada se
+  archivan en CSV comprimido en PARTITION_ARCHIVE_DIR
+  (PARTITION_RETENTION_MODE=archive) o se eliminan directamente (drop).
+  Borrar una partición entera es instantáneo y no deja filas muertas, a
+  diferencia de un DELETE.
+
+PARTITION_ARCHIVE_DIR no tiene valor por defecto: el archivo se escribe en el
+host donde se ejecuta el script, así que debe ser un almacenamiento duradero
+(un volumen compartido o montado) y no un directorio local cualquiera.
+
+Todas las operaciones se serializan con un advisory lock para que varios
+procesos puedan llamarlas a la vez.
+"""
+import gzip
+import os
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Tabla particionada -> columna de partición
+TABLAS_PARTICIONADAS = {
+    "task_history": "created_at",
+    "energy_logs": "logged_at",
+}
+
+MODOS_RETENCION = ("archive", "drop")
+
+# Particiones gestionadas aquí: <tabla>_pAAAA_MM y <tabla>_default
+PATRON_PARTICION = re.compile(r"^(%s)_(p(\d{4})_(\d{2})|default)$" % "|".join(TABLAS_PARTICIONADAS))
+
+# Clave del advisory lock de mantenimiento de particiones
+_CLAVE_BLOQUEO = 7_190_019
+
+# Crear y eliminar particiones bloquea la tabla padre; sin límite, una transacción
+# larga abierta haría esperar al mantenimiento y, detrás de él, a todos los INSERT
+LOCK_TIMEOUT = "5s"
+
+
+def inicio_mes(fecha) -> date:
+    return date(fecha.year, fecha.month, 1)
+
+
+def sumar_meses(mes: date, n: int) -> date:
+    total = mes.year * 12 + mes.month - 1 + n
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def nombre_particion(tabla: str, mes: date) -> str:
+    return f"{tabla}_p{mes:%Y_%m}"
+
+
+def es_particion(nombre: str) -> bool:
+    return PATRON_PARTICION.match(nombre) is not None
+
+
+def particiones_mensuales(conn: Connection, tabla: str) -> Dict[date, str]:
+    """Particiones mensuales existentes de la tabla, por mes"""
+    nombres = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:tabla AS regclass)"
+    ), {"tabla": tabla}).scalars()
+    meses = {}
+    for nombre in nombres:
+        coincidencia = PATRON_PARTICION.match(nombre)
+        if coincidencia and coincidencia.group(3):
+            meses[date(int(coincidencia.group(3)), int(coincidencia.group(4)), 1)] = nombre
+    return meses
+
+
+def crear_particion(conn: Connection, tabla: str, mes: date) -> str:
+    """
+    Crea la partición del mes. Si la partición DEFAULT contiene filas de ese
+    rango, la tabla se crea suelta, recibe esas filas y después se adjunta
+    (PostgreSQL no permite crear la partición mientras DEFAULT las tenga).
+    """
+    columna = TABLAS_PARTICIONADAS[tabla]
+    particion = nombre_particion(tabla, mes)
+    rango = {"desde": mes, "hasta": sumar_meses(mes, 1)}
+    limites = f"FOR VALUES FROM ('{rango['desde']}') TO ('{rango['hasta']}')"
+
+    en_default = conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {tabla}_default "
+        f"WHERE {columna} >= :desde AND {columna} < :hasta)"
+    ), rango).scalar()
+
+    if not en_default:
+        conn.execute(text(f"CREATE TABLE {particion} PARTITION OF {tabla} {limites}"))
+    else:
+        conn.execute(text(f"CREATE TABLE {particion} (LIKE {tabla} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        movidas = conn.execute(text(
+            f"WITH movidas AS (DELETE FROM {tabla}_default "
+            f"WHERE {columna} >= :desde AND {columna} < :hasta RETURNING *) "
+            f"INSERT INTO {particion} SELECT * FROM movidas"
+        ), rango).rowcount
+        # Al adjuntarla hereda índices y claves foráneas de la tabla padre
+        conn.execute(text(f"ALTER TABLE {tabla} ATTACH PARTITION {particion} {limites}"))
+        logger.info(f"📦 {movidas} filas movidas de {tabla}_default a {particion}")
+
+    logger.info(f"🗂️ Partición creada: {particion}")
+    return particion
+
+
+def asegurar_particiones(conn: Connection, meses_adelante: int, hoy: Optional[date] = None) -> List[str]:
+    """Crea las particiones que falten desde el mes actual hasta `meses_adelante` meses después"""
+    actual = inicio_mes(hoy or datetime.now())
+    creadas = []
+    for tabla in TABLAS_PARTICIONADAS:
+        existentes = particiones_mensuales(conn, tabla)
+        for i in range(meses_adelante + 1):
+            mes = sumar_meses(actual, i)
+            if mes not in existentes:
+                creadas.append(crear_particion(conn, tabla, mes))
+    return creadas
+
+
+def _archivar(conn: Connection, consulta: str, ruta: str):
+    """Vuelca la consulta a CSV comprimido con COPY y lo sincroniza a disco antes de borrar nada"""
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    temporal = ruta + ".tmp"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        with open(temporal, "wb") as fichero:
+            with gzip.GzipFile(fileobj=fichero, mode="wb") as comprimido:
+                cursor.copy_expert(f"COPY ({consulta}) TO STDOUT WITH (FORMAT csv, HEADER)", comprimido)
+            fichero.flush()
+            os.fsync(fichero.fileno())
+    finally:
+        cursor.close()
+    os.replace(temporal, ruta)
+
+
+def particiones_caducadas(conn: Connection, tabla: str, meses: int, hoy: Optional[date] = None) -> List[str]:
+    """
+    Particiones de los meses anteriores a los `meses` meses completos que se
+    conservan (más el actual). meses=0 conserva todo.
+    """
+    if meses <= 0:
+        return []
+    corte = sumar_meses(inicio_mes(hoy or datetime.now()), -meses)
+    return [particion for mes, particion in sorted(particiones_mensuales(conn, tabla).items()) if mes < corte]
+
+
+def retirar_particion(conn: Connection, particion: str, modo: str, directorio: str) -> bool:
+    if modo not in MODOS_RETENCION:
+        raise ValueError(f"PARTITION_RETENTION_MODE must be one of: {', '.join(MODOS_RETENCION)}")
+    # Otro proceso pudo retirarla entre la consulta y el bloqueo
+    if conn.execute(text("SELECT to_regclass(:particion)"), {"particion": particion}).scalar() is None:
+        return False
+    if modo == "archive":
+        _archivar(conn, f"SELECT * FROM {particion}", os.path.join(directorio, f"{particion}.csv.gz"))
+    conn.execute(text(f"DROP TABLE {particion}"))
+    logger.info(f"🗑️ Partición retirada ({modo}): {particion}")
+    return True
+
+
+def limpiar_default(conn: Connection, tabla: str, meses: int, modo: str, directorio: str,
+                    hoy: Optional[date] = None) -> int:
+    """Retira de la partición DEFAULT las filas anteriores a la ventana de retención"""
+    if meses <= 0:
+        return 0
+    columna = TABLAS_PARTICIONADAS[tabla]
+    corte = sumar_meses(inicio_mes(hoy or datetime.now()), -meses)
+    antiguas = f"SELECT * FROM {tabla}_default WHERE {columna} < '{corte}'"
+    if not conn.execute(text(f"SELECT EXISTS ({antiguas})")).scalar():
+        return 0
+    if modo == "archive":
+        _archivar(conn, antiguas, os.path.join(directorio, f"{tabla}_default_antes_{corte:%Y_%m}.csv.gz"))
+    return conn.execute(text(f"DELETE FROM {tabla}_default WHERE {columna} < :corte"), {"corte": corte}).rowcount
+
+
+def _bloquear(conn: Connection):
+    conn.execute(text("SELECT pg_advisory_xact_lock(:clave)"), {"clave": _CLAVE_BLOQUEO})
+    conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+
+
+def mantener_particiones(
+    meses_adelante: int = settings.PARTITION_PREMAKE_MONTHS,
+    retencion: bool = False,
+    hoy: Optional[date] = None
+) -> Dict[str, List[str]]:
+    """
+    Crea las particiones próximas y, si retencion=True, aplica la retención
+    configurada. Cada partición se retira en su propia transacción: DROP
+    bloquea la tabla padre hasta el commit y no debe esperar al archivado
+    de las demás. Con modo archive y retención activa, PARTITION_ARCHIVE_DIR
+    es obligatorio (ValueError antes de tocar nada).
+    """
+    meses_retencion = {
+        "task_history": settings.TASK_HISTORY_RETENTION_MONTHS,
+        "energy_logs": settings.ENERGY_LOG_RETENTION_MONTHS,
+    }
+    modo, directorio = settings.PARTITION_RETENTION_MODE, settings.PARTITION_ARCHIVE_DIR
+    if retencion and modo == "archive" and not directorio and any(m > 0 for m in meses_retencion.values()):
+        raise ValueError("PARTITION_ARCHIVE_DIR is required with PARTITION_RETENTION_MODE=archive")
+
+    with engine.begin() as conn:
+        _bloquear(conn)
+        creadas = asegurar_particiones(conn, meses_adelante, hoy)
+
+    retiradas = []
+    if retencion:
+        for tabla, meses in meses_retencion.items():
+            with engine.connect() as conn:
+                caducadas = particiones_caducadas(conn, tabla, meses, hoy)
+            for particion in caducadas:
+                try:
+                    with engine.begin() as conn:
+                        _bloquear(conn)
+                        if retirar_particion(conn, particion, modo, directorio):
+                            retiradas.append(particion)
+                except OperationalError as e:
+                    # Normalmente lock_timeout: se reintentará en la siguiente ejecución
+                    logger.warning(f"⚠️ No se pudo retirar {particion}: {e.orig}")
+            with engine.begin() as conn:
+                _bloquear(conn)
+                if limpiar_default(conn, tabla, meses, modo, directorio, hoy):
+                    retiradas.append(f"{tabla}_default")
+
+    return {"created": creadas, "removed": retiradas}
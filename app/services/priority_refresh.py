@@ -0,0 +1,155 @@
+"""
+Refresco periódico de priority_level y priority_score.
+
+Las reglas de prioridad dan bonus según lo que falta para el deadline
+(vencida, 2 h, 24 h, 3 días), así que los valores guardados caducan con el
+paso del tiempo aunque la tarea no se edite. Entre dos ejecuciones solo
+pueden cambiar las tareas cuyo deadline ha cruzado alguno de esos umbrales:
+se localizan por rangos de deadline sobre el índice parcial de tareas
+pendientes, se recalculan por lotes con las reglas vectorizadas y los
+cambios (con su historial priority_updated) se escriben con sentencias
+masivas. El puntaje materializado en TaskMLData de esas tareas se recalcula
+en la misma transacción.
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.database_models import Task
+from app.services.audit_log import audit_writer
+from app.services.batch_scoring import (
+    COLUMNAS_PUNTUACION, ESTADOS_PENDIENTES, modelos_activos, puntuar_tareas, guardar_puntajes
+)
+from app.services.priority_rules import calcular_prioridades
+from app.services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Tiempo restante hasta el deadline en el que cambia alguna regla: los de
+# priority_level/priority_score (0, 2 h, 24 h, 3 días) y los días completos
+# del puntaje de reglas y de la característica deadline_proximo (1, 2 y 4 días)
+UMBRALES_DEADLINE = (
+    timedelta(0), timedelta(hours=2), timedelta(days=1), timedelta(days=2),
+    timedelta(days=3), timedelta(days=4),
+)
+
+COLUMNAS_PRIORIDAD = [
+    Task.id, Task.user_id, Task.urgency, Task.impact, Task.deadline,
+    Task.energy_required, Task.estimated_duration, Task.priority_level, Task.priority_score
+]
+
+
+def rangos_de_cruce(desde: datetime, hasta: datetime) -> List[Tuple[datetime, datetime]]:
+    """
+    Intervalos de deadline (cerrados, fusionados si se solapan) de las tareas
+    que han cruzado algún umbral entre `desde` y `hasta`: para el umbral u,
+    deadline - u pasa de estar por delante de `desde` a no superar `hasta`.
+    """
+    fusionados: List[Tuple[datetime, datetime]] = []
+    for inicio, fin in sorted((desde + u, hasta + u) for u in UMBRALES_DEADLINE):
+        if fusionados and inicio <= fusionados[-1][1]:
+            fusionados[-1] = (fusionados[-1][0], max(fin, fusionados[-1][1]))
+        else:
+            fusionados.append((inicio, fin))
+    return fusionados
+
+
+def _refrescar_lote(db: Session, filas: Sequence[Any], ahora: datetime) -> int:
+    """Recalcula un lote, escribe los cambios y su historial y re-materializa los puntajes"""
+    niveles, puntajes = calcular_prioridades(
+        urgency=[f.urgency for f in filas],
+        impact=[f.impact for f in filas],
+        deadline=[f.deadline for f in filas],
+        energy_required=[f.energy_required for f in filas],
+        estimated_duration=[f.estimated_duration for f in filas],
+        ahora=ahora
+    )
+    cambios = [
+        (fila, nivel, puntaje)
+        for fila, nivel, puntaje in zip(filas, niveles.tolist(), puntajes.tolist())
+        if fila.priority_level != nivel or fila.priority_score != puntaje
+    ]
+
+    if cambios:
+        response_cache.invalidar_tras_commit(db, {fila.user_id for fila, _, _ in cambios}, "tasks")
+        db.execute(update(Task), [
+            {'id': fila.id, 'priority_level': nivel, 'priority_score': puntaje}
+            for fila, nivel, puntaje in cambios
+        ])
+        audit_writer.registrar_muchos(db, [
+            {
+                'task_id': fila.id,
+                'user_id': fila.user_id,
+                'change_type': 'priority_updated',
+                'old_values': {'priority_level': fila.priority_level, 'priority_score': fila.priority_score},
+                'new_values': {'priority_level': nivel, 'priority_score': puntaje},
+                'change_description': 'Priority refreshed after a deadline threshold was crossed'
+            }
+            for fila, nivel, puntaje in cambios
+        ])
+
+    tareas = db.query(*COLUMNAS_PUNTUACION).filter(Task.id.in_([f.id for f in filas])).all()
+    modelos = modelos_activos(db, list({f.user_id for f in filas}))
+    guardar_puntajes(db, puntuar_tareas(db, tareas, modelos, ahora=ahora))
+    return len(cambios)
+
+
+def refrescar_prioridades(
+    desde: Optional[datetime],
+    hasta: Optional[datetime] = None,
+    batch_size: int = settings.PRIORITY_REFRESH_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Recalcula las tareas pendientes cuyo deadline cruzó un umbral entre `desde`
+    y `hasta` (por defecto, ahora). Con desde=None revisa todas las tareas
+    pendientes con deadline. Las fechas son locales sin zona, como los
+    deadlines guardados. Cada lote se confirma en su propia transacción.
+    """
+    inicio = time.perf_counter()
+    hasta = hasta or datetime.now()
+    rangos = rangos_de_cruce(desde, hasta) if desde is not None else [(None, None)]
+
+    revisadas = actualizadas = 0
+    db = SessionLocal()
+    try:
+        for desde_deadline, hasta_deadline in rangos:
+            query = select(*COLUMNAS_PRIORIDAD).where(
+                Task.status.in_(ESTADOS_PENDIENTES),
+                Task.deadline.isnot(None)
+            )
+            if desde_deadline is not None:
+                query = query.where(Task.deadline.between(desde_deadline, hasta_deadline))
+
+            ultimo = None
+            while True:
+                # Paginación por (deadline, id) sobre ix_tasks_deadline_pendientes
+                lote = query if ultimo is None else query.where(tuple_(Task.deadline, Task.id) > ultimo)
+                filas = db.execute(lote.order_by(Task.deadline, Task.id).limit(batch_size)).all()
+                if not filas:
+                    break
+
+                actualizadas += _refrescar_lote(db, filas, hasta)
+                db.commit()
+                revisadas += len(filas)
+                ultimo = (filas[-1].deadline, filas[-1].id)
+                if len(filas) < batch_size:
+                    break
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    resultado = {
+        "checked": revisadas,
+        "updated": actualizadas,
+        "seconds": round(time.perf_counter() - inicio, 3),
+    }
+    logger.info(f"🔄 Refresco de prioridades ({desde} → {hasta}): {resultado}")
+    return resultado
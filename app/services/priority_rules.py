@@ -0,0 +1,169 @@
+"""
+Reglas de prioridad evaluadas sobre columnas de tareas en una sola pasada
+vectorizada.
+
+Reproduce exactamente las reglas escalares (TaskService._calcular_priority_level,
+TaskService._calcular_priority_score y ai_service.puntaje_por_reglas): los
+enumerados se resuelven una vez por valor distinto y se expanden como arrays,
+las palabras clave se buscan con una única expresión regular compilada por
+conjunto y los umbrales de deadline son comparaciones de NumPy.
+scripts/verificar_reglas_prioridad.py comprueba la equivalencia.
+"""
+import re
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.ml_features import NIVEL_CODIGOS, codificar_niveles, factorizar
+
+NIVELES = tuple(NIVEL_CODIGOS)
+
+# Códigos de nivel sin normalizar: low=0, medium=1, high=2; cualquier otro valor (o None) = -1
+_SIN_NIVEL = -1
+
+_HORA = 3600
+_DIA = 24 * _HORA
+
+# Pesos del sistema de reglas de respaldo del modelo (puntaje_por_reglas)
+REGLAS_PRIORIDAD_MAP = {"high": 3.0, "medium": 2.0, "low": 1.0}
+REGLAS_URGENCIA_MAP = {"high": 1.4, "medium": 1.1, "low": 1.0}
+REGLAS_IMPACTO_MAP = {"high": 1.3, "medium": 1.1, "low": 1.0}
+
+PALABRAS_CRITICAS_TITULO = ('bug', 'fix', 'crític', 'urgent', 'hotfix', 'error', 'caído', 'seguridad')
+PALABRAS_URGENTES_DESCRIPCION = ('urgent', 'important', 'critical', 'importante', 'crític')
+
+_PATRON_TITULO = re.compile("|".join(map(re.escape, PALABRAS_CRITICAS_TITULO)))
+_PATRON_DESCRIPCION = re.compile("|".join(map(re.escape, PALABRAS_URGENTES_DESCRIPCION)))
+
+
+def _codigo_estricto(valor: Optional[str]) -> int:
+    return NIVEL_CODIGOS.get(valor, _SIN_NIVEL)
+
+
+def codificar_niveles_estrictos(valores: Sequence[Optional[str]]) -> np.ndarray:
+    return codificar_niveles(valores, codigo=_codigo_estricto, dtype=np.int8)
+
+
+def _pesos(valores: Sequence[Optional[str]], mapa: Dict[str, float], defecto: float) -> np.ndarray:
+    """mapa.get(valor or "medium", defecto) resuelto una vez por valor distinto"""
+    indices, inversos = factorizar(valores)
+    tabla = np.array([mapa.get(v or "medium", defecto) for v in indices], dtype=np.float64)
+    return tabla[inversos]
+
+
+def contiene_palabra(patron: re.Pattern, textos: Sequence[Optional[str]]) -> np.ndarray:
+    """True donde el texto (en minúsculas) contiene alguna palabra del patrón"""
+    return np.fromiter(
+        (t is not None and patron.search(t.lower()) is not None for t in textos),
+        dtype=bool, count=len(textos)
+    )
+
+
+def segundos_hasta_deadline(deadlines: Sequence[Optional[datetime]], ahora: datetime) -> np.ndarray:
+    """
+    Segundos desde `ahora` hasta cada deadline (NaN si no hay). Los deadlines
+    sin zona horaria se comparan con la hora local sin zona, igual que las
+    reglas escalares al restarles datetime.now().
+    """
+    ahora_con_zona = ahora.astimezone()
+    ahora_local = ahora_con_zona.replace(tzinfo=None)
+    return np.fromiter(
+        (
+            (d - (ahora_con_zona if d.tzinfo is not None else ahora_local)).total_seconds()
+            if d is not None else np.nan
+            for d in deadlines
+        ),
+        dtype=np.float64, count=len(deadlines)
+    )
+
+
+def calcular_prioridades(
+    urgency: Sequence[Optional[str]],
+    impact: Sequence[Optional[str]],
+    deadline: Sequence[Optional[datetime]],
+    energy_required: Sequence[Optional[str]],
+    estimated_duration: Sequence[Optional[int]],
+    ahora: Optional[datetime] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Devuelve (priority_level, priority_score) de cada tarea como arrays"""
+    ahora = ahora or datetime.now(timezone.utc)
+    urgencia = codificar_niveles_estrictos(urgency)
+    impacto = codificar_niveles_estrictos(impact)
+    energia = codificar_niveles_estrictos(energy_required)
+    duracion = np.fromiter(
+        (d or 0 for d in estimated_duration), dtype=np.int64, count=len(estimated_duration)
+    )
+    segundos = segundos_hasta_deadline(deadline, ahora)
+    horas = segundos / 3600
+    con_deadline = ~np.isnan(segundos)
+
+    # priority_level: urgencia + impacto (1-3, medium por defecto), deadline, energía y duración
+    puntos = np.where(urgencia >= 0, urgencia + 1, 2) + np.where(impacto >= 0, impacto + 1, 2)
+    puntos = puntos + np.select(
+        [~con_deadline, segundos < 0, segundos <= _DIA, segundos <= 3 * _DIA],
+        [0, 3, 2, 1], default=0
+    )
+    puntos = puntos + np.select([energia == 0, energia == 2], [1, -1], default=0)
+    puntos = puntos - (duracion > 240)
+    nivel = np.select([puntos >= 7, puntos >= 4], [2, 1], default=0)
+
+    # priority_score: base por nivel y ajustes por urgencia/impacto dentro del nivel
+    alguno_alto = (urgencia == 2) | (impacto == 2)
+    puntaje = np.array([25, 50, 75])[nivel]
+    puntaje = puntaje + np.select(
+        [
+            (nivel == 2) & (urgencia == 2) & (impacto == 2),
+            (nivel == 2) & alguno_alto,
+            (nivel == 1) & alguno_alto,
+            (nivel == 1) & (urgencia == 0) & (impacto == 0),
+            (nivel == 0) & alguno_alto,
+            (nivel == 0) & ((urgencia == 1) | (impacto == 1)),
+        ],
+        [15, 8, 10, -10, 15, 5], default=0
+    )
+    bonus_deadline = np.select(
+        [con_deadline & (horas <= 2), con_deadline & (horas <= 24)],
+        [20, 10], default=0
+    )
+    puntaje = np.where(bonus_deadline > 0, np.minimum(100, puntaje + bonus_deadline), puntaje)
+    puntaje = np.clip(puntaje, 1, 100)
+
+    return np.array(NIVELES)[nivel], puntaje
+
+
+def puntajes_por_reglas(
+    priority_level: Sequence[Optional[str]],
+    urgency: Sequence[Optional[str]],
+    impact: Sequence[Optional[str]],
+    title: Sequence[Optional[str]],
+    description: Sequence[Optional[str]],
+    deadline: Sequence[Optional[datetime]],
+    ahora: Optional[datetime] = None
+) -> np.ndarray:
+    """Puntaje heurístico de respaldo (antes del post-procesamiento) de cada tarea"""
+    n = len(priority_level)
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+
+    ahora = ahora or datetime.now()
+    titulo_critico = contiene_palabra(_PATRON_TITULO, title)
+    descripcion_urgente = contiene_palabra(_PATRON_DESCRIPCION, description)
+
+    # Días completos hasta el deadline (timedelta.days, redondeo hacia abajo). Restar en
+    # Python es bastante más rápido que convertir los datetime a datetime64 con NumPy
+    con_deadline = np.fromiter((d is not None for d in deadline), dtype=bool, count=n)
+    dias = np.fromiter(
+        ((d - ahora).days if d is not None else 0 for d in deadline), dtype=np.int64, count=n
+    )
+
+    # Mismo orden de multiplicaciones que la versión escalar: resultados idénticos bit a bit
+    puntaje = _pesos(priority_level, REGLAS_PRIORIDAD_MAP, 2.0)
+    puntaje = puntaje * np.where(titulo_critico, 1.8, np.where(descripcion_urgente, 1.5, 1.0))
+    puntaje = puntaje * _pesos(urgency, REGLAS_URGENCIA_MAP, 1.0)
+    puntaje = puntaje * _pesos(impact, REGLAS_IMPACTO_MAP, 1.0)
+    puntaje = puntaje * np.select(
+        [~con_deadline, dias < 0, dias == 0, dias <= 1, dias <= 3],
+        [1.0, 2.5, 2.0, 1.7, 1.3], default=1.0
+    )
+    return puntaje
@@ -0,0 +1,351 @@
+"""
+Caché de respuestas de los listados más leídos (tareas, categorías,
+recomendaciones y feedback de ML), por usuario.
+
+Cada respuesta se guarda ya serializada (JSON) junto con su ETag (hash del
+cuerpo) bajo la clave espacio:usuario:versión:hash(ruta y parámetros). Un
+acierto devuelve los bytes guardados sin consultar la base ni pasar por
+Pydantic, y si el cliente envía If-None-Match con ese ETag responde 304 sin
+cuerpo. Con la caché desactivada la respuesta también lleva ETag y puede
+ser un 304, pero se calcula consultando la base y serializando cada vez: el
+ETag es el hash del cuerpo, no depende de ningún estado compartido.
+
+Las escrituras invalidan explícitamente: invalidar_tras_commit() apunta en
+la sesión los (usuario, espacio) afectados y, cuando la transacción se
+confirma, se cambia el token de versión de cada uno, de modo que todas sus
+entradas (cualquier página o filtro) dejan de encontrarse y caducan solas.
+Los tokens son aleatorios: aunque uno se pierda (desalojo, reinicio de
+Redis) nunca se reutiliza, y no puede volver a servirse una entrada antigua.
+
+Backends (RESPONSE_CACHE_BACKEND):
+- memory: LRU en memoria del proceso, acotado en bytes. Las invalidaciones
+  solo se ven en el propio proceso: las escrituras de otros workers o de los
+  scripts tardan hasta RESPONSE_CACHE_TTL_SECONDS en verse. Solo para
+  despliegues de un único proceso.
+- redis: cualquier servidor compatible con el protocolo de Redis
+  (RESPONSE_CACHE_REDIS_URL, requiere el paquete `redis`), compartido entre
+  procesos. Si el servidor no responde, la caché se omite.
+- none: desactivada (valor por defecto).
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+import logging
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.pagination import CABECERA_CURSOR
+
+logger = logging.getLogger(__name__)
+
+BACKENDS_CACHE = ("memory", "redis", "none")
+
+# Espacios de claves: cada uno agrupa las respuestas que invalida una misma escritura
+ESPACIOS = ("tasks", "categories", "recommendations", "ml_feedback")
+
+# Clave en Session.info de las invalidaciones pendientes de que la transacción se confirme
+_PENDIENTES = "cache_invalidaciones_pendientes"
+
+# Los tokens de versión duran más que las entradas; si caducan se genera otro
+_TTL_VERSION = 24 * 3600
+
+# El navegador puede guardar la respuesta pero debe revalidarla siempre con el ETag
+_CACHE_CONTROL = "private, no-cache"
+
+
+class MemoryBackend:
+    """LRU en memoria acotado por el tamaño total de los valores, con TTL por entrada"""
+    remoto = False
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entradas: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, clave: str) -> Optional[bytes]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            if entrada[1] <= time.monotonic():
+                self._quitar(clave)
+                return None
+            self._entradas.move_to_end(clave)
+            return entrada[0]
+
+    def set(self, clave: str, valor: bytes, ttl: float):
+        with self._lock:
+            self._poner(clave, valor, ttl)
+
+    def add(self, clave: str, valor: bytes, ttl: float) -> bytes:
+        """Guarda el valor si la clave no existe y devuelve el vigente"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[1] > time.monotonic():
+                return entrada[0]
+            self._poner(clave, valor, ttl)
+            return valor
+
+    def _poner(self, clave: str, valor: bytes, ttl: float):
+        if len(valor) > self.max_bytes:
+            return
+        self._quitar(clave)
+        self._entradas[clave] = (valor, time.monotonic() + ttl)
+        self._bytes += len(valor)
+        while self._bytes > self.max_bytes:
+            self._quitar(next(iter(self._entradas)))
+
+    def _quitar(self, clave: str):
+        entrada = self._entradas.pop(clave, None)
+        if entrada is not None:
+            self._bytes -= len(entrada[0])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entradas), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+class RedisBackend:
+    """Servidor compatible con Redis; los errores de conexión se tratan como fallos de caché"""
+    remoto = True
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+        self._cliente = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._errores = redis.RedisError
+
+    def get(self, clave: str) -> Optional[bytes]:
+        try:
+            return self._cliente.get(clave)
+        except self._errores as e:
+            logger.warning(f"⚠️ Caché de respuestas no disponible: {e}")
+            return None
+
+    def set(self, clave: str, valor: bytes, ttl: float):
+        try:
+            self._cliente.set(clave, valor, px=int(ttl * 1000))
+        except self._errores as e:
+            logger.warning(f"⚠️ Caché de respuestas no disponible: {e}")
+
+    def add(self, clave: str, valor: bytes, ttl: float) -> bytes:
+        try:
+            tuberia = self._cliente.pipeline()
+            tuberia.set(clave, valor, px=int(ttl * 1000), nx=True)
+            tuberia.get(clave)
+            return tuberia.execute()[1] or valor
+        except self._errores as e:
+            logger.warning(f"⚠️ Caché de respuestas no disponible: {e}")
+            return valor
+
+    def stats(self) -> dict:
+        return {}
+
+
+class ResponseCache:
+    def __init__(self, backend: Optional[Any], ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._adaptadores: Dict[Any, TypeAdapter] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    @property
+    def activa(self) -> bool:
+        return self.backend is not None and self.ttl_seconds > 0
+
+    def responder(
+        self,
+        request: Request,
+        response: Response,
+        espacio: str,
+        user_id: uuid.UUID,
+        tipo: Any,
+        producir: Callable[[], Any]
+    ) -> Any:
+        """
+        Respuesta del endpoint desde la caché; si no está, llama a producir(),
+        serializa el resultado como `tipo` (el response_model) y lo guarda.
+        """
+        if not self.activa:
+            return self._etiquetar(request, response, tipo, producir())[0]
+        clave = self._clave(request, espacio, user_id)
+        respuesta = self._desde_cache(request, clave)
+        if respuesta is None:
+            respuesta = self._guardar(request, response, clave, tipo, producir())
+        return respuesta
+
+    async def responder_async(
+        self,
+        request: Request,
+        response: Response,
+        espacio: str,
+        user_id: uuid.UUID,
+        tipo: Any,
+        producir: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Igual que responder() para endpoints async; las llamadas a Redis van a un hilo"""
+        if not self.activa:
+            return self._etiquetar(request, response, tipo, await producir())[0]
+        if self.backend.remoto:
+            clave = await run_in_threadpool(self._clave, request, espacio, user_id)
+            respuesta = await run_in_threadpool(self._desde_cache, request, clave)
+        else:
+            clave = self._clave(request, espacio, user_id)
+            respuesta = self._desde_cache(request, clave)
+        if respuesta is None:
+            resultado = await producir()
+            if self.backend.remoto:
+                respuesta = await run_in_threadpool(self._guardar, request, response, clave, tipo, resultado)
+            else:
+                respuesta = self._guardar(request, response, clave, tipo, resultado)
+        return respuesta
+
+    def invalidar(self, user_id: uuid.UUID, *espacios: str):
+        """Invalida ya todas las respuestas del usuario en esos espacios"""
+        if not self.activa:
+            return
+        for espacio in espacios:
+            self.backend.set(self._clave_version(user_id, espacio), uuid.uuid4().hex.encode(), _TTL_VERSION)
+        with self._lock:
+            self.invalidations += len(espacios)
+
+    def invalidar_tras_commit(self, db: Session, user_ids: Iterable[uuid.UUID], *espacios: str):
+        """Invalida cuando la transacción de `db` se confirme (nada si se revierte)"""
+        if not self.activa:
+            return
+        pendientes = db.info.setdefault(_PENDIENTES, set())
+        pendientes.update((user_id, espacio) for user_id in user_ids for espacio in espacios)
+
+    def stats(self) -> dict:
+        with self._lock:
+            resultado = {
+                "backend": settings.RESPONSE_CACHE_BACKEND,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations,
+            }
+        if self.backend is not None:
+            resultado.update(self.backend.stats())
+        return resultado
+
+    def _clave_version(self, user_id: uuid.UUID, espacio: str) -> str:
+        return f"respuestas:version:{espacio}:{user_id}"
+
+    def _clave(self, request: Request, espacio: str, user_id: uuid.UUID) -> str:
+        version = self.backend.add(self._clave_version(user_id, espacio), uuid.uuid4().hex.encode(), _TTL_VERSION)
+        consulta = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        huella = hashlib.sha1(f"{request.url.path}?{consulta}".encode()).hexdigest()
+        return f"respuestas:{espacio}:{user_id}:{version.decode()}:{huella}"
+
+    def _desde_cache(self, request: Request, clave: str) -> Optional[Response]:
+        valor = self.backend.get(clave)
+        if valor is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        cabecera, cuerpo = valor.split(b"\n", 1)
+        metadatos = json.loads(cabecera)
+        etag = metadatos["etag"]
+        if _coincide_etag(request.headers.get("if-none-match"), etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL})
+
+        with self._lock:
+            self.hits += 1
+        return self._respuesta(cuerpo, etag, metadatos["headers"])
+
+    def _guardar(self, request: Request, response: Response, clave: str, tipo: Any, resultado: Any) -> Response:
+        respuesta, cuerpo, etag, cabeceras = self._etiquetar(request, response, tipo, resultado)
+        metadatos = json.dumps({"etag": etag, "headers": cabeceras}).encode()
+        self.backend.set(clave, metadatos + b"\n" + cuerpo, self.ttl_seconds)
+        return respuesta
+
+    def _etiquetar(self, request: Request, response: Response, tipo: Any, resultado: Any):
+        """Serializa el resultado como `tipo` y lo devuelve con su ETag, o 304 si el cliente ya lo tiene"""
+        adaptador = self._adaptadores.get(tipo)
+        if adaptador is None:
+            adaptador = self._adaptadores.setdefault(tipo, TypeAdapter(tipo))
+        cuerpo = adaptador.dump_json(adaptador.validate_python(resultado, from_attributes=True))
+        etag = f'"{hashlib.sha1(cuerpo).hexdigest()}"'
+
+        # Cabeceras que el endpoint dejó en la respuesta inyectada (cursor de la página siguiente)
+        cabeceras = {}
+        if CABECERA_CURSOR in response.headers:
+            cabeceras[CABECERA_CURSOR] = response.headers[CABECERA_CURSOR]
+
+        if _coincide_etag(request.headers.get("if-none-match"), etag):
+            with self._lock:
+                self.not_modified += 1
+            respuesta = Response(status_code=304, headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL})
+        else:
+            respuesta = self._respuesta(cuerpo, etag, cabeceras)
+        return respuesta, cuerpo, etag, cabeceras
+
+    @staticmethod
+    def _respuesta(cuerpo: bytes, etag: str, cabeceras: Dict[str, str]) -> Response:
+        return Response(
+            content=cuerpo,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL, **cabeceras}
+        )
+
+
+def _coincide_etag(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparación débil (RFC 9110): se ignora el prefijo W/
+    candidatos = (e.strip().removeprefix("W/") for e in if_none_match.split(","))
+    return etag in candidatos
+
+
+def _crear_backend(nombre: str):
+    if nombre not in BACKENDS_CACHE:
+        raise ValueError(f"RESPONSE_CACHE_BACKEND must be one of: {', '.join(BACKENDS_CACHE)}")
+    if nombre == "memory":
+        return MemoryBackend(settings.RESPONSE_CACHE_MAX_BYTES)
+    if nombre == "redis":
+        return RedisBackend(settings.RESPONSE_CACHE_REDIS_URL)
+    return None
+
+
+response_cache = ResponseCache(
+    backend=_crear_backend(settings.RESPONSE_CACHE_BACKEND),
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tras_commit(session: Session):
+    # También se dispara al liberar un SAVEPOINT; solo cuenta la transacción externa
+    if session.in_nested_transaction():
+        return
+    for user_id, espacio in session.info.pop(_PENDIENTES, ()):
+        response_cache.invalidar(user_id, espacio)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar_no_confirmadas(session: Session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_PENDIENTES, None)
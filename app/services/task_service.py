@@ -1,14 +1,24 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
-from app.models.database_models import Task, TaskHistory, Category
+from app.models.database_models import Task, Category
 from app.models.pydantic_models import TaskCreate
+from app.services.audit_log import audit_writer
+from app.services.response_cache import response_cache
+from app.services.ml_materialization import materializar_tareas
+from app.services.priority_rules import NIVELES, calcular_prioridades
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Rango de una columna INTEGER de PostgreSQL (estimated_duration)
+INT4_MIN, INT4_MAX = -2**31, 2**31 - 1
+
 class TaskService:
     @staticmethod
     def _calcular_priority_level(urgency: Optional[str], impact: Optional[str], 
@@ -131,6 +141,68 @@ class TaskService:
         
         return final_score
 
+    @staticmethod
+    def get_user_task(db: Session, task_id: UUID, user_id: UUID) -> Task:
+        """Tarea del usuario o 404"""
+        task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
+        if not task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
+        return task
+
+    @staticmethod
+    def _registrar_historial(db: Session, task: Task, user_id: UUID, change_type: str, descripcion: str,
+                             old_values: Optional[Dict[str, Any]] = None, new_values: Optional[Dict[str, Any]] = None,
+                             sincrono: bool = False):
+        audit_writer.registrar(
+            db, task.id, user_id, change_type, descripcion,
+            old_values=old_values, new_values=new_values, sincrono=sincrono
+        )
+
+    @staticmethod
+    def _recalcular_prioridad_en_memoria(db: Session, task: Task, user_id: UUID) -> bool:
+        """
+        Recalcula priority_level/priority_score con los valores actuales de la tarea
+        (sin consultar ni confirmar) y, si cambian, los asigna y añade el historial
+        priority_updated. Devuelve si hubo cambio.
+        """
+        new_priority_level = TaskService._calcular_priority_level(
+            urgency=task.urgency,
+            impact=task.impact,
+            deadline=task.deadline,
+            energy_required=task.energy_required,
+            estimated_duration=task.estimated_duration
+        )
+        new_priority_score = TaskService._calcular_priority_score(
+            priority_level=new_priority_level,
+            urgency=task.urgency,
+            impact=task.impact,
+            deadline=task.deadline
+        )
+        if task.priority_level == new_priority_level and task.priority_score == new_priority_score:
+            return False
+
+        old_level, old_score = task.priority_level, task.priority_score
+        task.priority_level = new_priority_level
+        task.priority_score = new_priority_score
+        TaskService._registrar_historial(
+            db, task, user_id, 'priority_updated',
+            'Priority recalculated based on rule changes',
+            old_values={'priority_level': old_level, 'priority_score': old_score},
+            new_values={'priority_level': new_priority_level, 'priority_score': new_priority_score}
+        )
+        logger.info(f"🔄 Prioridad recalculada: {old_level}({old_score}) -> {new_priority_level}({new_priority_score})")
+        return True
+
+    @staticmethod
+    def _confirmar(db: Session, user_id: UUID, task_id: UUID):
+        """Cierre de cada mutación: materializa el puntaje ML en la misma transacción y confirma una vez"""
+        materializar_tareas(db, user_id, [task_id], confirmar=False)
+        response_cache.invalidar_tras_commit(db, [user_id], "tasks")
+        db.commit()
+
     @staticmethod
     def create_task_with_priority(db: Session, task_create: TaskCreate, user_id: UUID, category_id: Optional[UUID] = None):
         """Crear tarea con cálculo automático de prioridad usando solo reglas"""
@@ -176,135 +248,210 @@ class TaskService:
         
         logger.info(f"✅ Tarea creada - Level: {priority_level}, Score: {priority_score}")
         
-        # Crear la tarea
+        # Crear la tarea (el flush asigna id y valores por defecto)
         db_task = Task(**task_data)
         db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
+        db.flush()
         
         # Registrar en historial
-        history_entry = TaskHistory(
-            task_id=db_task.id,
-            user_id=user_id,
-            change_type='created',
+        TaskService._registrar_historial(
+            db, db_task, user_id, 'created',
+            'Task created with rule-based priority calculation',
             new_values={
                 'title': db_task.title,
                 'status': db_task.status,
                 'description': db_task.description,
                 'priority_level': db_task.priority_level,
                 'priority_score': db_task.priority_score
-            },
-            change_description='Task created with rule-based priority calculation'
+            }
         )
-        db.add(history_entry)
-        db.commit()
+        TaskService._confirmar(db, user_id, db_task.id)
         
         return db_task
 
+    @staticmethod
+    def _validar_tarea_bulk(item: Dict[str, Any]) -> Tuple[Optional[TaskCreate], Optional[str]]:
+        """Valida un elemento de la creación masiva; devuelve (tarea, None) o (None, error)"""
+        try:
+            tarea = TaskCreate.model_validate(item)
+        except ValidationError as e:
+            return None, "; ".join(
+                f"{'.'.join(str(parte) for parte in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+
+        # Las mismas restricciones que la tabla: un fallo en la base abortaría todo el lote
+        if len(tarea.title) > 200:
+            return None, "title: String should have at most 200 characters"
+        for campo in ('urgency', 'impact', 'energy_required'):
+            valor = getattr(tarea, campo)
+            if valor is not None and valor not in NIVELES:
+                return None, f"{campo}: must be one of: {', '.join(NIVELES)}"
+        if tarea.estimated_duration is not None and not INT4_MIN <= tarea.estimated_duration <= INT4_MAX:
+            return None, f"estimated_duration: must be between {INT4_MIN} and {INT4_MAX}"
+        return tarea, None
+
+    @staticmethod
+    def create_tasks_bulk(db: Session, items: List[Dict[str, Any]], user_id: UUID) -> Tuple[List[Task], List[Dict[str, Any]]]:
+        """
+        Crear muchas tareas en una sola transacción. Cada elemento se valida por
+        separado (los inválidos se devuelven como errores con su índice), las
+        categorías se comprueban con una única consulta y las prioridades se
+        calculan en una pasada vectorizada. Tareas e historial se insertan con
+        un INSERT ... RETURNING por lotes.
+        """
+        errores = []
+        validas: List[Tuple[int, TaskCreate]] = []
+        for indice, item in enumerate(items):
+            tarea, error = TaskService._validar_tarea_bulk(item)
+            if error:
+                errores.append({"index": indice, "detail": error})
+            else:
+                validas.append((indice, tarea))
+
+        categorias = {tarea.category_id for _, tarea in validas if tarea.category_id}
+        if categorias:
+            existentes = set(db.scalars(
+                select(Category.id).where(Category.user_id == user_id, Category.id.in_(categorias))
+            ))
+            for indice, tarea in validas:
+                if tarea.category_id and tarea.category_id not in existentes:
+                    errores.append({"index": indice, "detail": "Category not found or doesn't belong to user"})
+            validas = [(i, t) for i, t in validas if not t.category_id or t.category_id in existentes]
+
+        errores.sort(key=lambda e: e["index"])
+        if not validas:
+            return [], errores
+
+        tareas = [tarea for _, tarea in validas]
+        niveles, puntajes = calcular_prioridades(
+            urgency=[t.urgency for t in tareas],
+            impact=[t.impact for t in tareas],
+            deadline=[t.deadline for t in tareas],
+            energy_required=[t.energy_required for t in tareas],
+            estimated_duration=[t.estimated_duration for t in tareas]
+        )
+        filas = [
+            {**tarea.model_dump(), 'user_id': user_id, 'priority_level': str(nivel), 'priority_score': int(puntaje)}
+            for tarea, nivel, puntaje in zip(tareas, niveles, puntajes)
+        ]
+
+        # render_nulls mantiene todas las claves en cada fila: sin él los None se omiten y
+        # cada cambio en la combinación de campos vacíos parte el INSERT en otro lote
+        db_tasks = db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True), filas,
+            execution_options={"render_nulls": True}
+        ).all()
+        audit_writer.registrar_muchos(db, [
+            {
+                'task_id': db_task.id,
+                'user_id': user_id,
+                'change_type': 'created',
+                'new_values': {
+                    'title': db_task.title,
+                    'status': db_task.status,
+                    'description': db_task.description,
+                    'priority_level': db_task.priority_level,
+                    'priority_score': db_task.priority_score
+                },
+                'change_description': 'Task created with rule-based priority calculation (bulk)'
+            }
+            for db_task in db_tasks
+        ])
+        materializar_tareas(db, user_id, [db_task.id for db_task in db_tasks], confirmar=False)
+        response_cache.invalidar_tras_commit(db, [user_id], "tasks")
+
+        # RETURNING ya trajo todas las columnas: separadas de la sesión, el commit no
+        # las expira y serializarlas no lanza una consulta por tarea
+        for db_task in db_tasks:
+            db.expunge(db_task)
+        db.commit()
+
+        logger.info(f"✅ Creación masiva: {len(db_tasks)} tareas creadas, {len(errores)} con errores")
+        return db_tasks, errores
+
     @staticmethod
     def create_task_with_history(db: Session, task_data: TaskCreate, user_id: UUID):
         """Crear tarea y registrar en historial (versión original)"""
-        # Crear tarea
         db_task = Task(**task_data.dict(), user_id=user_id)
         db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
+        db.flush()
         
-        # Registrar en historial
-        history_entry = TaskHistory(
-            task_id=db_task.id,
-            user_id=user_id,
-            change_type='created',
+        TaskService._registrar_historial(
+            db, db_task, user_id, 'created', 'Task created',
             new_values={
                 'title': db_task.title,
                 'description': db_task.description,
                 'status': db_task.status
-            },
-            change_description='Task created'
+            }
         )
-        db.add(history_entry)
-        db.commit()
+        TaskService._confirmar(db, user_id, db_task.id)
         
         return db_task
 
     @staticmethod
-    def update_task_status(db: Session, task_id: UUID, user_id: UUID, new_status: str, old_status: str):
-        """Actualizar estado de tarea y registrar en historial"""
-        task = db.query(Task).filter(Task.id == task_id).first()
-        if task:
-            task.status = new_status
-            db.commit()
-            
-            # Registrar cambio en historial
-            history_entry = TaskHistory(
-                task_id=task_id,
-                user_id=user_id,
-                change_type='status_changed',
-                old_values={'status': old_status},
-                new_values={'status': new_status},
-                change_description=f'Status changed from {old_status} to {new_status}'
+    def update_task(db: Session, task_id: UUID, user_id: UUID, cambios: Dict[str, Any]) -> Task:
+        """
+        Actualizar campos de una tarea, registrar el cambio y recalcular su prioridad
+        en memoria antes del flush: una sola transacción por petición.
+        """
+        task = TaskService.get_user_task(db, task_id, user_id)
+        
+        for field, value in cambios.items():
+            setattr(task, field, value)
+        
+        if cambios:
+            TaskService._registrar_historial(
+                db, task, user_id, 'updated', 'Task updated',
+                new_values=jsonable_encoder(cambios)
             )
-            db.add(history_entry)
-            db.commit()
-            
+        
+        TaskService._recalcular_prioridad_en_memoria(db, task, user_id)
+        TaskService._confirmar(db, user_id, task.id)
         return task
 
     @staticmethod
-    def recalculate_task_priority(db: Session, task_id: UUID, user_id: UUID):
-        """Recalcular prioridad de una tarea existente (útil si cambian los datos)"""
-        task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
-        if not task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
-            )
+    def update_task_status(db: Session, task_id: UUID, user_id: UUID, new_status: str) -> Task:
+        """Actualizar estado de tarea y registrar en historial"""
+        task = TaskService.get_user_task(db, task_id, user_id)
+        old_status = task.status
         
-        # Recalcular priority_level
-        new_priority_level = TaskService._calcular_priority_level(
-            urgency=task.urgency,
-            impact=task.impact,
-            deadline=task.deadline,
-            energy_required=task.energy_required,
-            estimated_duration=task.estimated_duration
-        )
+        task.status = new_status
+        # Si se marca como completada, registrar fecha de completado
+        if new_status == 'completed' and not task.completed_at:
+            task.completed_at = func.now()
         
-        # Recalcular priority_score
-        new_priority_score = TaskService._calcular_priority_score(
-            priority_level=new_priority_level,
-            urgency=task.urgency,
-            impact=task.impact,
-            deadline=task.deadline
+        TaskService._registrar_historial(
+            db, task, user_id, 'status_changed',
+            f'Status changed from {old_status} to {new_status}',
+            old_values={'status': old_status},
+            new_values={'status': new_status}
         )
+        TaskService._confirmar(db, user_id, task.id)
+        return task
+
+    @staticmethod
+    def delete_task(db: Session, task_id: UUID, user_id: UUID):
+        """Eliminar una tarea registrando antes la eliminación en el historial"""
+        task = TaskService.get_user_task(db, task_id, user_id)
         
-        # Guardar cambios si son diferentes
-        if (task.priority_level != new_priority_level or 
-            task.priority_score != new_priority_score):
-            
-            old_level = task.priority_level
-            old_score = task.priority_score
-            
-            task.priority_level = new_priority_level
-            task.priority_score = new_priority_score
-            db.commit()
-            
-            # Registrar en historial
-            history_entry = TaskHistory(
-                task_id=task_id,
-                user_id=user_id,
-                change_type='priority_updated',
-                old_values={
-                    'priority_level': old_level,
-                    'priority_score': old_score
-                },
-                new_values={
-                    'priority_level': new_priority_level,
-                    'priority_score': new_priority_score
-                },
-                change_description='Priority recalculated based on rule changes'
-            )
-            db.add(history_entry)
-            db.commit()
-            
-            logger.info(f"🔄 Prioridad recalculada: {old_level}({old_score}) -> {new_priority_level}({new_priority_score})")
-        
-        return task
\ No newline at end of file
+        # Siempre en la transacción del borrado, también con la auditoría en buffer
+        TaskService._registrar_historial(
+            db, task, user_id, 'deleted', 'Task deleted',
+            old_values={
+                'title': task.title,
+                'status': task.status
+            },
+            sincrono=True
+        )
+        db.delete(task)
+        # El borrado arrastra en cascada sus recomendaciones y su feedback de ML
+        response_cache.invalidar_tras_commit(db, [user_id], "tasks", "recommendations", "ml_feedback")
+        db.commit()
+
+    @staticmethod
+    def recalculate_task_priority(db: Session, task_id: UUID, user_id: UUID):
+        """Recalcular prioridad de una tarea existente (útil si cambian los datos)"""
+        task = TaskService.get_user_task(db, task_id, user_id)
+        if TaskService._recalcular_prioridad_en_memoria(db, task, user_id):
+            TaskService._confirmar(db, user_id, task.id)
+        return task
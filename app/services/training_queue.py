@@ -0,0 +1,213 @@
+import multiprocessing
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _entrenar_usuario(user_id: str) -> bool:
+    """Se ejecuta en un proceso del pool: abre su propia sesión y entrena el modelo del usuario"""
+    from app.database import SessionLocal
+    from app.services.ai_service import TaskAgent
+
+    db = SessionLocal()
+    try:
+        return TaskAgent(db, uuid.UUID(user_id)).entrenar_modelo_prioridad()
+    finally:
+        db.close()
+
+
+def _inicializar_worker():
+    # Los modelos recién entrenados se materializan en este mismo proceso, sin abrir el pool de inferencia
+    from app.services.ml_executor import ml_executor
+    ml_executor.usar_local()
+
+
+class TrainingJob:
+    def __init__(self, user_id: uuid.UUID):
+        self.id = uuid.uuid4()
+        self.user_id = user_id
+        self.status = "pending"
+        self.triggers = 1
+        self.trained: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+
+class TrainingQueue:
+    """
+    Cola de reentrenamiento en segundo plano respaldada por un pool de procesos.
+
+    Las solicitudes de un mismo usuario se agrupan: mientras un trabajo espera
+    el tiempo de debounce, cada nueva solicitud se suma a ese trabajo y reinicia
+    la espera. Nunca hay dos entrenamientos simultáneos del mismo usuario; si
+    llega una solicitud con uno en curso, se ejecuta uno nuevo al terminar.
+
+    El registro de trabajos vive en memoria del proceso del API que lo creó:
+    con varios workers de uvicorn, consultar un trabajo en otro proceso da
+    404 y la agrupación por usuario solo se aplica dentro de cada proceso.
+
+    Tras cerrar() la cola no acepta trabajos nuevos ni vuelve a abrir el pool.
+    """
+
+    def __init__(self, max_workers: int, debounce_seconds: float, max_historial: int):
+        self.max_workers = max_workers
+        self.debounce_seconds = debounce_seconds
+        self.max_historial = max_historial
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.RLock()
+        self._trabajos: "OrderedDict[uuid.UUID, TrainingJob]" = OrderedDict()
+        self._pendientes: Dict[uuid.UUID, TrainingJob] = {}
+        self._en_curso: Dict[uuid.UUID, TrainingJob] = {}
+        self._timers: Dict[uuid.UUID, threading.Timer] = {}
+        self._cerrada = False
+
+    def solicitar(self, user_id: uuid.UUID) -> TrainingJob:
+        """Encola (o agrupa) un reentrenamiento del usuario y devuelve el trabajo asociado"""
+        with self._lock:
+            if self._cerrada:
+                raise RuntimeError("La cola de entrenamiento está cerrada")
+
+            job = self._pendientes.get(user_id)
+            if job is not None:
+                job.triggers += 1
+                logger.info(f"🧩 Solicitud de entrenamiento agrupada en el trabajo {job.id} ({job.triggers} disparos)")
+            else:
+                job = TrainingJob(user_id)
+                self._pendientes[user_id] = job
+                self._registrar(job)
+                logger.info(f"🗓️ Trabajo de entrenamiento {job.id} encolado para usuario {user_id}")
+
+            self._programar(user_id)
+            return job
+
+    def obtener(self, job_id: uuid.UUID) -> Optional[TrainingJob]:
+        with self._lock:
+            return self._trabajos.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "debounce_seconds": self.debounce_seconds,
+                "pending": len(self._pendientes),
+                "running": len(self._en_curso),
+                "jobs_tracked": len(self._trabajos),
+            }
+
+    def cerrar(self):
+        """Despacha los trabajos pendientes y espera a que termine el pool"""
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            for user_id in list(self._pendientes):
+                self._despachar(user_id)
+            # Los trabajos que terminen durante el shutdown no despachan a un pool nuevo
+            self._cerrada = True
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _programar(self, user_id: uuid.UUID):
+        timer = self._timers.pop(user_id, None)
+        if timer is not None:
+            timer.cancel()
+        timer = threading.Timer(self.debounce_seconds, self._al_vencer_debounce, args=(user_id,))
+        timer.daemon = True
+        self._timers[user_id] = timer
+        timer.start()
+
+    def _al_vencer_debounce(self, user_id: uuid.UUID):
+        with self._lock:
+            self._timers.pop(user_id, None)
+            self._despachar(user_id)
+
+    def _despachar(self, user_id: uuid.UUID):
+        # Con un entrenamiento en curso, el pendiente se lanza cuando éste termine
+        if user_id in self._en_curso or user_id not in self._pendientes:
+            return
+
+        job = self._pendientes.pop(user_id)
+        if self._cerrada:
+            self._completar(user_id, job, error="La cola de entrenamiento está cerrada")
+            return
+
+        job.status = "running"
+        job.started_at = datetime.now()
+        self._en_curso[user_id] = job
+
+        try:
+            future = self._obtener_executor().submit(_entrenar_usuario, str(user_id))
+        except Exception as e:
+            logger.error(f"❌ No se pudo enviar el trabajo {job.id} al pool: {e}")
+            if isinstance(e, BrokenProcessPool):
+                # Un proceso murió estando ocioso: el pool se recrea en el siguiente envío
+                self._executor = None
+            self._completar(user_id, job, error=str(e))
+            return
+
+        future.add_done_callback(lambda f: self._al_terminar(user_id, job, f))
+
+    def _al_terminar(self, user_id: uuid.UUID, job: TrainingJob, future: Future):
+        try:
+            trained = future.result()
+            self._completar(user_id, job, trained=trained)
+        except Exception as e:
+            logger.error(f"❌ Error en el trabajo de entrenamiento {job.id}: {e}")
+            logger.error(traceback.format_exc())
+            if isinstance(e, BrokenProcessPool):
+                # Un proceso murió: el pool queda inutilizable y se recrea en el siguiente envío
+                with self._lock:
+                    self._executor = None
+            self._completar(user_id, job, error=str(e))
+
+    def _completar(self, user_id: uuid.UUID, job: TrainingJob, trained: Optional[bool] = None, error: Optional[str] = None):
+        with self._lock:
+            job.trained = trained
+            job.error = error
+            job.status = "failed" if error else "completed"
+            job.finished_at = datetime.now()
+            self._en_curso.pop(user_id, None)
+            logger.info(f"✅ Trabajo de entrenamiento {job.id} terminado: {job.status}")
+
+            # Si llegaron solicitudes durante el entrenamiento y ya venció su debounce, se lanzan ahora
+            if user_id in self._pendientes and user_id not in self._timers:
+                self._despachar(user_id)
+
+    def _registrar(self, job: TrainingJob):
+        self._trabajos[job.id] = job
+        while len(self._trabajos) > self.max_historial:
+            job_id, antiguo = next(iter(self._trabajos.items()))
+            if antiguo.status in ("pending", "running"):
+                break
+            del self._trabajos[job_id]
+
+    def _obtener_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: los hijos no heredan hilos ni conexiones abiertas del proceso del API
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_inicializar_worker
+            )
+        return self._executor
+
+
+training_queue = TrainingQueue(
+    max_workers=settings.ML_TRAINING_WORKERS,
+    debounce_seconds=settings.ML_TRAINING_DEBOUNCE_SECONDS,
+    max_historial=settings.ML_TRAINING_JOB_HISTORY
+)
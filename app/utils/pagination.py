@@ -0,0 +1,104 @@
+"""
+Paginación por cursor (keyset) para los endpoints de listado.
+
+El cursor es opaco para el cliente: codifica el par (marca de tiempo, id)
+de la última fila devuelta y la página siguiente continúa con un filtro
+(columna, id) < (valor, id) sobre un índice ordenado, de modo que el coste
+no crece con la profundidad de la página como ocurre con OFFSET.
+
+Los endpoints siguen aceptando `skip` por compatibilidad; el cursor de la
+página siguiente se devuelve en la cabecera X-Next-Cursor.
+"""
+import base64
+import binascii
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+CABECERA_CURSOR = "X-Next-Cursor"
+
+
+def codificar_cursor(valor: datetime, id: uuid.UUID) -> str:
+    crudo = f"{valor.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        valor, id = crudo.split("|")
+        return datetime.fromisoformat(valor), uuid.UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def consulta_pagina(
+    query,
+    columna_orden,
+    columna_id,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+):
+    """
+    Ordena la consulta (Query o select) por (columna_orden, columna_id) descendente y la
+    limita a una página más una fila, que indica si existe página siguiente. Con cursor
+    se ignora skip.
+    """
+    if cursor:
+        valor, id = decodificar_cursor(cursor)
+        # El límite redundante sobre la columna de orden permite a PostgreSQL descartar
+        # particiones (task_history, energy_logs): no lo deduce de la comparación de filas
+        query = query.filter(columna_orden <= valor, tuple_(columna_orden, columna_id) < tuple_(valor, id))
+
+    query = query.order_by(columna_orden.desc(), columna_id.desc())
+    if skip and not cursor:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def cerrar_pagina(filas: List[Any], columna_orden, columna_id, response: Response, limit: int) -> List[Any]:
+    """Descarta la fila extra y, si había más filas, deja el cursor siguiente en la respuesta"""
+    pagina = filas[:limit]
+
+    if len(filas) > limit and pagina:
+        ultima = pagina[-1]
+        valor = getattr(ultima, columna_orden.key)
+        if valor is not None:
+            response.headers[CABECERA_CURSOR] = codificar_cursor(valor, getattr(ultima, columna_id.key))
+
+    return pagina
+
+
+def paginar(
+    query,
+    columna_orden,
+    columna_id,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> List[Any]:
+    filas = consulta_pagina(query, columna_orden, columna_id, skip, limit, cursor).all()
+    return cerrar_pagina(filas, columna_orden, columna_id, response, limit)
+
+
+async def paginar_async(
+    db: AsyncSession,
+    stmt,
+    columna_orden,
+    columna_id,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> List[Any]:
+    resultado = await db.execute(consulta_pagina(stmt, columna_orden, columna_id, skip, limit, cursor))
+    return cerrar_pagina(list(resultado.scalars().all()), columna_orden, columna_id, response, limit)
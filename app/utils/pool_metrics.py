@@ -0,0 +1,131 @@
+import threading
+import time
+import logging
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Esperas más largas que esto se registran en el log como aviso
+UMBRAL_ESPERA_AVISO = 1.0
+
+
+class PoolMetrics:
+    """
+    Telemetría de un pool de conexiones, alimentada por los eventos del pool
+    de SQLAlchemy (connect, checkout, checkin, invalidate) y por el tiempo
+    que tarda el pool instrumentado en entregar una conexión.
+    """
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self._lock = threading.Lock()
+        self.conexiones_abiertas = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidaciones = 0
+        self.timeouts = 0
+        self.max_en_uso_observado = 0
+        self.max_overflow_observado = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+
+    def registrar_eventos(self, pool):
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+
+    def registrar_espera(self, segundos: float):
+        with self._lock:
+            self._espera_total += segundos
+            self._espera_max = max(self._espera_max, segundos)
+        if segundos >= UMBRAL_ESPERA_AVISO:
+            logger.warning(f"⚠️ Pool {self.nombre}: {segundos:.2f}s esperando conexión")
+
+    def registrar_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+        logger.error(f"❌ Pool {self.nombre}: timeout esperando conexión")
+
+    def stats(self, pool) -> dict:
+        with self._lock:
+            return {
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_checked_out_observed": self.max_en_uso_observado,
+                "max_overflow_observed": self.max_overflow_observado,
+                "connections_opened": self.conexiones_abiertas,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidated": self.invalidaciones,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self._espera_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self._espera_max * 1000, 3),
+            }
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.conexiones_abiertas += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        pool = connection_proxy._pool
+        with self._lock:
+            self.checkouts += 1
+            self.max_en_uso_observado = max(self.max_en_uso_observado, pool.checkedout())
+            self.max_overflow_observado = max(self.max_overflow_observado, pool.overflow())
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidaciones += 1
+
+
+class _PoolInstrumentado:
+    """
+    Mide cuánto tarda el pool en entregar una conexión (espera en la cola más,
+    si hace falta, abrir una nueva). Los eventos del pool solo avisan cuando
+    la conexión ya se ha entregado, así que la espera se cronometra aquí.
+    """
+
+    metricas: PoolMetrics = None
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.metricas is not None:
+                self.metricas.registrar_timeout()
+            raise
+        finally:
+            if self.metricas is not None:
+                self.metricas.registrar_espera(time.perf_counter() - inicio)
+
+    def recreate(self):
+        # engine.dispose() crea un pool nuevo: conserva las métricas (los eventos ya se copian)
+        nuevo = super().recreate()
+        nuevo.metricas = self.metricas
+        return nuevo
+
+
+class QueuePoolInstrumentado(_PoolInstrumentado, QueuePool):
+    pass
+
+
+class AsyncQueuePoolInstrumentado(_PoolInstrumentado, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrumentar_pool(pool, nombre: str) -> PoolMetrics:
+    metricas = PoolMetrics(nombre)
+    pool.metricas = metricas
+    metricas.registrar_eventos(pool)
+    return metricas
@@ -11,8 +11,8 @@ import bcrypt
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine
-from app.models.database_models import User, Base
+from app.database import SessionLocal, aplicar_migraciones
+from app.models.database_models import User
 
 def check_admin_column_exists():
     """Verificar si la columna is_admin existe"""
@@ -176,12 +176,12 @@ if __name__ == "__main__":
     print("🛠️  Script de creación de administrador")
     print("=" * 50)
     
-    # Crear tablas si no existen
+    # Crear o actualizar el esquema con las migraciones
     try:
-        Base.metadata.create_all(bind=engine)
-        print("✅ Tablas de base de datos verificadas")
+        aplicar_migraciones()
+        print("✅ Esquema de base de datos al día (alembic upgrade head)")
     except Exception as e:
-        print(f"❌ Error al crear tablas: {e}")
+        print(f"❌ Error al aplicar las migraciones: {e}")
         sys.exit(1)
     
     # Opciones
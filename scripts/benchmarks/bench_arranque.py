@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque de la API:
+
+- tiempo de `import app.main` en un intérprete nuevo (mediana de varias
+  ejecuciones) y módulos pesados cargados al importarla;
+- tiempo hasta la primera respuesta: desde lanzar uvicorn hasta que
+  GET /health responde 200.
+
+Importar la aplicación no debe conectarse a la base ni cargar la pila de
+entrenamiento (scikit-learn, joblib, pandas): si alguno aparece, o si se
+superan los límites indicados, termina con código 1. Lo ejecuta CI
+(.github/workflows/arranque.yml) y guarda el JSON como artefacto para
+seguir la evolución.
+
+Uso:
+    python scripts/benchmarks/bench_arranque.py [--repeticiones 5] [--json arranque.json]
+    python scripts/benchmarks/bench_arranque.py --max-import-ms 4000 --max-primera-respuesta-ms 8000
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# No deben importarse al arrancar un worker de la API
+MODULOS_PESADOS = ("sklearn", "joblib", "pandas", "scipy", "alembic")
+
+_CODIGO_IMPORT = (
+    "import json, sys, time\n"
+    "inicio = time.perf_counter()\n"
+    "import app.main\n"
+    "segundos = time.perf_counter() - inicio\n"
+    f"pesados = [m for m in {MODULOS_PESADOS!r} if m in sys.modules]\n"
+    "print(json.dumps({'segundos': segundos, 'pesados': pesados}))\n"
+)
+
+
+def medir_import():
+    salida = subprocess.check_output([sys.executable, "-c", _CODIGO_IMPORT], cwd=RAIZ)
+    return json.loads(salida.decode().strip().splitlines()[-1])
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def medir_primera_respuesta(timeout: float) -> float:
+    puerto = puerto_libre()
+    url = f"http://127.0.0.1:{puerto}/health"
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(puerto),
+         "--log-level", "warning"],
+        cwd=RAIZ
+    )
+    try:
+        while time.perf_counter() - inicio < timeout:
+            if proceso.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó con código {proceso.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as respuesta:
+                    if respuesta.status == 200:
+                        return time.perf_counter() - inicio
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError(f"Sin respuesta de {url} en {timeout} s")
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="segundos máximos esperando la primera respuesta")
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-primera-respuesta-ms", type=float, default=None)
+    parser.add_argument("--json", default=None, help="ruta donde guardar los resultados")
+    args = parser.parse_args()
+
+    imports = [medir_import() for _ in range(args.repeticiones)]
+    primeras = [medir_primera_respuesta(args.timeout) for _ in range(args.repeticiones)]
+
+    resultado = {
+        "import_ms": round(statistics.median(i["segundos"] for i in imports) * 1000, 1),
+        "primera_respuesta_ms": round(statistics.median(primeras) * 1000, 1),
+        "modulos_pesados": sorted({m for i in imports for m in i["pesados"]}),
+        "repeticiones": args.repeticiones,
+        "python": sys.version.split()[0],
+    }
+    print(f"⏱️ import app.main: {resultado['import_ms']} ms (mediana de {args.repeticiones})")
+    print(f"⏱️ Primera respuesta de /health: {resultado['primera_respuesta_ms']} ms")
+
+    errores = []
+    if resultado["modulos_pesados"]:
+        errores.append(f"módulos pesados importados al arrancar: {', '.join(resultado['modulos_pesados'])}")
+    if args.max_import_ms is not None and resultado["import_ms"] > args.max_import_ms:
+        errores.append(f"import {resultado['import_ms']} ms > {args.max_import_ms} ms")
+    if args.max_primera_respuesta_ms is not None and resultado["primera_respuesta_ms"] > args.max_primera_respuesta_ms:
+        errores.append(f"primera respuesta {resultado['primera_respuesta_ms']} ms > {args.max_primera_respuesta_ms} ms")
+
+    if args.json:
+        with open(args.json, "w") as fichero:
+            json.dump(resultado, fichero, indent=2)
+
+    for error in errores:
+        print(f"❌ {error}")
+    if not errores:
+        print("✅ Arranque dentro de los límites")
+    sys.exit(1 if errores else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark de TaskAgent._preparar_datos_entrenamiento: compara la versión
+anterior (una consulta de MLFeedback por tarea) con la consulta única.
+
+Requiere una base de datos PostgreSQL accesible en DATABASE_URL. Crea un
+usuario temporal con N tareas completadas y lo elimina al terminar.
+
+Uso:
+    python scripts/benchmarks/bench_datos_entrenamiento.py [--tamanos 100 10000 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+from sqlalchemy import event, insert, delete
+
+from app.database import SessionLocal, engine
+from app.models.database_models import User, Task, MLFeedback
+from app.services.ai_service import TaskAgent, PRIORIDAD_MAP, _normalizar_nivel
+
+NIVELES = ["low", "medium", "high"]
+NIVEL_MAP = {"low": 0, "medium": 1, "high": 2}
+
+
+class ContadorConsultas:
+    """Cuenta las sentencias enviadas al servidor"""
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.total += 1
+
+
+def sembrar_datos(db, user_id, n):
+    ahora = datetime.now()
+    tareas = []
+    for i in range(n):
+        tareas.append({
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "title": random.choice(["Fix bug login", "Revisar informe", "Tarea crítica", "Reunión"]) + f" {i}",
+            "description": random.choice([None, "urgent: revisar", "descripción normal"]),
+            "urgency": random.choice(NIVELES),
+            "impact": random.choice(NIVELES),
+            "energy_required": random.choice(NIVELES),
+            "estimated_duration": random.randint(15, 300),
+            "deadline": ahora + timedelta(days=random.randint(-5, 10)),
+            "priority_level": random.choice(NIVELES),
+            "priority_score": random.randint(1, 100),
+            "status": "completed",
+        })
+    for i in range(0, n, 5000):
+        db.execute(insert(Task), tareas[i:i + 5000])
+
+    feedbacks = [{
+        "task_id": t["id"],
+        "user_id": user_id,
+        "feedback_type": "priority",
+        "was_useful": False,
+        "actual_priority": random.choice(NIVELES),
+    } for t in tareas if random.random() < 0.5]
+    for i in range(0, len(feedbacks), 5000):
+        db.execute(insert(MLFeedback), feedbacks[i:i + 5000])
+    db.commit()
+
+
+def preparar_datos_n_mas_uno(db, user_id):
+    """Versión anterior: una consulta por tarea completada"""
+    tareas = db.query(Task).filter(Task.user_id == user_id, Task.status == 'completed').all()
+    datos, objetivos = [], []
+    for task in tareas:
+        feedback = db.query(MLFeedback).filter(
+            MLFeedback.task_id == task.id,
+            MLFeedback.actual_priority.isnot(None)
+        ).order_by(MLFeedback.created_at.desc()).first()
+        prioridad_objetivo = _normalizar_nivel(feedback.actual_priority if feedback else task.priority_level)
+        deadline_proximo = 0
+        if task.deadline:
+            deadline_proximo = 1 if (task.deadline - datetime.now()).days <= 1 else 0
+        datos.append([
+            NIVEL_MAP.get(_normalizar_nivel(task.urgency), 1),
+            NIVEL_MAP.get(_normalizar_nivel(task.impact), 1),
+            NIVEL_MAP.get(_normalizar_nivel(task.energy_required), 1),
+            float(task.estimated_duration or 60),
+            len(task.description or ""),
+            1 if "urgent" in (task.description or "").lower() or "crític" in (task.title or "").lower() else 0,
+            1 if "bug" in (task.title or "").lower() or "fix" in (task.title or "").lower() else 0,
+            deadline_proximo,
+        ])
+        objetivos.append(PRIORIDAD_MAP[prioridad_objetivo])
+    return np.array(datos), np.array(objetivos)
+
+
+def medir(funcion, contador):
+    contador.total = 0
+    inicio = time.perf_counter()
+    X, _ = funcion()
+    return time.perf_counter() - inicio, contador.total, X
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--sin-n-mas-uno", action="store_true",
+                        help="No medir la versión anterior (lenta con tamaños grandes)")
+    args = parser.parse_args()
+
+    contador = ContadorConsultas()
+    event.listen(engine, "before_cursor_execute", contador)
+
+    print(f"{'tareas':>8} | {'versión':<12} | {'consultas':>9} | {'tiempo (s)':>10}")
+    print("-" * 50)
+    for n in args.tamanos:
+        db = SessionLocal()
+        user_id = uuid.uuid4()
+        try:
+            db.execute(insert(User).values(
+                id=user_id, email=f"bench-{user_id}@example.com",
+                password_hash="x", name="benchmark"
+            ))
+            sembrar_datos(db, user_id, n)
+
+            agent = TaskAgent(db, user_id)
+            t, consultas, X_nuevo = medir(agent._preparar_datos_entrenamiento, contador)
+            print(f"{n:>8} | {'consulta única':<12} | {consultas:>9} | {t:>10.3f}")
+
+            if not args.sin_n_mas_uno:
+                db.expunge_all()
+                t, consultas, X_viejo = medir(lambda: preparar_datos_n_mas_uno(db, user_id), contador)
+                print(f"{n:>8} | {'N+1':<12} | {consultas:>9} | {t:>10.3f}")
+                assert X_viejo.shape == X_nuevo.shape
+        finally:
+            db.rollback()
+            db.execute(delete(User).where(User.id == user_id))
+            db.commit()
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Throughput de los endpoints de lectura con la capa async (AsyncSession +
+asyncpg) frente a la configuración anterior: dependencia de autenticación
+async que consulta con una Session síncrona en el event loop y endpoint
+síncrono ejecutado en el threadpool.
+
+Ambas variantes sirven la misma consulta (primera página de tareas e
+historial del usuario) y se ejecutan en el mismo proceso vía ASGI con la
+caché de usuarios autenticados desactivada, para comparar solo el acceso
+a la base.
+
+La concurrencia por defecto queda por debajo del pool de conexiones
+síncrono (5 + 10): por encima, la variante anterior bloquea el event loop
+esperando conexiones que solo se liberan desde el propio loop y las
+peticiones acaban por timeout del pool.
+
+Requiere una base de datos PostgreSQL accesible en DATABASE_URL con las
+migraciones aplicadas. Crea un usuario temporal y lo elimina al terminar.
+
+Uso:
+    python scripts/benchmarks/bench_db_async.py [--peticiones 2000] [--concurrencia 10]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Response
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, get_db
+from app.main import app
+from app.models.database_models import User, Task, TaskHistory
+from app.security.auth import _user_id_from_token, oauth2_scheme
+from app.security.config import create_access_token
+from app.security.principal_cache import principal_cache
+from app.utils.pagination import paginar
+
+NIVELES = ["low", "medium", "high"]
+
+# Configuración anterior, reproducida fuera de la aplicación
+app_sincrona = FastAPI()
+
+
+async def usuario_sincrono(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    user = db.query(User).filter(User.id == _user_id_from_token(token)).first()
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401)
+    return user
+
+
+@app_sincrona.get("/api/v1/tasks/")
+def tareas_sincronas(response: Response, db: Session = Depends(get_db), current_user=Depends(usuario_sincrono)):
+    query = db.query(Task).filter(Task.user_id == current_user.id)
+    return paginar(query, Task.created_at, Task.id, response, limit=100)
+
+
+@app_sincrona.get("/api/v1/task_history/user/")
+def historial_sincrono(response: Response, db: Session = Depends(get_db), current_user=Depends(usuario_sincrono)):
+    query = db.query(TaskHistory).filter(TaskHistory.user_id == current_user.id)
+    return paginar(query, TaskHistory.created_at, TaskHistory.id, response, limit=100)
+
+
+def crear_datos(db) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    db.execute(insert(User).values(id=user_id, email=f"bench-{user_id}@example.com", password_hash="x", name="Benchmark"))
+    tareas = [{
+        "id": uuid.uuid4(), "user_id": user_id, "title": f"Tarea {i}",
+        "urgency": random.choice(NIVELES), "impact": random.choice(NIVELES), "status": "pending",
+    } for i in range(500)]
+    db.execute(insert(Task), tareas)
+    db.execute(insert(TaskHistory), [{
+        "id": uuid.uuid4(), "task_id": t["id"], "user_id": user_id, "change_type": "updated"
+    } for t in tareas])
+    db.commit()
+    return user_id
+
+
+async def medir(aplicacion, ruta: str, token: str, peticiones: int, concurrencia: int):
+    transporte = httpx.ASGITransport(app=aplicacion)
+    cabeceras = {"Authorization": f"Bearer {token}"}
+    latencias = []
+    semaforo = asyncio.Semaphore(concurrencia)
+
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=None) as cliente:
+        async def peticion():
+            async with semaforo:
+                inicio = time.perf_counter()
+                respuesta = await cliente.get(ruta, headers=cabeceras)
+                respuesta.raise_for_status()
+                latencias.append((time.perf_counter() - inicio) * 1000)
+
+        await peticion()  # calentamiento de pools de conexiones
+        latencias.clear()
+        inicio = time.perf_counter()
+        await asyncio.gather(*(peticion() for _ in range(peticiones)))
+        total = time.perf_counter() - inicio
+
+    latencias.sort()
+    return peticiones / total, statistics.median(latencias), latencias[int(len(latencias) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--peticiones", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, default=10)
+    args = parser.parse_args()
+
+    principal_cache.ttl_seconds = 0
+    db = SessionLocal()
+    user_id = crear_datos(db)
+    token = create_access_token({"sub": str(user_id)})
+
+    # Un único event loop: las conexiones de asyncpg quedan ligadas al loop que las abrió
+    async def comparar():
+        print(f"{'endpoint':<28} | {'variante':<9} | {'req/s':>8} | {'p50 (ms)':>9} | {'p99 (ms)':>9}")
+        for ruta in ("/api/v1/tasks/", "/api/v1/task_history/user/"):
+            for nombre, aplicacion in (("síncrona", app_sincrona), ("async", app)):
+                rps, p50, p99 = await medir(aplicacion, ruta, token, args.peticiones, args.concurrencia)
+                print(f"{ruta:<28} | {nombre:<9} | {rps:>8.1f} | {p50:>9.2f} | {p99:>9.2f}")
+
+    try:
+        asyncio.run(comparar())
+    finally:
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
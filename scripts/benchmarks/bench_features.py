@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark de extracción de características: ruta anterior fila a fila
+(diccionario por tarea + copia a lista de listas) frente a la versión
+vectorizada de app.services.ml_features.extraer_features y frente a
+extraer_features tal cual, que con menos de MIN_FILAS_VECTORIZADO tareas
+usa su versión por fila. Verifica además que todas las rutas producen
+exactamente la misma matriz.
+
+No requiere base de datos.
+
+Uso:
+    python scripts/benchmarks/bench_features.py [--tamanos 1 10 50 100 1000 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from app.services.ai_service import _normalizar_nivel
+from app.services import ml_features
+from app.services.ml_features import features_de_tareas
+
+NIVEL_MAP = {"low": 0, "medium": 1, "high": 2}
+NIVELES = [None, "", "low", "medium", "high", "HIGH ", "critical", "baja", "otro"]
+TITULOS = ["Fix bug login", "Revisar informe", "Tarea crítica", "Reunión", None, "Hotfix"]
+DESCRIPCIONES = [None, "", "urgent: revisar", "descripción normal", "Muy URGENT"]
+
+
+def generar_tareas(n, ahora):
+    return [SimpleNamespace(
+        urgency=random.choice(NIVELES),
+        impact=random.choice(NIVELES),
+        energy_required=random.choice(NIVELES),
+        estimated_duration=random.choice([None, 0, 30, 90, 240]),
+        title=random.choice(TITULOS),
+        description=random.choice(DESCRIPCIONES),
+        deadline=random.choice([None, ahora + timedelta(hours=random.uniform(-200, 200))]),
+    ) for _ in range(n)]
+
+
+def features_por_fila(tasks, ahora):
+    """Ruta anterior de predecir_prioridad_tareas"""
+    datos = []
+    for task in tasks:
+        deadline_proximo = 0
+        if task.deadline:
+            dias = (task.deadline - ahora).days
+            deadline_proximo = 1 if dias <= 1 else 0
+        datos.append({
+            'urgencia_encoded': NIVEL_MAP.get(_normalizar_nivel(task.urgency), 1),
+            'impacto_encoded': NIVEL_MAP.get(_normalizar_nivel(task.impact), 1),
+            'energia_encoded': NIVEL_MAP.get(_normalizar_nivel(task.energy_required), 1),
+            'duracion_estimada': float(task.estimated_duration or 60),
+            'longitud_descripcion': len(task.description or ""),
+            'tiene_urgente': 1 if "urgent" in (task.description or "").lower() or "crític" in (task.title or "").lower() else 0,
+            'tiene_bug': 1 if "bug" in (task.title or "").lower() or "fix" in (task.title or "").lower() else 0,
+            'deadline_proximo': deadline_proximo
+        })
+    return np.array([[
+        d['urgencia_encoded'], d['impacto_encoded'], d['energia_encoded'],
+        d['duracion_estimada'], d['longitud_descripcion'],
+        d['tiene_urgente'], d['tiene_bug'], d['deadline_proximo']
+    ] for d in datos], dtype=np.float64)
+
+
+def mejor_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1, 10, 50, 100, 1_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    ahora = datetime.now()
+    umbral = ml_features.MIN_FILAS_VECTORIZADO
+    print(f"MIN_FILAS_VECTORIZADO = {umbral}")
+    print(f"{'tareas':>8} | {'por fila (ms)':>13} | {'vectorizado (ms)':>16} | {'extraer_features (ms)':>21} | {'aceleración':>11}")
+    print("-" * 84)
+    for n in args.tamanos:
+        tasks = generar_tareas(n, ahora)
+        t_fila, X_fila = mejor_tiempo(lambda: features_por_fila(tasks, ahora), args.repeticiones)
+        ml_features.MIN_FILAS_VECTORIZADO = 0
+        try:
+            t_vec, X_vec = mejor_tiempo(lambda: features_de_tareas(tasks, ahora=ahora), args.repeticiones)
+        finally:
+            ml_features.MIN_FILAS_VECTORIZADO = umbral
+        t_final, X_final = mejor_tiempo(lambda: features_de_tareas(tasks, ahora=ahora), args.repeticiones)
+        assert np.array_equal(X_fila.reshape(X_vec.shape), X_vec), "Las rutas no coinciden"
+        assert np.array_equal(X_final, X_vec), "Las rutas no coinciden"
+        print(f"{n:>8} | {t_fila * 1000:>13.3f} | {t_vec * 1000:>16.3f} | {t_final * 1000:>21.3f} | "
+              f"{t_fila / t_final:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark del formato de modelos: pickle de joblib (formato anterior)
+frente a app.services.model_format con cada codec disponible. Mide el
+tamaño del blob y el tiempo de carga, y comprueba que el árbol cargado
+predice exactamente lo mismo que el DecisionTreeClassifier original.
+
+Entrena árboles sintéticos con las mismas características que el modelo de
+prioridad; --profundidades 3 corresponde al modelo de producción. No requiere
+base de datos.
+
+Uso:
+    python scripts/benchmarks/bench_formato_modelo.py [--profundidades 3 8 0]
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from io import BytesIO
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import joblib
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+
+from app.services.ml_features import FEATURE_NAMES
+from app.services.model_format import CODECS, cargar_modelo, desde_sklearn, serializar
+
+# Codecs cuya librería está instalada
+MODULOS_CODEC = {"zstd": "zstandard", "lz4": "lz4"}
+
+
+def codecs_disponibles():
+    return [
+        codec for codec in CODECS
+        if codec not in MODULOS_CODEC or importlib.util.find_spec(MODULOS_CODEC[codec]) is not None
+    ]
+
+
+def entrenar(n_filas, profundidad, rng):
+    X = np.column_stack([
+        rng.integers(0, 3, n_filas), rng.integers(0, 3, n_filas), rng.integers(0, 3, n_filas),
+        rng.choice([30.0, 60.0, 90.0, 240.0], n_filas), rng.integers(0, 500, n_filas),
+        rng.integers(0, 2, n_filas), rng.integers(0, 2, n_filas), rng.integers(0, 2, n_filas),
+    ]).astype(np.float64)
+    assert X.shape[1] == len(FEATURE_NAMES)
+    y = np.clip(X[:, 0] + X[:, 1] + rng.integers(-1, 2, n_filas), 1, 3).astype(np.int64)
+    modelo = DecisionTreeClassifier(max_depth=profundidad or None, random_state=42, class_weight="balanced")
+    return modelo.fit(X, y), X
+
+
+def mejor_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profundidades", type=int, nargs="+", default=[3, 8, 0],
+                        help="max_depth de los árboles (0 = sin límite)")
+    parser.add_argument("--filas", type=int, default=20_000, help="filas de entrenamiento")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'profundidad':>11} | {'nodos':>6} | {'formato':>14} | {'bytes':>9} | {'carga (µs)':>10}")
+    print("-" * 64)
+    for profundidad in args.profundidades:
+        modelo, X = entrenar(args.filas, profundidad, rng)
+        esperado = modelo.predict(X)
+
+        buffer = BytesIO()
+        joblib.dump(modelo, buffer)
+        blob_joblib = buffer.getvalue()
+        t_joblib, _ = mejor_tiempo(lambda: joblib.load(BytesIO(blob_joblib)), args.repeticiones)
+        etiqueta = str(profundidad or "-")
+        nodos = modelo.tree_.node_count
+        print(f"{etiqueta:>11} | {nodos:>6} | {'joblib':>14} | {len(blob_joblib):>9} | {t_joblib * 1e6:>10.1f}")
+
+        arbol = desde_sklearn(modelo)
+        for codec in codecs_disponibles():
+            blob = serializar(arbol, codec)
+            t_carga, cargado = mejor_tiempo(lambda: cargar_modelo(blob), args.repeticiones)
+            assert np.array_equal(cargado.predict(X), esperado), f"Predicciones distintas con {codec}"
+            print(f"{etiqueta:>11} | {nodos:>6} | {'compacto/' + codec:>14} | {len(blob):>9} | {t_carga * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
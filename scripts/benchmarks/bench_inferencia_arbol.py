@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark de inferencia: DecisionTreeClassifier.predict frente a
+ArbolCompacto.predict (solo NumPy) para lotes de 1, 100 y 10 000 tareas,
+con el árbol de producción (max_depth=3) y uno más profundo. Verifica que
+ambas rutas predicen exactamente lo mismo y mide también lo que cuesta
+importar scikit-learn, que los workers de la API ya no pagan.
+
+No requiere base de datos.
+
+Uso:
+    python scripts/benchmarks/bench_inferencia_arbol.py [--tamanos 1 100 10000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+
+def tiempo_import(modulo):
+    """Tiempo de importar el módulo en un intérprete nuevo (mejor de 3)"""
+    codigo = f"import time; t = time.perf_counter(); import {modulo}; print(time.perf_counter() - t)"
+    raiz = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return min(float(subprocess.check_output([sys.executable, "-c", codigo], cwd=raiz)) for _ in range(3))
+
+
+def mediana_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return float(np.median(tiempos)), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--profundidades", type=int, nargs="+", default=[3, 10])
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"⏱️ import sklearn.tree: {tiempo_import('sklearn.tree') * 1000:.0f} ms; "
+          f"import app.services.model_format: {tiempo_import('app.services.model_format') * 1000:.0f} ms")
+
+    from sklearn.tree import DecisionTreeClassifier
+    from app.services.ml_features import FEATURE_NAMES
+    from app.services.model_format import desde_sklearn
+
+    rng = np.random.default_rng(42)
+    X_entrenamiento = rng.integers(0, 300, (20_000, len(FEATURE_NAMES))).astype(np.float64)
+    y = rng.integers(1, 4, len(X_entrenamiento))
+
+    print(f"{'profundidad':>11} | {'tareas':>6} | {'sklearn (µs)':>12} | {'numpy (µs)':>10} | {'aceleración':>11}")
+    print("-" * 64)
+    for profundidad in args.profundidades:
+        modelo = DecisionTreeClassifier(max_depth=profundidad, random_state=42).fit(X_entrenamiento, y)
+        arbol = desde_sklearn(modelo)
+        for n in args.tamanos:
+            X = rng.integers(0, 300, (n, len(FEATURE_NAMES))).astype(np.float64)
+            t_sklearn, esperado = mediana_tiempo(lambda: modelo.predict(X), args.repeticiones)
+            t_numpy, obtenido = mediana_tiempo(lambda: arbol.predict(X), args.repeticiones)
+            assert np.array_equal(esperado, obtenido), "Las predicciones no coinciden"
+            print(f"{profundidad:>11} | {n:>6} | {t_sklearn * 1e6:>12.1f} | {t_numpy * 1e6:>10.1f} | "
+                  f"{t_sklearn / t_numpy:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark de paginación del historial de tareas: OFFSET frente a cursor
+(keyset) en páginas cada vez más profundas.
+
+Requiere una base de datos PostgreSQL accesible en DATABASE_URL con las
+migraciones aplicadas. Crea un usuario temporal con el historial necesario
+para llegar a la página más profunda y lo elimina al terminar.
+
+Uso:
+    python scripts/benchmarks/bench_paginacion.py [--paginas 1 100 10000] [--limite 100]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import Response
+from sqlalchemy import delete, insert, text
+
+from app.database import SessionLocal
+from app.models.database_models import User, Task, TaskHistory
+from app.utils.pagination import paginar, codificar_cursor
+
+
+def crear_historial(db, filas: int) -> uuid.UUID:
+    user_id, task_id = uuid.uuid4(), uuid.uuid4()
+    db.execute(insert(User).values(
+        id=user_id, email=f"bench-{user_id}@example.com", password_hash="x", name="Benchmark"
+    ))
+    db.execute(insert(Task).values(id=task_id, user_id=user_id, title="Tarea de benchmark"))
+    # Un cambio por minuto hacia atrás desde ahora, generado en el servidor
+    db.execute(text("""
+        INSERT INTO task_history (id, task_id, user_id, change_type, change_description, created_at)
+        SELECT gen_random_uuid(), :task_id, :user_id, 'updated', 'Task updated',
+               now() - make_interval(mins => n)
+        FROM generate_series(1, :filas) AS n
+    """), {"task_id": task_id, "user_id": user_id, "filas": filas})
+    db.commit()
+    db.execute(text("ANALYZE task_history"))
+    return user_id
+
+
+def medir(funcion, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--limite", type=int, default=100)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    filas = max(args.paginas) * args.limite
+    db = SessionLocal()
+    print(f"🧪 Creando {filas} filas de historial...")
+    user_id = crear_historial(db, filas)
+
+    def consulta():
+        return db.query(TaskHistory).filter(TaskHistory.user_id == user_id)
+
+    try:
+        print(f"{'página':>8} | {'offset (ms)':>12} | {'cursor (ms)':>12}")
+        for pagina in args.paginas:
+            skip = (pagina - 1) * args.limite
+            cursor = None
+            if skip:
+                # Cursor de la última fila de la página anterior (fuera de la medición)
+                anterior = consulta().order_by(
+                    TaskHistory.created_at.desc(), TaskHistory.id.desc()
+                ).offset(skip - 1).first()
+                cursor = codificar_cursor(anterior.created_at, anterior.id)
+
+            por_offset = medir(lambda: paginar(
+                consulta(), TaskHistory.created_at, TaskHistory.id, Response(), skip=skip, limit=args.limite
+            ), args.repeticiones)
+            por_cursor = medir(lambda: paginar(
+                consulta(), TaskHistory.created_at, TaskHistory.id, Response(), limit=args.limite, cursor=cursor
+            ), args.repeticiones)
+            print(f"{pagina:>8} | {por_offset:>12.2f} | {por_cursor:>12.2f}")
+    finally:
+        db.rollback()
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de /api/v1/auth/login: lanza N logins concurrentes contra
+la aplicación (en el mismo proceso, vía ASGI) y mide el retraso del event
+loop con un temporizador que debería despertar cada 5 ms.
+
+Con --en-loop se reproduce el comportamiento anterior (bcrypt ejecutado
+directamente en el event loop) para comparar.
+
+Requiere una base de datos PostgreSQL accesible en DATABASE_URL con las
+migraciones aplicadas. Crea un usuario temporal y lo elimina al terminar.
+
+Uso:
+    python scripts/benchmarks/carga_login.py [--logins 200] [--en-loop]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+from sqlalchemy import delete, insert
+
+from app.database import SessionLocal
+from app.main import app
+from app.models.database_models import User
+from app.security.config import get_password_hash, verify_password
+from app.security.password_pool import password_pool
+
+INTERVALO_TICK = 0.005
+PASSWORD = "password-de-prueba"
+
+
+async def medir_retraso(retrasos, parar: asyncio.Event):
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(INTERVALO_TICK)
+        retrasos.append((time.perf_counter() - inicio - INTERVALO_TICK) * 1000)
+
+
+async def ejecutar(email: str, logins: int):
+    retrasos = []
+    parar = asyncio.Event()
+    transporte = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transporte, base_url="http://test", timeout=None) as cliente:
+        async def login():
+            respuesta = await cliente.post(
+                "/api/v1/auth/login", data={"username": email, "password": PASSWORD}
+            )
+            return respuesta.status_code
+
+        ticker = asyncio.create_task(medir_retraso(retrasos, parar))
+        inicio = time.perf_counter()
+        codigos = await asyncio.gather(*(login() for _ in range(logins)))
+        total = time.perf_counter() - inicio
+        parar.set()
+        await ticker
+
+    return codigos, total, retrasos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--en-loop", action="store_true", help="Verificar bcrypt en el event loop (comportamiento anterior)")
+    args = parser.parse_args()
+
+    if args.en_loop:
+        async def verificar_en_loop(plain_password, hashed_password):
+            return verify_password(plain_password, hashed_password)
+        password_pool.verificar = verificar_en_loop
+
+    db = SessionLocal()
+    user_id = uuid.uuid4()
+    email = f"carga-{user_id}@example.com"
+    db.execute(insert(User).values(
+        id=user_id, email=email, password_hash=get_password_hash(PASSWORD), name="Carga"
+    ))
+    db.commit()
+
+    try:
+        codigos, total, retrasos = asyncio.run(ejecutar(email, args.logins))
+    finally:
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+        db.close()
+
+    retrasos.sort()
+    modo = "bcrypt en el event loop" if args.en_loop else f"pool de {password_pool.max_workers} hilos"
+    print(f"🔐 {args.logins} logins concurrentes ({modo}) en {total:.2f}s")
+    print(f"   Respuestas: { {c: codigos.count(c) for c in set(codigos)} }")
+    print(f"   Retraso del event loop: p50={statistics.median(retrasos):.2f} ms, "
+          f"p99={retrasos[int(len(retrasos) * 0.99) - 1]:.2f} ms, máx={retrasos[-1]:.2f} ms "
+          f"({len(retrasos)} muestras)")
+    if not args.en_loop:
+        print(f"   Pool: {password_pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Script para reescribir en el formato compacto (model_version 3.2) los
+modelos guardados como pickle de joblib (model_version 3.1).
+
+La API ya los convierte al cargarlos, pero deserializar el pickle importa
+scikit-learn en el worker. Tras ejecutar este script ningún worker de la API
+necesita importarlo. Se procesa un modelo por transacción y la conversión se
+comprueba prediciendo con ambos sobre datos aleatorios antes de guardarla.
+
+Uso:
+    python scripts/convertir_modelos.py            # todos los modelos 3.1
+    python scripts/convertir_modelos.py --activos  # solo los activos
+    python scripts/convertir_modelos.py --dry-run  # contar sin escribir
+"""
+
+import argparse
+import os
+import sys
+from io import BytesIO
+
+# Añadir el directorio raíz al path para importar los módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+from sqlalchemy import update
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.database_models import AIModel
+from app.services.model_cache import model_cache
+from app.services.model_format import MODEL_VERSION, deserializar, desde_sklearn, es_formato_compacto, serializar
+
+
+def convertir(blob: bytes) -> bytes:
+    modelo = joblib.load(BytesIO(blob))
+    nuevo = serializar(desde_sklearn(modelo), settings.ML_MODEL_COMPRESSION)
+    X = np.random.default_rng(0).integers(0, 500, (1000, modelo.n_features_in_)).astype(np.float64)
+    if not np.array_equal(deserializar(nuevo).predict(X), modelo.predict(X)):
+        raise ValueError("las predicciones del modelo convertido no coinciden")
+    return nuevo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activos", action="store_true", help="convertir solo los modelos activos")
+    parser.add_argument("--dry-run", action="store_true", help="mostrar cuántos hay sin escribir")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        query = db.query(AIModel.id, AIModel.user_id).filter(AIModel.model_version != MODEL_VERSION)
+        if args.activos:
+            query = query.filter(AIModel.is_active == True)
+        pendientes = query.all()
+        print(f"📦 Modelos en formato anterior: {len(pendientes)}")
+        if args.dry_run:
+            return
+
+        convertidos = fallidos = 0
+        for model_id, user_id in pendientes:
+            blob = db.query(AIModel.model_data).filter(AIModel.id == model_id).scalar()
+            if not blob or es_formato_compacto(blob):
+                continue
+            try:
+                nuevo = convertir(bytes(blob))
+                db.execute(
+                    update(AIModel).where(AIModel.id == model_id)
+                    .values(model_data=nuevo, model_version=MODEL_VERSION)
+                )
+                db.commit()
+                model_cache.invalidate_user(user_id)
+                convertidos += 1
+                print(f"✅ {model_id}: {len(blob)} → {len(nuevo)} bytes")
+            except Exception as e:
+                db.rollback()
+                fallidos += 1
+                print(f"❌ {model_id}: {e}")
+
+        print(f"🏁 Convertidos: {convertidos}, fallidos: {fallidos}")
+        sys.exit(1 if fallidos else 0)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script de mantenimiento de las particiones mensuales de task_history y
+energy_logs:
+
+- crea las particiones del mes actual y de los próximos meses
+  (PARTITION_PREMAKE_MONTHS, o --meses-adelante);
+- aplica la retención: con TASK_HISTORY_RETENTION_MONTHS /
+  ENERGY_LOG_RETENTION_MONTHS mayores que 0, los meses anteriores a esa
+  ventana se archivan como CSV comprimido en PARTITION_ARCHIVE_DIR y se
+  eliminan (PARTITION_RETENTION_MODE=archive) o se eliminan sin archivar
+  (drop).
+
+La aplicación también crea las particiones próximas al arrancar; este script
+es el único que aplica la retención. Es seguro ejecutarlo a la vez desde
+varios sitios, pero el archivo se escribe donde se ejecuta: con archive,
+PARTITION_ARCHIVE_DIR es obligatorio y debe ser un almacenamiento duradero
+y compartido (p. ej. un volumen montado en el host del cron).
+
+Uso:
+    python scripts/mantener_particiones.py
+    python scripts/mantener_particiones.py --meses-adelante 6
+    python scripts/mantener_particiones.py --sin-retencion
+
+    # crontab: el día 1 de cada mes a las 04:00
+    0 4 1 * * cd /ruta/backend-smart-task && python scripts/mantener_particiones.py
+"""
+
+import argparse
+import os
+import sys
+
+# Añadir el directorio raíz al path para importar los módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.partition_maintenance import mantener_particiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meses-adelante", type=int, default=settings.PARTITION_PREMAKE_MONTHS,
+                        help="Meses futuros con partición creada")
+    parser.add_argument("--sin-retencion", action="store_true", help="Solo crear particiones")
+    args = parser.parse_args()
+
+    print("🗂️ Manteniendo particiones...")
+    try:
+        resultado = mantener_particiones(args.meses_adelante, retencion=not args.sin_retencion)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✅ Particiones creadas: {', '.join(resultado['created']) or 'ninguna'}")
+    print(f"🗑️ Particiones retiradas: {', '.join(resultado['removed']) or 'ninguna'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Script para precalcular las prioridades ML de las tareas pendientes de
+muchos usuarios y guardarlas en task_ml_data.
+
+Uso:
+    python scripts/priorizar_lote.py                       # todos los usuarios activos
+    python scripts/priorizar_lote.py --users <uuid> <uuid>
+    python scripts/priorizar_lote.py --chunk-size 1000 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import uuid
+
+# Añadir el directorio raíz al path para importar los módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.batch_scoring import puntuar_usuarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=uuid.UUID, nargs="+", help="Usuarios a procesar (por defecto, todos los activos)")
+    parser.add_argument("--chunk-size", type=int, default=settings.BATCH_SCORING_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=settings.BATCH_SCORING_WORKERS)
+    args = parser.parse_args()
+
+    print("📦 Iniciando priorización masiva...")
+    resultado = puntuar_usuarios(args.users, chunk_size=args.chunk_size, workers=args.workers)
+    print(f"✅ Usuarios procesados: {resultado['users']}")
+    print(f"📋 Tareas puntuadas: {resultado['tasks']}")
+    print(f"⏱️ Tiempo total: {resultado['seconds']}s")
+    print(f"🚀 Rendimiento: {resultado['users_per_second']} usuarios/s")
+
+
+if __name__ == "__main__":
+    main()
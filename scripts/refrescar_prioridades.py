@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Script para refrescar priority_level y priority_score de las tareas
+pendientes cuyo deadline ha cruzado un umbral de las reglas (vencida, 2 h,
+24 h, 3 días) desde la última ejecución.
+
+Pensado para cron: con la ventana por defecto (25 h) basta una ejecución
+nocturna, pero entre ejecuciones las prioridades pueden ir hasta un día por
+detrás. Para ordenar con valores más frescos, ejecutarlo cada hora con una
+ventana algo mayor que el intervalo, o dejarlo como worker con --cada-minutos.
+Las ventanas solapadas no duplican cambios: solo se escriben las tareas cuyo
+valor recalculado difiere del guardado.
+
+Uso:
+    python scripts/refrescar_prioridades.py                      # últimas 25 h
+    python scripts/refrescar_prioridades.py --ventana-horas 1.5  # cron horario
+    python scripts/refrescar_prioridades.py --todas              # todas las pendientes con deadline
+    python scripts/refrescar_prioridades.py --cada-minutos 15    # worker en bucle
+
+    # crontab: todas las noches a las 03:00
+    0 3 * * * cd /ruta/backend-smart-task && python scripts/refrescar_prioridades.py
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Añadir el directorio raíz al path para importar los módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.priority_refresh import refrescar_prioridades
+
+
+def mostrar(resultado):
+    print(f"✅ Tareas revisadas: {resultado['checked']}")
+    print(f"🔄 Prioridades actualizadas: {resultado['updated']}")
+    print(f"⏱️ Tiempo total: {resultado['seconds']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ventana-horas", type=float, default=25, help="Horas hacia atrás desde la ejecución anterior")
+    parser.add_argument("--todas", action="store_true", help="Revisar todas las tareas pendientes con deadline")
+    parser.add_argument("--cada-minutos", type=float, help="Repetir indefinidamente con este intervalo")
+    parser.add_argument("--batch-size", type=int, default=settings.PRIORITY_REFRESH_BATCH_SIZE)
+    args = parser.parse_args()
+
+    ahora = datetime.now()
+    desde = None if args.todas else ahora - timedelta(hours=args.ventana_horas)
+    print("🔄 Refrescando prioridades...")
+    mostrar(refrescar_prioridades(desde, ahora, batch_size=args.batch_size))
+
+    if args.cada_minutos:
+        while True:
+            time.sleep(args.cada_minutos * 60)
+            # Cada vuelta cubre desde la anterior; el minuto extra absorbe desfases de reloj
+            desde, ahora = ahora - timedelta(minutes=1), datetime.now()
+            mostrar(refrescar_prioridades(desde, ahora, batch_size=args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -19,8 +19,8 @@ print(f"🔍 Buscando módulos en: {project_root}")
 
 try:
     from sqlalchemy.orm import Session
-    from app.database import SessionLocal, engine
-    from app.models.database_models import User, Category, Task, Base
+    from app.database import SessionLocal, aplicar_migraciones
+    from app.models.database_models import User, Category, Task
     print("✅ Módulos importados correctamente")
 except ImportError as e:
     print(f"❌ Error importando módulos: {e}")
@@ -147,12 +147,12 @@ if __name__ == "__main__":
     print("🛠️  Script de inicialización de datos de prueba")
     print("=" * 50)
     
-    # Crear tablas si no existen
+    # Crear o actualizar el esquema con las migraciones
     try:
-        Base.metadata.create_all(bind=engine)
-        print("✅ Tablas de base de datos verificadas")
+        aplicar_migraciones()
+        print("✅ Esquema de base de datos al día (alembic upgrade head)")
     except Exception as e:
-        print(f"❌ Error al crear tablas: {e}")
+        print(f"❌ Error al aplicar las migraciones: {e}")
         sys.exit(1)
     
     create_admin_user()
\ No newline at end of file
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Verificación de índices: ejecuta EXPLAIN sobre las consultas más frecuentes
+del API y falla si alguna recurre a un Seq Scan.
+
+Cada consulta se planifica con enable_seqscan desactivado dentro de una
+transacción que se revierte; así el planificador solo elige un Seq Scan
+cuando no existe ningún índice utilizable, sin depender del volumen de
+datos de la base. Las consultas de ORDENADAS_POR_INDICE fallan también si
+su plan ordena las filas en lugar de leerlas en el orden del índice.
+Requiere el esquema al día (alembic upgrade head).
+
+Uso:
+    python scripts/verificar_indices.py          # código de salida 1 si hay regresiones
+    python scripts/verificar_indices.py --planes # muestra además cada plan
+"""
+
+import argparse
+import os
+import sys
+import uuid
+from datetime import date, datetime, timedelta
+
+# Añadir el directorio raíz al path para importar los módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, tuple_
+
+from app.database import SessionLocal
+from app.models.database_models import (
+    Task, TaskHistory, DailyRecommendation, EnergyLog, AIModel, MLFeedback, Category
+)
+from app.services.ai_service import TaskAgent
+from app.services.ml_materialization import consulta_priorizadas
+from app.services.priority_refresh import COLUMNAS_PRIORIDAD
+
+ESTADOS_PENDIENTES = ('pending', 'in_progress')
+
+
+# Consultas paginadas que deben leerse en el orden del índice, sin ordenar todas las filas
+ORDENADAS_POR_INDICE = {"task_ml_data priorizadas", "task_ml_data priorizadas por cursor"}
+
+
+def consultas_frecuentes(db, user_id, task_id):
+    """Consultas con la misma forma que las de los endpoints y servicios"""
+    ahora = datetime.now()
+    hoy = date.today()
+    agente = TaskAgent.__new__(TaskAgent)
+    agente.db, agente.user_id = db, user_id
+
+    return {
+        "tasks por usuario y estado": db.query(Task).filter(
+            Task.user_id == user_id, Task.status == 'pending'
+        ).limit(100),
+        "tasks pendientes por deadline": db.query(Task).filter(
+            Task.user_id == user_id, Task.status.in_(ESTADOS_PENDIENTES)
+        ).order_by(Task.deadline),
+        "tasks por rango de deadline (refresco)": select(*COLUMNAS_PRIORIDAD).where(
+            Task.status.in_(ESTADOS_PENDIENTES),
+            Task.deadline.isnot(None),
+            Task.deadline.between(ahora, ahora + timedelta(hours=1)),
+            tuple_(Task.deadline, Task.id) > tuple_(ahora, task_id)
+        ).order_by(Task.deadline, Task.id).limit(1000),
+        "tasks completadas (entrenamiento)": agente._consulta_datos_entrenamiento(),
+        "task_history por tarea": db.query(TaskHistory).filter(
+            TaskHistory.task_id == task_id
+        ).order_by(TaskHistory.created_at.desc()).limit(100),
+        "task_history por usuario": db.query(TaskHistory).filter(
+            TaskHistory.user_id == user_id
+        ).order_by(TaskHistory.created_at.desc(), TaskHistory.id.desc()).limit(100),
+        "task_history por cursor": db.query(TaskHistory).filter(
+            TaskHistory.user_id == user_id,
+            tuple_(TaskHistory.created_at, TaskHistory.id) < tuple_(ahora, task_id)
+        ).order_by(TaskHistory.created_at.desc(), TaskHistory.id.desc()).limit(100),
+        "tasks por cursor": db.query(Task).filter(
+            Task.user_id == user_id,
+            tuple_(Task.created_at, Task.id) < tuple_(ahora, task_id)
+        ).order_by(Task.created_at.desc(), Task.id.desc()).limit(100),
+        "daily_recommendations por fecha": db.query(DailyRecommendation).filter(
+            DailyRecommendation.user_id == user_id,
+            DailyRecommendation.recommendation_date >= hoy - timedelta(days=30),
+            DailyRecommendation.recommendation_date <= hoy
+        ).limit(100),
+        "energy_logs por fecha": db.query(EnergyLog).filter(
+            EnergyLog.user_id == user_id,
+            EnergyLog.logged_at >= ahora - timedelta(days=30)
+        ).order_by(EnergyLog.logged_at.desc()).limit(100),
+        "energy_logs por tarea": db.query(EnergyLog).filter(EnergyLog.task_id == task_id),
+        "ai_models activo": db.query(AIModel.id).filter(
+            AIModel.user_id == user_id, AIModel.is_active == True
+        ).order_by(AIModel.trained_at.desc()).limit(1),
+        "ml_feedback negativo reciente": db.query(MLFeedback).filter(
+            MLFeedback.user_id == user_id,
+            MLFeedback.created_at >= ahora - timedelta(hours=24),
+            MLFeedback.was_useful == False
+        ),
+        "ml_feedback por tarea": db.query(MLFeedback).filter(
+            MLFeedback.task_id == task_id
+        ).order_by(MLFeedback.created_at.desc()).limit(1),
+        "task_ml_data priorizadas": consulta_priorizadas(user_id, ahora).limit(100),
+        "task_ml_data priorizadas por cursor": consulta_priorizadas(user_id, ahora, (1, task_id)).limit(100),
+        "categories por nombre": db.query(Category).filter(
+            Category.user_id == user_id, Category.name == 'Trabajo'
+        ),
+    }
+
+
+def explicar(db, query) -> str:
+    stmt = query.statement if hasattr(query, "statement") else query
+    compilado = stmt.compile(
+        dialect=db.bind.dialect,
+        compile_kwargs={"render_postcompile": True}
+    )
+    parametros = {
+        clave: str(valor) if isinstance(valor, uuid.UUID) else valor
+        for clave, valor in compilado.params.items()
+    }
+    filas = db.connection().exec_driver_sql(f"EXPLAIN {compilado}", parametros).fetchall()
+    return "\n".join(fila[0] for fila in filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--planes", action="store_true", help="Mostrar el plan de cada consulta")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    fallos = []
+    try:
+        db.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+        for nombre, query in consultas_frecuentes(db, uuid.uuid4(), uuid.uuid4()).items():
+            plan = explicar(db, query)
+            if "Seq Scan" in plan:
+                fallos.append(nombre)
+                print(f"❌ {nombre}: Seq Scan")
+            elif nombre in ORDENADAS_POR_INDICE and "Sort  (cost" in plan:
+                fallos.append(nombre)
+                print(f"❌ {nombre}: Sort")
+            else:
+                print(f"✅ {nombre}")
+            if args.planes or nombre in fallos:
+                print(plan + "\n")
+    finally:
+        db.rollback()
+        db.close()
+
+    if fallos:
+        print(f"❌ {len(fallos)} consultas sin índice utilizable: {', '.join(fallos)}")
+        sys.exit(1)
+    print("✅ Todas las consultas frecuentes usan índices")
+
+
+if __name__ == "__main__":
+    main()
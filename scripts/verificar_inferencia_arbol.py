@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Comprueba que la inferencia con NumPy (ArbolCompacto.predict, en
+app/services/model_format.py) da exactamente las mismas clases que
+DecisionTreeClassifier.predict.
+
+Entrena árboles aleatorios (profundidad, número de clases y pesos de clase
+variables) sobre datos con valores repetidos, como las
+características reales, y los evalúa sobre filas nuevas más filas situadas
+justo en cada umbral y un ulp a cada lado, en float64 y en float32. Cada
+árbol se comprueba tras pasar por el formato serializado con todos los
+codecs. Con --base de datos comprueba además los modelos guardados en
+ai_models contra las características de las tareas de su usuario.
+
+Termina con código 1 si alguna predicción difiere.
+
+Uso:
+    python scripts/verificar_inferencia_arbol.py [--arboles 200] [--semilla 0] [--base]
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+
+from app.services.ml_features import FEATURE_NAMES
+from app.services.model_format import CODECS, cargar_modelo, desde_sklearn, serializar
+
+MODULOS_CODEC = {"zstd": "zstandard", "lz4": "lz4"}
+
+
+def codecs_disponibles():
+    return [
+        codec for codec in CODECS
+        if codec not in MODULOS_CODEC or importlib.util.find_spec(MODULOS_CODEC[codec]) is not None
+    ]
+
+
+def datos(rng, n_filas, n_clases):
+    """Mezcla de columnas discretas (como los niveles codificados) y continuas"""
+    n = len(FEATURE_NAMES)
+    X = np.where(
+        rng.random(n) < 0.5,
+        rng.integers(0, 4, (n_filas, n)),
+        rng.normal(0, 1000, (n_filas, n))
+    )
+    y = rng.integers(1, n_clases + 1, n_filas)
+    return X, y
+
+
+def filas_en_umbrales(modelo, rng):
+    """Filas aleatorias con una característica igual a cada umbral y a un ulp de él"""
+    arbol = modelo.tree_
+    internos = np.flatnonzero(arbol.children_left != -1)
+    filas = []
+    for nodo in internos:
+        umbral = arbol.threshold[nodo]
+        for valor in (umbral, np.nextafter(umbral, -np.inf), np.nextafter(umbral, np.inf),
+                      np.float32(umbral), np.nextafter(np.float32(umbral), np.float32(np.inf))):
+            fila = rng.normal(0, 1000, len(FEATURE_NAMES))
+            fila[arbol.feature[nodo]] = valor
+            filas.append(fila)
+    return np.array(filas).reshape(-1, len(FEATURE_NAMES))
+
+
+def verificar_sinteticos(n_arboles, semilla):
+    rng = np.random.default_rng(semilla)
+    diferencias = 0
+    codecs = codecs_disponibles()
+    for i in range(n_arboles):
+        n_clases = int(rng.integers(2, 6))
+        X, y = datos(rng, int(rng.integers(5, 3000)), n_clases)
+        modelo = DecisionTreeClassifier(
+            max_depth=int(rng.choice([1, 2, 3, 5, 8, 0])) or None,
+            class_weight=rng.choice([None, "balanced"]),
+            random_state=i
+        ).fit(X, y)
+        X_prueba = np.vstack([datos(rng, 500, n_clases)[0], filas_en_umbrales(modelo, rng), X[:200]])
+
+        for entrada in (X_prueba, X_prueba.astype(np.float32)):
+            esperado = modelo.predict(entrada)
+            for codec in codecs:
+                obtenido = cargar_modelo(serializar(desde_sklearn(modelo), codec)).predict(entrada)
+                distintos = np.flatnonzero(obtenido != esperado)
+                if len(distintos):
+                    diferencias += len(distintos)
+                    print(f"❌ árbol {i} ({codec}, {entrada.dtype}): {len(distintos)} filas distintas, "
+                          f"p. ej. fila {distintos[0]}: sklearn={esperado[distintos[0]]} numpy={obtenido[distintos[0]]}")
+    estado = "✅" if not diferencias else "❌"
+    print(f"{estado} {n_arboles} árboles sintéticos, codecs {', '.join(codecs)}: {diferencias} predicciones distintas")
+    return diferencias
+
+
+def verificar_base():
+    """Modelos de ai_models frente a las tareas de su usuario (los antiguos en joblib se comparan con sklearn)"""
+    import joblib
+    from io import BytesIO
+    from app.database import SessionLocal
+    from app.models.database_models import AIModel, Task
+    from app.services.ml_features import COLUMNAS_FEATURES, extraer_features
+    from app.services.model_format import deserializar, es_formato_compacto
+
+    diferencias = modelos = 0
+    db = SessionLocal()
+    try:
+        for model_id, user_id, blob in db.query(AIModel.id, AIModel.user_id, AIModel.model_data).yield_per(50):
+            if not blob:
+                continue
+            columnas = [getattr(Task, columna) for columna in COLUMNAS_FEATURES]
+            filas = db.query(*columnas).filter(Task.user_id == user_id).limit(5000).all()
+            if not filas:
+                continue
+            X = extraer_features(*zip(*filas))
+            if es_formato_compacto(blob):
+                # Sin el estimador original: se compara con el recorrido nodo a nodo
+                arbol = deserializar(blob)
+                esperado = np.array([_recorrer(arbol, fila) for fila in X.astype(np.float32)])
+            else:
+                esperado = joblib.load(BytesIO(bytes(blob))).predict(X)
+            obtenido = cargar_modelo(blob).predict(X)
+            distintos = int(np.count_nonzero(obtenido != esperado))
+            modelos += 1
+            diferencias += distintos
+            if distintos:
+                print(f"❌ modelo {model_id}: {distintos}/{len(X)} predicciones distintas")
+    finally:
+        db.close()
+    estado = "✅" if not diferencias else "❌"
+    print(f"{estado} {modelos} modelos de la base: {diferencias} predicciones distintas")
+    return diferencias
+
+
+def _recorrer(arbol, fila):
+    nodo = 0
+    while arbol.children_left[nodo] != -1:
+        if fila[arbol.feature[nodo]] <= arbol.threshold[nodo]:
+            nodo = arbol.children_left[nodo]
+        else:
+            nodo = arbol.children_right[nodo]
+    return arbol.classes[np.argmax(arbol.value[nodo])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--arboles", type=int, default=200)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--base", action="store_true", help="comprobar también los modelos de ai_models")
+    args = parser.parse_args()
+
+    diferencias = verificar_sinteticos(args.arboles, args.semilla)
+    if args.base:
+        diferencias += verificar_base()
+    sys.exit(1 if diferencias else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Comprueba que el ejecutor de inferencia (app/services/ml_executor.py) se
+recupera cuando muere un proceso de su pool.
+
+Con un ejecutor en modo process, en cada ronda mata con SIGKILL un proceso
+ocioso del pool (como haría el OOM killer), espera a que el pool quede roto
+y vuelve a predecir los modelos activos de la base. El ejecutor debe
+recrear el pool en el mismo envío y devolver exactamente las predicciones
+del modo local, sin caer en las reglas. Requiere la base con al menos un
+modelo activo.
+
+Termina con código 1 si alguna ronda devuelve predicciones ausentes o
+distintas.
+
+Uso:
+    python scripts/verificar_ml_executor.py [--rondas 3] [--workers 2]
+"""
+
+import argparse
+import os
+import signal
+import sys
+import time
+
+# Añadir el directorio raíz al path para importar los módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.database import SessionLocal
+from app.models.database_models import AIModel, Task
+from app.services.ml_executor import MLExecutor
+from app.services.ml_features import COLUMNAS_FEATURES, extraer_features
+
+
+def grupos_de_prueba(db, max_modelos=20):
+    """(user_id, model_id, X) de los modelos activos, con las tareas de su usuario"""
+    columnas = [getattr(Task, columna) for columna in COLUMNAS_FEATURES]
+    grupos = []
+    modelos = db.query(AIModel.user_id, AIModel.id).filter(AIModel.is_active == True).limit(max_modelos).all()
+    for user_id, model_id in modelos:
+        filas = db.query(*columnas).filter(Task.user_id == user_id).limit(1000).all()
+        if filas:
+            grupos.append((user_id, model_id, extraer_features(*zip(*filas))))
+    return grupos
+
+
+def coinciden(esperadas, obtenidas):
+    return all(
+        o is not None and np.array_equal(e, o)
+        for e, o in zip(esperadas, obtenidas) if e is not None
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rondas", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        grupos = grupos_de_prueba(db)
+        if not grupos:
+            print("❌ No hay modelos activos con tareas en la base")
+            sys.exit(1)
+
+        esperadas = MLExecutor("local", 0, 1000, len(grupos), 30).predecir_lote(db, grupos)
+        print(f"📦 {len(grupos)} modelos, {sum(len(g[2]) for g in grupos)} filas")
+
+        ejecutor = MLExecutor("process", args.workers, 1000, len(grupos), 30)
+        fallos = 0
+        try:
+            if not coinciden(esperadas, ejecutor.predecir_lote(db, grupos)):
+                print("❌ El pool no coincide con el modo local antes de matar ningún proceso")
+                fallos += 1
+
+            for ronda in range(1, args.rondas + 1):
+                executor, future = ejecutor._enviar(os.getpid)
+                pid = future.result()
+                os.kill(pid, signal.SIGKILL)
+                # El pool se marca como roto en cuanto su hilo de gestión ve morir al proceso
+                time.sleep(1)
+
+                obtenidas = ejecutor.predecir_lote(db, grupos)
+                stats = ejecutor.stats()
+                if coinciden(esperadas, obtenidas) and stats["pool_restarts"] == ronda and stats["failed"] == 0:
+                    print(f"✅ Ronda {ronda}: proceso {pid} muerto, pool recreado y predicciones idénticas")
+                else:
+                    fallos += 1
+                    print(f"❌ Ronda {ronda}: proceso {pid} muerto; reinicios={stats['pool_restarts']}, "
+                          f"fallidos={stats['failed']}, ausentes={sum(o is None for o in obtenidas)}")
+        finally:
+            ejecutor.cerrar()
+    finally:
+        db.close()
+
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
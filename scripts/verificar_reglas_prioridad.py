@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Comprueba que las reglas vectorizadas (app/services/priority_rules.py) dan
+exactamente los mismos resultados que las escalares:
+
+    TaskService._calcular_priority_level   -> calcular_prioridades (nivel)
+    TaskService._calcular_priority_score   -> calcular_prioridades (puntaje)
+    ai_service.puntaje_por_reglas          -> puntajes_por_reglas
+
+Genera tareas aleatorias (semilla configurable) más casos en los bordes de
+cada umbral de deadline (±1 µs alrededor de 0, 2 h, 24 h y 3 días, y de los
+cambios de día), valores de enumerado desconocidos o vacíos y palabras clave
+con mayúsculas y acentos. El reloj de las funciones escalares se congela en
+el mismo instante que recibe la versión vectorizada. Termina con código 1
+si alguna tarea difiere y muestra los tiempos de ambas versiones.
+
+No necesita base de datos.
+
+Uso:
+    python scripts/verificar_reglas_prioridad.py [--tareas 20000] [--semilla 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import ai_service, task_service
+from app.services.ai_service import puntaje_por_reglas
+from app.services.priority_rules import calcular_prioridades, puntajes_por_reglas
+from app.services.task_service import TaskService
+
+AHORA = datetime(2026, 3, 14, 9, 26, 53, 589793, tzinfo=timezone.utc)
+AHORA_LOCAL = AHORA.astimezone().replace(tzinfo=None)
+
+NIVELES = ["low", "medium", "high", None, "urgent", "HIGH", ""]
+PALABRAS = [
+    "informe", "reunión", "bug", "Fix", "CRÍTICO", "crítica", "urgente", "Hotfix", "error",
+    "servidor caído", "seguridad", "important", "IMPORTANTE", "critical", "revisar", "deploy",
+]
+BORDES = [timedelta(0), timedelta(hours=2), timedelta(hours=24), timedelta(days=3),
+          timedelta(days=1), timedelta(days=2), timedelta(days=4)]
+UN_MICRO = timedelta(microseconds=1)
+
+
+class _RelojCongelado(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return AHORA.astimezone(tz) if tz is not None else AHORA_LOCAL
+
+
+def _texto(rng: random.Random):
+    if rng.random() < 0.15:
+        return None
+    return " ".join(rng.choice(PALABRAS) for _ in range(rng.randint(1, 4)))
+
+
+def _deadline(rng: random.Random, con_zona: bool):
+    r = rng.random()
+    if r < 0.2:
+        return None
+    if r < 0.6:
+        delta = rng.choice(BORDES) + rng.choice([-UN_MICRO, timedelta(0), UN_MICRO])
+        delta = delta if rng.random() < 0.8 else -delta
+    else:
+        delta = timedelta(seconds=rng.uniform(-10 * 86400, 10 * 86400))
+    if con_zona:
+        return AHORA + delta
+    return AHORA_LOCAL + delta
+
+
+def generar_tareas(n: int, semilla: int):
+    rng = random.Random(semilla)
+    tareas = []
+    for _ in range(n):
+        tareas.append(SimpleNamespace(
+            title=_texto(rng) or "sin título",
+            description=_texto(rng),
+            urgency=rng.choice(NIVELES),
+            impact=rng.choice(NIVELES),
+            energy_required=rng.choice(NIVELES),
+            priority_level=rng.choice(NIVELES),
+            estimated_duration=rng.choice([None, 0, 30, 240, 241, rng.randint(1, 600)]),
+            deadline=_deadline(rng, con_zona=False),
+            # Las reglas de nivel también reciben deadlines con zona (creación desde la API)
+            deadline_api=_deadline(rng, con_zona=rng.random() < 0.5),
+        ))
+    return tareas
+
+
+def escalares(tareas):
+    niveles, puntajes, reglas = [], [], []
+    for t in tareas:
+        nivel = TaskService._calcular_priority_level(
+            t.urgency, t.impact, t.deadline_api, t.energy_required, t.estimated_duration
+        )
+        niveles.append(nivel)
+        puntajes.append(TaskService._calcular_priority_score(nivel, t.urgency, t.impact, t.deadline_api))
+        reglas.append(puntaje_por_reglas(t))
+    return niveles, puntajes, reglas
+
+
+def vectorizadas(tareas):
+    niveles, puntajes = calcular_prioridades(
+        urgency=[t.urgency for t in tareas],
+        impact=[t.impact for t in tareas],
+        deadline=[t.deadline_api for t in tareas],
+        energy_required=[t.energy_required for t in tareas],
+        estimated_duration=[t.estimated_duration for t in tareas],
+        ahora=AHORA
+    )
+    reglas = puntajes_por_reglas(
+        priority_level=[t.priority_level for t in tareas],
+        urgency=[t.urgency for t in tareas],
+        impact=[t.impact for t in tareas],
+        title=[t.title for t in tareas],
+        description=[t.description for t in tareas],
+        deadline=[t.deadline for t in tareas],
+        ahora=AHORA_LOCAL
+    )
+    return niveles.tolist(), puntajes.tolist(), reglas.tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tareas", type=int, default=20000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    task_service.datetime = _RelojCongelado
+    ai_service.datetime = _RelojCongelado
+    tareas = generar_tareas(args.tareas, args.semilla)
+
+    inicio = time.perf_counter()
+    esperado = escalares(tareas)
+    t_escalar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtenido = vectorizadas(tareas)
+    t_vectorizado = time.perf_counter() - inicio
+
+    diferencias = 0
+    for nombre, a, b in zip(("priority_level", "priority_score", "puntaje_por_reglas"), esperado, obtenido):
+        distintos = [i for i, (x, y) in enumerate(zip(a, b)) if x != y]
+        diferencias += len(distintos)
+        estado = "✅" if not distintos else "❌"
+        print(f"{estado} {nombre}: {len(a) - len(distintos)}/{len(a)} iguales")
+        for i in distintos[:5]:
+            print(f"   tarea {i}: escalar={a[i]!r} vectorizado={b[i]!r} ({vars(tareas[i])})")
+
+    print(f"⏱️ {args.tareas} tareas: escalar {t_escalar * 1000:.1f} ms, "
+          f"vectorizado {t_vectorizado * 1000:.1f} ms ({t_escalar / t_vectorizado:.1f}x)")
+    sys.exit(1 if diferencias else 0)
+
+
+if __name__ == "__main__":
+    main()